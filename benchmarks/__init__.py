@@ -0,0 +1,5 @@
+"""
+性能基准
+包含本地桩服务（OpenAI 兼容的 chat-completions 接口、weibotop 接口）与分类、抓取吞吐量基准，
+运行方式见各模块的说明，例如: python -m benchmarks.classify_bench --help、python -m benchmarks.fetch_bench --help
+"""
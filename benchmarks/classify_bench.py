@@ -0,0 +1,277 @@
+"""
+分类吞吐量基准
+通过真实的 OpenAI SDK 客户端访问本地桩服务（benchmarks.openai_stub），在不同数据量与并发度下
+测量 TitleClassifier、RelatedCelebrityClassifier 与 DataProcessor.process_file 的吞吐量、
+单次请求延迟分位数与峰值内存，结果以 JSON 输出。
+
+    python -m benchmarks.classify_bench --sizes 200 1000 --concurrency 1 8 32 --latency lognormal:0.02,0.5
+    python -m benchmarks.classify_bench --scenarios process_file --output results.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import math
+import tempfile
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from openai import AsyncOpenAI, OpenAI
+
+from benchmarks.openai_stub import CELEBRITY_MARKER, RELATED_MARKER, OpenAIStub
+from core.classifier import TitleClassifier
+from core.data_processor import DataProcessor
+from core.rate_limiter import AdaptiveRateLimiter
+from core.related_classifier import RelatedCelebrityClassifier
+
+SCENARIOS = ["title_single", "title_batch", "related", "process_file"]
+
+
+def make_titles(size: int, celebrity_ratio: float = 0.3, related_ratio: float = 0.2) -> List[str]:
+    """生成互不相同的标题，按比例混入明星标题与可推断关联明星的标题"""
+    titles = []
+    for i in range(size):
+        slot = (i * 7919) % 100 / 100
+        if slot < celebrity_ratio:
+            titles.append(f"{CELEBRITY_MARKER}{i}官宣新剧")
+        elif slot < celebrity_ratio + related_ratio:
+            titles.append(f"{RELATED_MARKER}{i}票房破纪录")
+        else:
+            titles.append(f"城市{i}迎来降温")
+    return titles
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """最近秩法分位数"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(math.ceil(q / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+class LatencyRecorder:
+    """包装客户端的 chat.completions.create，记录每次请求（含 SDK 解析）的耗时"""
+
+    def __init__(self):
+        self.samples: List[float] = []
+        self._lock = threading.Lock()
+
+    def _add(self, elapsed: float):
+        with self._lock:
+            self.samples.append(elapsed)
+
+    def instrument(self, client: OpenAI):
+        create = client.chat.completions.create
+
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return create(*args, **kwargs)
+            finally:
+                self._add(time.perf_counter() - start)
+
+        client.chat.completions.create = timed
+
+    def instrument_async(self, client: AsyncOpenAI):
+        create = client.chat.completions.create
+
+        async def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await create(*args, **kwargs)
+            finally:
+                self._add(time.perf_counter() - start)
+
+        client.chat.completions.create = timed
+
+
+def _gather_limited(concurrency: int, factory: Callable[[Any], Any], items: List[Any]):
+    async def run():
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one(item):
+            async with semaphore:
+                return await factory(item)
+
+        return await asyncio.gather(*(one(item) for item in items))
+
+    return asyncio.run(run())
+
+
+def run_scenario(
+    scenario: str,
+    base_url: str,
+    size: int,
+    concurrency: int,
+    rate_limit: Optional[float] = None,
+    enhanced: bool = True,
+    trace_memory: bool = True
+) -> Dict[str, Any]:
+    """
+    运行一个场景并返回结果
+
+    Args:
+        scenario: SCENARIOS 之一
+        base_url: 桩服务地址
+        size: 标题数
+        concurrency: 并发度；为 1 时走同步接口，否则走异步接口
+        rate_limit: 自适应限速器的初始速率（请求/秒），None 表示不使用限速器（由 SDK 重试）
+        enhanced: process_file 是否启用关联明星推断
+        trace_memory: 是否用 tracemalloc 统计峰值内存（会降低吞吐量）
+    """
+    limiter = AdaptiveRateLimiter(initial_rate=rate_limit, max_rate=max(rate_limit, 1000.0)) if rate_limit else None
+    max_retries = 0 if limiter else 2
+    client = OpenAI(api_key="stub", base_url=base_url, max_retries=max_retries)
+    async_client = AsyncOpenAI(api_key="stub", base_url=base_url, max_retries=max_retries)
+    recorder = LatencyRecorder()
+    recorder.instrument(client)
+    recorder.instrument_async(async_client)
+
+    classifier = TitleClassifier(client, async_client=async_client if concurrency > 1 else None, rate_limiter=limiter)
+    titles = make_titles(size)
+    errors = 0
+
+    tmp = None
+    if scenario == "process_file":
+        tmp = tempfile.TemporaryDirectory()
+        input_path = Path(tmp.name) / "input.json"
+        days = {}
+        for i, title in enumerate(titles):
+            day = f"2025-12-{i % 28 + 1:02d}"
+            days.setdefault(day, {"date": day, "items": []})["items"].append({"rank": i, "keyword": title})
+        with open(input_path, "w", encoding="utf-8") as f:
+            json.dump(days, f, ensure_ascii=False)
+
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        if scenario == "title_single":
+            if concurrency > 1:
+                results = _gather_limited(concurrency, classifier.aclassify_title, titles)
+            else:
+                results = [classifier.classify_title(t) for t in titles]
+            errors = sum(1 for _, text in results if text.startswith("ERROR:"))
+        elif scenario == "title_batch":
+            if concurrency > 1:
+                async def batch():
+                    return await classifier.aclassify_titles(titles, semaphore=asyncio.Semaphore(concurrency))
+                results = asyncio.run(batch())
+            else:
+                results = classifier.classify_titles(titles)
+            errors = sum(1 for _, text in results if text.startswith("ERROR:"))
+        elif scenario == "related":
+            related = RelatedCelebrityClassifier(
+                client, async_client=async_client if concurrency > 1 else None, rate_limiter=limiter
+            )
+            if concurrency > 1:
+                results = _gather_limited(concurrency, related.ainfer_related_celebrity, titles)
+            else:
+                results = [related.infer_related_celebrity(t) for t in titles]
+            errors = sum(1 for r in results if r and r.get("error"))
+        elif scenario == "process_file":
+            processor = DataProcessor()
+            processor.process_file(
+                input_path, classifier, delay=0, enhance_model=enhanced, concurrency=concurrency
+            )
+            errors = processor.last_stats.get("errors", 0)
+        else:
+            raise ValueError(f"未知的场景: {scenario}")
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] if trace_memory else None
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+        if tmp is not None:
+            tmp.cleanup()
+        client.close()
+
+    latencies = recorder.samples
+    return {
+        "scenario": scenario,
+        "size": size,
+        "concurrency": concurrency,
+        "elapsed_s": round(elapsed, 4),
+        "titles_per_s": round(size / elapsed, 2) if elapsed > 0 else None,
+        "requests": len(latencies),
+        "errors": errors,
+        "latency_ms": {
+            f"p{q}": round(percentile(latencies, q) * 1000, 2) if latencies else None
+            for q in (50, 95, 99)
+        },
+        "peak_memory_bytes": peak,
+    }
+
+
+def run_benchmarks(
+    scenarios: List[str],
+    sizes: List[int],
+    concurrency_levels: List[int],
+    stub_options: Optional[Dict[str, Any]] = None,
+    **scenario_options
+) -> Dict[str, Any]:
+    """启动桩服务，依次运行所有 (场景, 数据量, 并发度) 组合"""
+    stub = OpenAIStub(**(stub_options or {}))
+    base_url = stub.start()
+    results = []
+    try:
+        for scenario in scenarios:
+            for size in sizes:
+                for concurrency in concurrency_levels:
+                    result = run_scenario(scenario, base_url, size, concurrency, **scenario_options)
+                    results.append(result)
+                    logging.getLogger(__name__).info(json.dumps(result, ensure_ascii=False))
+    finally:
+        stub.stop()
+    return {"stub": dict(stub_options or {}, counts=stub.counts), "results": results}
+
+
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description="分类吞吐量基准（本地 OpenAI 兼容桩服务）")
+    p.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS, help="要运行的场景")
+    p.add_argument("--sizes", nargs="+", type=int, default=[200, 1000], help="标题数")
+    p.add_argument("--concurrency", nargs="+", type=int, default=[1, 8, 32], help="并发度（1 为同步接口）")
+    p.add_argument("--latency", default="fixed:0.02", help="桩服务延迟分布，如 fixed:0.02 / uniform:0.01,0.05 / lognormal:0.02,0.5")
+    p.add_argument("--error-rate", type=float, default=0.0, help="桩服务返回 500 的概率")
+    p.add_argument("--rate-limit-rate", type=float, default=0.0, help="桩服务返回 429 的概率")
+    p.add_argument("--answer-policy", choices=["marker", "yes", "no"], default="marker", help="单条判断的回答策略")
+    p.add_argument("--batch-policy", choices=["valid", "partial", "invalid"], default="valid", help="批量判断的回答策略")
+    p.add_argument("--rate-limit", type=float, default=None, help="使用自适应限速器并以该速率（请求/秒）起步")
+    p.add_argument("--no-enhanced", action="store_true", help="process_file 不启用关联明星推断")
+    p.add_argument("--no-memory", action="store_true", help="不统计峰值内存（tracemalloc 会降低吞吐量）")
+    p.add_argument("--output", default=None, help="结果 JSON 文件路径，默认输出到标准输出")
+    return p.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    # 分类过程中的逐条日志会严重影响计时
+    logging.getLogger("core").setLevel(logging.WARNING)
+    report = run_benchmarks(
+        args.scenarios,
+        args.sizes,
+        args.concurrency,
+        stub_options={
+            "latency": args.latency,
+            "error_rate": args.error_rate,
+            "rate_limit_rate": args.rate_limit_rate,
+            "answer_policy": args.answer_policy,
+            "batch_policy": args.batch_policy,
+        },
+        rate_limit=args.rate_limit,
+        enhanced=not args.no_enhanced,
+        trace_memory=not args.no_memory,
+    )
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        Path(args.output).write_text(text, encoding="utf-8")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+抓取吞吐量基准
+启动本地 weibotop 桩服务（benchmarks.weibotop_stub），在不同 max_workers、with_history 与抓取引擎下
+运行 WeiboHotSearchFetcher.fetch_date_range，测量每秒日期数与每秒历史请求数，结果以 JSON 输出。
+
+    python -m benchmarks.fetch_bench --days 30 --workers 1 4 16 --history off on --latency uniform:0.005,0.02
+    python -m benchmarks.fetch_bench --engines thread async --throttle-rate 0.05 --history-rate 200
+"""
+import argparse
+import json
+import logging
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from benchmarks.weibotop_stub import SECRET_KEY, WeiboTopStub
+from core.fetcher import WeiboHotSearchFetcher
+
+START_DATE = date(2025, 12, 1)
+
+
+def run_case(
+    base_url: str,
+    stub: WeiboTopStub,
+    days: int,
+    max_workers: int,
+    with_history: bool,
+    engine: str = "thread",
+    history_rate: Optional[float] = None,
+    decrypt_processes: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    抓取一次日期区间并返回结果
+
+    Args:
+        base_url: 桩服务地址
+        stub: 桩服务实例，用于统计本次的请求数
+        days: 日期数（从 START_DATE 开始）
+        max_workers: 抓取线程数（async 引擎为并发请求数）
+        with_history: 是否抓取关键词历史
+        engine: "thread" 或 "async"
+        history_rate: 历史请求限速器的初始与最高速率（请求/秒），None 表示使用生产配置
+        decrypt_processes: 解密进程数，默认 DECRYPT_PROCESSES
+    """
+    fetcher = WeiboHotSearchFetcher(
+        secret_key=SECRET_KEY, base_url=base_url, engine=engine,
+        decrypt_processes=decrypt_processes, history_rate=history_rate
+    )
+    start_date = START_DATE.isoformat()
+    end_date = (START_DATE + timedelta(days=days - 1)).isoformat()
+
+    counts_before = dict(stub.counts)
+    injected_before = dict(stub.injected)
+    start = time.perf_counter()
+    data = fetcher.fetch_date_range(start_date, end_date, max_workers=max_workers, with_history=with_history)
+    elapsed = time.perf_counter() - start
+
+    requests = {k: stub.counts[k] - counts_before[k] for k in stub.counts}
+    history_calls = requests["getrankhistory"]
+    missing_history = 0
+    if with_history:
+        missing_history = sum(
+            1 for day in data.values() for item in day["items"] if item["history"] is None
+        )
+    return {
+        "engine": engine,
+        "days": days,
+        "max_workers": max_workers,
+        "with_history": with_history,
+        "elapsed_s": round(elapsed, 4),
+        "dates_fetched": len(data),
+        "dates_per_s": round(len(data) / elapsed, 2) if elapsed > 0 else None,
+        "history_calls": history_calls,
+        "history_calls_per_s": round(history_calls / elapsed, 2) if elapsed > 0 and with_history else None,
+        "missing_history": missing_history,
+        "requests": requests,
+        "injected": {k: stub.injected[k] - injected_before[k] for k in stub.injected},
+        "http": fetcher.http_stats,
+        "history_limiter": fetcher.history_stats if with_history else {},
+    }
+
+
+def run_benchmarks(
+    days: int,
+    workers: List[int],
+    history_modes: List[bool],
+    engines: List[str],
+    stub_options: Optional[Dict[str, Any]] = None,
+    **case_options
+) -> Dict[str, Any]:
+    """启动桩服务，依次运行所有 (引擎, 是否抓取历史, 线程数) 组合"""
+    stub = WeiboTopStub(**(stub_options or {}))
+    base_url = stub.start()
+    results = []
+    try:
+        for engine in engines:
+            for with_history in history_modes:
+                for max_workers in workers:
+                    result = run_case(base_url, stub, days, max_workers, with_history, engine=engine, **case_options)
+                    results.append(result)
+                    logging.getLogger(__name__).info(json.dumps(result, ensure_ascii=False))
+    finally:
+        stub.stop()
+    return {"stub": dict(stub_options or {}), "results": results}
+
+
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description="抓取吞吐量基准（本地 weibotop 桩服务）")
+    p.add_argument("--days", type=int, default=14, help="抓取的日期数")
+    p.add_argument("--workers", nargs="+", type=int, default=[1, 4, 16], help="max_workers 取值")
+    p.add_argument("--history", nargs="+", choices=["off", "on"], default=["off", "on"], help="是否抓取关键词历史")
+    p.add_argument("--engines", nargs="+", choices=["thread", "async"], default=["thread"], help="抓取引擎")
+    p.add_argument("--items-per-day", type=int, default=50, help="每天的热搜条数")
+    p.add_argument("--keyword-pool", type=int, default=200, help="关键词池大小（决定跨日期复用的历史序列比例）")
+    p.add_argument("--history-days", type=int, default=20, help="每条历史序列覆盖的天数")
+    p.add_argument("--history-step", type=int, default=10, help="历史序列采样间隔（分钟）")
+    p.add_argument("--latency", default="fixed:0.01", help="桩服务延迟分布，如 fixed:0.01 / uniform:0.005,0.02 / lognormal:0.01,0.5")
+    p.add_argument("--invalid-rate", type=float, default=0.0, help="返回 Invalid 的概率")
+    p.add_argument("--throttle-rate", type=float, default=0.0, help="历史接口返回 Code:DCE 的概率")
+    p.add_argument("--error-rate", type=float, default=0.0, help="返回 500 的概率")
+    p.add_argument("--history-rate", type=float, default=None, help="历史请求限速器速率上限（请求/秒），默认使用生产配置")
+    p.add_argument("--decrypt-processes", type=int, default=None, help="解密进程数，默认 DECRYPT_PROCESSES")
+    p.add_argument("--output", default=None, help="结果 JSON 文件路径，默认输出到标准输出")
+    return p.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    report = run_benchmarks(
+        args.days,
+        args.workers,
+        [mode == "on" for mode in args.history],
+        args.engines,
+        stub_options={
+            "items_per_day": args.items_per_day,
+            "keyword_pool": args.keyword_pool,
+            "history_days": args.history_days,
+            "history_step_minutes": args.history_step,
+            "latency": args.latency,
+            "invalid_rate": args.invalid_rate,
+            "throttle_rate": args.throttle_rate,
+            "error_rate": args.error_rate,
+        },
+        history_rate=args.history_rate,
+        decrypt_processes=args.decrypt_processes,
+    )
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        Path(args.output).write_text(text, encoding="utf-8")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
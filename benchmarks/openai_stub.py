@@ -0,0 +1,176 @@
+"""
+本地 OpenAI 兼容桩服务
+实现 POST /chat/completions，按请求的系统提示词识别单条判断、批量判断与关联明星推断三类请求，
+返回与真实接口格式一致的响应。延迟分布、500 错误率与 429 限流率均可配置，结果可通过 seed 复现。
+
+    stub = OpenAIStub(latency="lognormal:0.02,0.5", error_rate=0.01, rate_limit_rate=0.02)
+    base_url = stub.start()
+    client = OpenAI(api_key="stub", base_url=base_url)
+"""
+import json
+import random
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from benchmarks.stub_server import serve, shutdown
+from config.settings import BATCH_CLASSIFIER_SYSTEM_PROMPT
+from core.related_classifier import RELATED_SYSTEM_PROMPT
+
+# 默认判定策略：标题中含有这些标记时视为明星相关 / 可以推断出关联明星
+CELEBRITY_MARKER = "明星"
+RELATED_MARKER = "电影"
+
+_BATCH_LINE = re.compile(r"^(\d+)\. (.*)$")
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """
+    解析延迟分布（秒）
+
+    - "fixed:0.02"：固定 20ms
+    - "uniform:0.01,0.05"：10ms 到 50ms 均匀分布
+    - "lognormal:0.02,0.5"：中位数 20ms、sigma 0.5 的对数正态分布（长尾）
+    """
+    kind, _, args = spec.partition(":")
+    values = [float(v) for v in args.split(",") if v]
+    if kind == "fixed" and len(values) == 1:
+        return lambda rng: values[0]
+    if kind == "uniform" and len(values) == 2:
+        return lambda rng: rng.uniform(values[0], values[1])
+    if kind == "lognormal" and len(values) == 2:
+        import math
+        mu = math.log(values[0])
+        return lambda rng: rng.lognormvariate(mu, values[1])
+    raise ValueError(f"无法解析的延迟分布: {spec}")
+
+
+class OpenAIStub:
+    """
+    Args:
+        latency: 延迟分布，格式见 parse_latency
+        error_rate: 返回 500 的概率
+        rate_limit_rate: 返回 429 的概率
+        answer_policy: 单条判断的回答："marker"（标题含 CELEBRITY_MARKER 时 YES）、"yes"、"no"
+        batch_policy: 批量判断的回答："valid"（完整 JSON）、"partial"（每隔一条缺失，触发逐条回退）、
+            "invalid"（不是 JSON）
+        seed: 随机数种子
+    """
+
+    def __init__(
+        self,
+        latency: str = "fixed:0",
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        answer_policy: str = "marker",
+        batch_policy: str = "valid",
+        seed: int = 0
+    ):
+        if answer_policy not in ("marker", "yes", "no"):
+            raise ValueError(f"未知的回答策略: {answer_policy}")
+        if batch_policy not in ("valid", "partial", "invalid"):
+            raise ValueError(f"未知的批量回答策略: {batch_policy}")
+        self.latency = parse_latency(latency)
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.answer_policy = answer_policy
+        self.batch_policy = batch_policy
+        self.counts = {"requests": 0, "single": 0, "batch": 0, "related": 0, "errors": 0, "throttled": 0}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = None
+
+    # --- 回答 ---
+    def verdict(self, title: str) -> bool:
+        if self.answer_policy == "marker":
+            return CELEBRITY_MARKER in title
+        return self.answer_policy == "yes"
+
+    @staticmethod
+    def related_for(title: str) -> Optional[str]:
+        if RELATED_MARKER not in title:
+            return None
+        return f"演员{sum(map(ord, title)) % 100}"
+
+    def _answer(self, messages: List[Dict[str, Any]]) -> Tuple[str, str]:
+        """返回 (请求类型, 回答文本)"""
+        system = next((m["content"] for m in messages if m.get("role") == "system"), "")
+        user = next((m["content"] for m in messages if m.get("role") == "user"), "")
+
+        if system == BATCH_CLASSIFIER_SYSTEM_PROMPT:
+            if self.batch_policy == "invalid":
+                return "batch", "results: YES"
+            results = []
+            for line in user.splitlines():
+                match = _BATCH_LINE.match(line)
+                if not match:
+                    continue
+                index = int(match.group(1))
+                if self.batch_policy == "partial" and index % 2:
+                    continue
+                results.append({"index": index, "verdict": "YES" if self.verdict(match.group(2)) else "NO"})
+            return "batch", json.dumps({"results": results}, ensure_ascii=False)
+
+        if system == RELATED_SYSTEM_PROMPT:
+            title = user.rsplit("标题：", 1)[-1]
+            name = self.related_for(title)
+            reasoning = f"{title} 的主演" if name else "无特定关联明星"
+            return "related", json.dumps({"related_celebrity": name, "reasoning": reasoning}, ensure_ascii=False)
+
+        title = user.rsplit("标题：", 1)[-1].strip()
+        return "single", "YES" if self.verdict(title) else "NO"
+
+    def _handle(self, body: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        with self._lock:
+            self.counts["requests"] += 1
+            delay = self.latency(self._rng)
+            roll = self._rng.random()
+        time.sleep(max(delay, 0))
+
+        if roll < self.rate_limit_rate:
+            with self._lock:
+                self.counts["throttled"] += 1
+            return 429, {"error": {"message": "Rate limit reached", "type": "rate_limit_error", "code": "rate_limit"}}
+        if roll < self.rate_limit_rate + self.error_rate:
+            with self._lock:
+                self.counts["errors"] += 1
+            return 500, {"error": {"message": "Internal error", "type": "server_error", "code": None}}
+
+        kind, content = self._answer(body.get("messages", []))
+        with self._lock:
+            self.counts[kind] += 1
+        prompt_tokens = sum(len(m.get("content", "")) for m in body.get("messages", []))
+        return 200, {
+            "id": f"chatcmpl-stub-{self.counts['requests']}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "stub"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": len(content),
+                "total_tokens": prompt_tokens + len(content),
+            },
+        }
+
+    # --- HTTP ---
+    def start(self) -> str:
+        """启动服务，返回可直接作为 OpenAI base_url 的地址"""
+        self._server = serve(self._respond)
+        return f"http://127.0.0.1:{self._server.server_address[1]}/v1"
+
+    def _respond(self, method: str, path: str, body: bytes) -> Tuple[int, Optional[str], bytes]:
+        if method != "POST" or not path.rstrip("/").endswith("/chat/completions"):
+            status, payload = 404, {"error": {"message": "not found"}}
+        else:
+            status, payload = self._handle(json.loads(body or b"{}"))
+        return status, "application/json", json.dumps(payload, ensure_ascii=False).encode("utf-8")
+
+    def stop(self):
+        shutdown(self._server)
+        self._server = None
@@ -0,0 +1,51 @@
+"""
+桩服务共用的本地 HTTP 服务器
+在 127.0.0.1 的随机端口上以多线程方式提供服务，由各桩服务提供请求处理函数。
+"""
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Optional, Tuple
+
+# (方法, 路径含查询串, 请求体) -> (状态码, Content-Type, 响应体)；Content-Type 为 None 时不发送该响应头
+RequestHandler = Callable[[str, str, bytes], Tuple[int, Optional[str], bytes]]
+
+
+def serve(handle: RequestHandler) -> ThreadingHTTPServer:
+    """启动服务并在后台线程中运行，返回服务器对象（端口见 server_address[1]）"""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # 响应头与响应体分两次写出，不关闭 Nagle 算法会额外引入约 40ms 的延迟确认等待
+        disable_nagle_algorithm = True
+
+        def _respond(self, method: str):
+            length = int(self.headers.get("Content-Length", 0))
+            body = self.rfile.read(length) if length else b""
+            status, content_type, data = handle(method, self.path, body)
+            self.send_response(status)
+            if content_type:
+                self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            self._respond("GET")
+
+        def do_POST(self):
+            self._respond("POST")
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def shutdown(server: Optional[ThreadingHTTPServer]):
+    """停止服务并关闭监听端口"""
+    if server is not None:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,165 @@
+"""
+本地 weibotop 桩服务
+实现 getclosesttime、currentitems 与 getrankhistory 三个接口，按真实接口的 AES-ECB + base64 方式加密，
+数据由参数确定性地生成，供抓取器测试与基准使用。可注入延迟、Invalid、Code:DCE 与 500 错误。
+
+    stub = WeiboTopStub(items_per_day=50, history_days=30, latency="uniform:0.005,0.02", throttle_rate=0.02)
+    fetcher = WeiboHotSearchFetcher(secret_key=SECRET_KEY, base_url=stub.start())
+"""
+import base64
+import hashlib
+import json
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from Crypto.Cipher import AES
+from Crypto.Util.Padding import unpad
+
+from benchmarks.openai_stub import parse_latency
+from benchmarks.stub_server import serve, shutdown
+from core.decrypt_pool import encrypt_text
+
+SECRET_KEY = "stub-secret"
+
+
+class WeiboTopStub:
+    """
+    Args:
+        items_per_day: 每天的热搜条数
+        keyword_pool: 关键词池大小，不同日期之间会出现重复关键词
+        throttle_every: 每 N 次历史请求返回一次 Code:DCE（0 表示不限流）
+        history_days: 每个关键词历史序列覆盖的天数（从 2025-11-25 开始）
+        history_step_minutes: 历史序列的采样间隔（分钟）
+        latency: 延迟分布，格式见 benchmarks.openai_stub.parse_latency
+        invalid_rate: currentitems / getrankhistory 返回 Invalid 的概率
+        throttle_rate: getrankhistory 返回 Code:DCE 的概率
+        error_rate: 返回 500 的概率
+        seed: 随机数种子
+    """
+
+    def __init__(
+        self,
+        items_per_day: int = 5,
+        keyword_pool: int = 8,
+        throttle_every: int = 0,
+        history_days: int = 20,
+        history_step_minutes: int = 360,
+        latency: str = "fixed:0",
+        invalid_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        error_rate: float = 0.0,
+        seed: int = 0
+    ):
+        self.items_per_day = items_per_day
+        self.keyword_pool = keyword_pool
+        self.throttle_every = throttle_every
+        self.history_days = history_days
+        self.history_step_minutes = history_step_minutes
+        self.latency = parse_latency(latency)
+        self.invalid_rate = invalid_rate
+        self.throttle_rate = throttle_rate
+        self.error_rate = error_rate
+        self.key = bytes.fromhex(hashlib.sha1(SECRET_KEY.encode()).hexdigest()[:32])
+        self.counts = {"getclosesttime": 0, "currentitems": 0, "getrankhistory": 0}
+        self.injected = {"invalid": 0, "throttled": 0, "errors": 0}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = None
+
+    # --- 加解密 ---
+    def encrypt(self, text: str) -> str:
+        return encrypt_text(self.key, text)
+
+    def decrypt(self, text: str) -> str:
+        cipher = AES.new(self.key, AES.MODE_ECB)
+        return unpad(cipher.decrypt(base64.b64decode(text)), AES.block_size).decode()
+
+    # --- 数据 ---
+    @staticmethod
+    def timeid_for(date_str: str) -> str:
+        return date_str.replace("-", "") + "00"
+
+    def items_for(self, date_str: str):
+        day = datetime.strptime(date_str, "%Y-%m-%d").toordinal()
+        return [
+            [f"话题{(day + i) % self.keyword_pool}", 1000000 - i * 1000, f"2025-{date_str[5:]} 00:00:00"]
+            for i in range(self.items_per_day)
+        ]
+
+    def history_for(self, keyword: str):
+        seed = int(keyword.replace("话题", "")) if keyword.startswith("话题") else len(keyword)
+        start = datetime(2025, 11, 25)
+        step = self.history_step_minutes
+        times, ranks, hotness = [], [], []
+        for m in range(0, 24 * 60 * self.history_days, step):
+            h = m // 60
+            ts = start + timedelta(minutes=m)
+            times.append(ts.strftime("%Y-%m-%d %H:%M:%S"))
+            ranks.append(str((seed + h) % 50 + 1))
+            hotness.append(str(100000 + seed * 1000 + h))
+        return [times, ranks, hotness]
+
+    # --- HTTP ---
+    def _inject(self, endpoint: str, count: int):
+        """按配置返回要注入的 (状态码, 响应体)，不注入时返回 None"""
+        with self._lock:
+            delay = self.latency(self._rng)
+            roll = self._rng.random()
+        time.sleep(max(delay, 0))
+
+        if endpoint == "getrankhistory" and self.throttle_every and count % self.throttle_every == 0:
+            kind, response = "throttled", (200, "Code:DCE")
+        elif roll < self.error_rate:
+            kind, response = "errors", (500, "Internal Server Error")
+        elif endpoint == "getclosesttime":
+            return None
+        elif roll < self.error_rate + self.invalid_rate:
+            kind, response = "invalid", (200, "Invalid")
+        elif endpoint == "getrankhistory" and roll < self.error_rate + self.invalid_rate + self.throttle_rate:
+            kind, response = "throttled", (200, "Code:DCE")
+        else:
+            return None
+        with self._lock:
+            self.injected[kind] += 1
+        return response
+
+    def _handle(self, path: str, query: dict):
+        """返回 (状态码, 响应体)"""
+        endpoint = path.strip("/")
+        if endpoint not in self.counts:
+            return 404, "not found"
+        with self._lock:
+            self.counts[endpoint] += 1
+            count = self.counts[endpoint]
+
+        injected = self._inject(endpoint, count)
+        if injected is not None:
+            return injected
+
+        if endpoint == "getclosesttime":
+            date_str = self.decrypt(query["timestamp"][0])[:10]
+            return 200, json.dumps([self.timeid_for(date_str), f"{date_str} 00:00:00"])
+        if endpoint == "currentitems":
+            timeid = self.decrypt(query["timeid"][0])
+            date_str = f"{timeid[:4]}-{timeid[4:6]}-{timeid[6:8]}"
+            return 200, self.encrypt(json.dumps(self.items_for(date_str), ensure_ascii=False))
+        keyword = self.decrypt(query["name"][0])
+        return 200, self.encrypt(json.dumps(self.history_for(keyword), ensure_ascii=False))
+
+    def start(self) -> str:
+        """启动服务，返回可直接作为抓取器 base_url 的地址"""
+        self._server = serve(self._respond)
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def _respond(self, method: str, path: str, body: bytes) -> Tuple[int, Optional[str], bytes]:
+        url = urlparse(path)
+        status, text = self._handle(url.path, parse_qs(url.query))
+        return status, None, text.encode()
+
+    def stop(self):
+        shutdown(self._server)
+        self._server = None
@@ -11,6 +11,16 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 
 #爬取数据的密钥
 SECRET_KEY = os.getenv("SECRET_KEY", "")
+WEIBOTOP_BASE_URL = os.getenv("WEIBOTOP_BASE_URL", "https://api.weibotop.cn")
+FETCH_ENGINE = os.getenv("FETCH_ENGINE", "thread")  # 抓取引擎：thread（线程池 + requests）或 async（asyncio + aiohttp）
+WEIBOTOP_CACHE_DIR = Path(os.getenv("WEIBOTOP_CACHE_DIR", str(BASE_DIR / "data" / "weibotop_cache")))  # 解密后的接口响应缓存
+WEIBOTOP_CACHE_TTL = float(os.getenv("WEIBOTOP_CACHE_TTL", "3600"))  # 当天（仍在变化的）数据的缓存有效期（秒）
+WEIBOTOP_CACHE_MAX_ENTRIES = int(os.getenv("WEIBOTOP_CACHE_MAX_ENTRIES", "50000"))  # 响应缓存最大条目数，超出时按最近访问时间淘汰，0 表示不限制
+HISTORY_FORMAT = os.getenv("HISTORY_FORMAT", "full")  # 关键词历史明细格式：full（逐点 dict）或 compact（按列存储，体积约为 full 的十分之一）
+HISTORY_BUCKET_MINUTES = int(os.getenv("HISTORY_BUCKET_MINUTES", "0"))  # 历史明细降采样时段（分钟，如 5/15/60），0 表示保留全部数据点
+DECRYPT_PROCESSES = int(os.getenv("DECRYPT_PROCESSES", "1"))  # 抓取历史时的解密进程数，1 表示在抓取线程中解密（不使用进程池），0 表示按 CPU 核数自动选择
+DECRYPT_INLINE_BYTES = 64 * 1024  # 小于该长度的响应直接在抓取线程中解密
+DECRYPT_BATCH_SIZE = 16  # 批量解密时每个进程任务包含的响应数
 
 # API配置
 DEEPSEEK_API_KEY = os.getenv("DEEPSEEK_API_KEY", "")
@@ -20,13 +30,55 @@ DEEPSEEK_MODEL = os.getenv("DEEPSEEK_MODEL", "deepseek-chat")
 # 分类器配置
 CLASSIFIER_SYSTEM_PROMPT = """你是一个严格的分类器。判断给定标题是否包含明星（人名/艺名）信息。只回答大写的 YES 或 NO，不要添加额外说明。"""
 
+# 批量分类提示词：一次请求判断多个带编号的标题
+BATCH_CLASSIFIER_SYSTEM_PROMPT = """你是一个严格的分类器。用户会给出若干行带编号的标题，格式为“编号. 标题”。逐条判断每个标题是否包含明星（人名/艺名）信息。
+只返回一个 JSON 对象，格式为：{"results": [{"index": 编号, "verdict": "YES"}, {"index": 编号, "verdict": "NO"}]}
+每个编号必须且只能出现一次，verdict 只能是大写的 YES 或 NO，不要添加额外说明。"""
+
+# 批量分类配置
+BATCH_MAX_TOKENS = 1200  # 单次批量请求中标题部分的估算 token 上限
+BATCH_MAX_SIZE = 40  # 单次批量请求最多包含的标题数
+
+# 明星词典预过滤配置
+GAZETTEER_FILE = BASE_DIR / "config" / "celebrities.txt"  # 人工维护：每行一个明星，别名用 | 分隔
+GAZETTEER_LEARNED_FILE = BASE_DIR / "data" / "celebrity_learned.json"  # 从历史结果自动学习
+GAZETTEER_MIN_NAME_LENGTH = 2  # 参与子串匹配的最短姓名长度
+
+# 负向规则预过滤配置
+NEGATIVE_RULES_FILE = BASE_DIR / "config" / "negative_rules.json"
+
 # 处理配置
 DEFAULT_DELAY = 0.5  # API请求之间的默认延迟（秒）
+DEFAULT_CONCURRENCY = 1  # 默认并发请求数，大于 1 时启用异步并发引擎
+STREAM_CHUNK_SIZE = 500  # 流式处理时每批分类的记录数
+INCREMENTAL_REFRESH_DAYS = 1  # 增量抓取时总是重新抓取的最近天数（当天的热搜仍在变化），0 表示不刷新
+
+# 自适应限速配置（请求/秒）
+RATE_LIMIT_INITIAL = 1 / DEFAULT_DELAY  # 初始速率，与固定延迟模式相当
+RATE_LIMIT_MIN = 0.2
+RATE_LIMIT_MAX = 50.0
+RATE_LIMIT_MAX_RETRIES = 5  # 遇到 429/5xx 时的最大重试次数
+
+# 关键词历史抓取的全局限速配置（请求/秒，所有抓取线程共享）
+HISTORY_RATE_LIMIT_INITIAL = 10.0
+HISTORY_RATE_LIMIT_MIN = 1.0
+HISTORY_RATE_LIMIT_MAX = 30.0
+HISTORY_RATE_LIMIT_MAX_RETRIES = 3  # 遇到 Invalid / Code:DCE / 429 / 5xx 时的最大重试次数
+
+# 分类结果缓存配置
+CACHE_DB_PATH = Path(os.getenv("CACHE_DB_PATH", str(BASE_DIR / "data" / "title_cache.sqlite3")))
+CACHE_TTL = float(os.getenv("CACHE_TTL", str(30 * 24 * 3600)))  # 缓存有效期（秒），0 表示永不过期
+CACHE_MEMORY_SIZE = 4096  # 内存 LRU 条目数
+CACHE_MAX_ENTRIES = 200000  # 磁盘缓存最大条目数
 
 # 文件路径配置
 DEFAULT_INPUT_FILE = "trends_export.json"
 DEFAULT_OUTPUT_FILE = "trends_export_filtered.json"
 
+# JSON 输出配置
+JSON_BACKEND = os.getenv("JSON_BACKEND", "auto")  # 输出编码器：auto（已安装 orjson 时使用）、orjson 或 json
+COMPRESSION_LEVEL = int(os.getenv("COMPRESSION_LEVEL", "0"))  # .gz/.xz/.zst 输出的压缩级别，0 表示各格式的默认级别
+
 # 日志配置
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 LOG_FILE = BASE_DIR / "logs" / "star_filter.log"
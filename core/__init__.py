@@ -4,5 +4,13 @@ from .data_processor import DataProcessor
 from .related_classifier import RelatedCelebrityClassifier  # 新增这一行
 from .fetcher import WeiboHotSearchFetcher
 from .orchestrator import fetch_and_process
+from .cache import TitleDecisionCache
+from .async_engine import AsyncClassificationEngine
+from .rate_limiter import AdaptiveRateLimiter
+from .gazetteer import CelebrityGazetteer
+from .prefilter import NegativeRuleFilter
+from .journal import DecisionJournal
+from .response_cache import ResponseCache
+from .decrypt_pool import DecryptPool
 
-__all__ = ['DeepSeekClient', 'TitleClassifier', 'DataProcessor', 'RelatedCelebrityClassifier', 'WeiboHotSearchFetcher', 'fetch_and_process']
\ No newline at end of file
+__all__ = ['DeepSeekClient', 'TitleClassifier', 'DataProcessor', 'RelatedCelebrityClassifier', 'WeiboHotSearchFetcher', 'fetch_and_process', 'TitleDecisionCache', 'AsyncClassificationEngine', 'AdaptiveRateLimiter', 'CelebrityGazetteer', 'NegativeRuleFilter', 'DecisionJournal', 'ResponseCache', 'DecryptPool']
\ No newline at end of file
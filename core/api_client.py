@@ -1,22 +1,25 @@
 import os
 from typing import Optional
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI
 from config.settings import DEEPSEEK_API_KEY, DEEPSEEK_BASE_URL
 
 
 class DeepSeekClient:
     """DeepSeek API客户端封装类"""
     
-    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None, max_retries: int = 2):
         """
         初始化DeepSeek客户端
         
         Args:
             api_key: API密钥，如果为None则从环境变量或配置文件读取
             base_url: API基础URL
+            max_retries: SDK 内部的重试次数；使用自适应限速器时应设为 0，
+                让 429/5xx 交给限速器处理
         """
         self.api_key = api_key or DEEPSEEK_API_KEY
         self.base_url = base_url or DEEPSEEK_BASE_URL
+        self.max_retries = max_retries
         
         if not self.api_key:
             raise ValueError(
@@ -24,8 +27,17 @@ class DeepSeekClient:
                 "或在调用时提供api_key参数"
             )
         
-        self.client = OpenAI(api_key=self.api_key, base_url=self.base_url)
+        self.client = OpenAI(api_key=self.api_key, base_url=self.base_url, max_retries=max_retries)
+        self.async_client: Optional[AsyncOpenAI] = None
     
     def get_client(self) -> OpenAI:
         """获取OpenAI客户端实例"""
-        return self.client
\ No newline at end of file
+        return self.client
+
+    def get_async_client(self) -> AsyncOpenAI:
+        """获取异步OpenAI客户端实例（首次调用时创建）"""
+        if self.async_client is None:
+            self.async_client = AsyncOpenAI(
+                api_key=self.api_key, base_url=self.base_url, max_retries=self.max_retries
+            )
+        return self.async_client
\ No newline at end of file
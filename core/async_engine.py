@@ -0,0 +1,119 @@
+"""
+异步并发分类引擎
+基于 AsyncOpenAI 客户端并发执行直接判断与关联明星推断，结果按原始顺序返回。
+"""
+import asyncio
+import logging
+from typing import Any, Callable, Coroutine, Dict, List, Optional, Tuple
+
+from tqdm import tqdm
+
+logger = logging.getLogger(__name__)
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def run_sync(coro: Coroutine) -> Any:
+    """
+    在常驻事件循环中同步执行协程
+
+    AsyncOpenAI 的连接池绑定在创建它的事件循环上，多次调用 asyncio.run 会导致
+    连接池失效，因此这里复用同一个事件循环。不能在已运行的事件循环中调用，
+    也不支持多个线程同时调用。
+    """
+    global _loop
+    if _loop is None or _loop.is_closed():
+        _loop = asyncio.new_event_loop()
+    return _loop.run_until_complete(coro)
+
+
+def progress_callback(bar: tqdm, rate_limiter=None) -> Callable[[int], None]:
+    """生成进度回调；配置了限速器时在进度条上显示当前速率"""
+    def update(n: int):
+        bar.update(n)
+        if rate_limiter is not None:
+            bar.set_postfix_str(f"{rate_limiter.current_rate:.1f} 请求/秒", refresh=False)
+    return update
+
+
+class AsyncClassificationEngine:
+    """并发执行标题分类的异步引擎"""
+
+    def __init__(self, classifier, related_classifier=None, concurrency: int = 8):
+        """
+        初始化引擎
+
+        Args:
+            classifier: 提供 aclassify_titles 的 TitleClassifier 实例
+            related_classifier: 可选的关联明星推理器（提供 ainfer_related_celebrity）
+            concurrency: 同时进行的最大请求数
+        """
+        self.classifier = classifier
+        self.related_classifier = related_classifier
+        self.concurrency = max(1, concurrency)
+
+    @staticmethod
+    def supports(classifier) -> bool:
+        """判断分类器是否具备异步能力"""
+        return (
+            hasattr(classifier, 'aclassify_titles')
+            and getattr(classifier, 'async_client', None) is not None
+        )
+
+    async def classify(
+        self,
+        titles: List[Optional[str]]
+    ) -> Tuple[List[Tuple[bool, str]], Dict[int, Optional[Dict[str, Any]]]]:
+        """
+        并发分类所有标题
+
+        Args:
+            titles: 与记录一一对应的标题（无标题为 None）
+
+        Returns:
+            Tuple: (与 titles 一一对应的直接判定结果, 下标 -> 关联明星推断结果)
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+        indices = [i for i, title in enumerate(titles) if title]
+        direct_results: List[Tuple[bool, str]] = [(False, "")] * len(titles)
+
+        # --- 阶段一：直接明星判断 ---
+        rate_limiter = getattr(self.classifier, 'rate_limiter', None)
+        with tqdm(total=len(indices), desc="并发判断", unit="条", ncols=80) as bar:
+            verdicts = await self.classifier.aclassify_titles(
+                [titles[i] for i in indices],
+                semaphore=semaphore,
+                progress=progress_callback(bar, rate_limiter)
+            )
+        for i, verdict in zip(indices, verdicts):
+            direct_results[i] = verdict
+
+        # --- 阶段二：关联明星推断 ---
+        related_results: Dict[int, Optional[Dict[str, Any]]] = {}
+        if self.related_classifier is None:
+            return direct_results, related_results
+
+        # 直接判断失败（ERROR:）的标题会被记为错误，不再做关联推断
+        remaining = [
+            i for i in indices
+            if not direct_results[i][0] and not direct_results[i][1].startswith("ERROR:")
+        ]
+
+        with tqdm(total=len(remaining), desc="关联推断", unit="条", ncols=80) as bar:
+            update = progress_callback(bar, rate_limiter)
+
+            async def infer(idx: int):
+                async with semaphore:
+                    related_results[idx] = await self.related_classifier.ainfer_related_celebrity(titles[idx])
+                update(1)
+
+            await asyncio.gather(*(infer(i) for i in remaining))
+
+        return direct_results, related_results
+
+    def run(
+        self,
+        titles: List[Optional[str]]
+    ) -> Tuple[List[Tuple[bool, str]], Dict[int, Optional[Dict[str, Any]]]]:
+        """classify 的同步入口"""
+        return run_sync(self.classify(titles))
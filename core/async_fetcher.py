@@ -0,0 +1,279 @@
+"""
+asyncio 抓取引擎
+与线程池引擎产出完全相同的数据，但所有请求在单个线程的事件循环中并发执行：
+信号量限制在途请求数，退避等待使用 asyncio.sleep，不占用线程。
+通过 WeiboHotSearchFetcher(engine="async") 使用。
+"""
+import asyncio
+import json
+import logging
+import queue
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import quote
+
+import requests
+
+from .history_store import KeywordSeries
+from .response_cache import OfflineCacheMiss
+from .rate_limiter import AdaptiveRateLimiter
+
+try:
+    import aiohttp
+except ImportError:  # 可选依赖，仅 async 引擎需要
+    aiohttp = None
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+class AsyncFetchEngine:
+    """WeiboHotSearchFetcher 的 asyncio 实现，复用其加解密与结果组装逻辑"""
+
+    def __init__(self, fetcher, concurrency: int = 10, with_history: bool = False, max_retries: int = 3):
+        """
+        Args:
+            fetcher: WeiboHotSearchFetcher 实例
+            concurrency: 同时在途的 HTTP 请求数上限
+            with_history: 是否抓取关键词历史
+            max_retries: 热搜列表请求的最大尝试次数
+        """
+        if aiohttp is None:
+            raise ImportError("async 抓取引擎需要 aiohttp，请先安装: pip install aiohttp")
+        self.fetcher = fetcher
+        self.concurrency = concurrency
+        self.with_history = with_history
+        self.max_retries = max_retries
+
+        self.limiter: Optional[AdaptiveRateLimiter] = fetcher._new_history_limiter() if with_history else None
+        self.http_stats = {"sessions": 1, "requests": 0, "connections": 0, "reused": 0}
+        self.history_stats: Dict[str, float] = {}
+        self._series: Dict[str, asyncio.Task] = {}
+        self._series_reused = 0
+        self._cancelled = False
+
+    def _trace_config(self) -> "aiohttp.TraceConfig":
+        stats = self.http_stats
+        trace = aiohttp.TraceConfig()
+
+        async def on_request_start(session, ctx, params):
+            stats["requests"] += 1
+
+        async def on_connection_create_end(session, ctx, params):
+            stats["connections"] += 1
+
+        async def on_connection_reuseconn(session, ctx, params):
+            stats["reused"] += 1
+
+        trace.on_request_start.append(on_request_start)
+        trace.on_connection_create_end.append(on_connection_create_end)
+        trace.on_connection_reuseconn.append(on_connection_reuseconn)
+        return trace
+
+    async def _get(self, path: str, params: Optional[Dict[str, str]] = None, timeout: float = 10) -> Tuple[int, str]:
+        async with self._semaphore:
+            async with self._session.get(
+                f"{self.fetcher.base_url}{path}",
+                params=params,
+                timeout=aiohttp.ClientTimeout(total=timeout)
+            ) as response:
+                return response.status, await response.text()
+
+    async def _decrypt(self, text: str) -> Optional[Any]:
+        pool = self.fetcher._decrypt_pool
+        if pool is None:
+            return self.fetcher.decrypt_data(text)
+        # 较大的响应在解密进程中处理，不阻塞事件循环
+        return await asyncio.wrap_future(pool.submit(text))
+
+    async def _get_timeid(self, date_str: str) -> Tuple[Optional[str], Optional[str]]:
+        cached = self.fetcher._cache_get("getclosesttime", date_str, closed_on=date_str)
+        if cached is not None:
+            return cached[0], cached[1]
+        try:
+            encrypted_timestamp = self.fetcher.encrypt(f"{date_str} 00:00:00")
+            status, text = await self._get("/getclosesttime", {"timestamp": encrypted_timestamp})
+            if status != 200:
+                return None, None
+            data = json.loads(text)
+            self.fetcher._cache_put("getclosesttime", date_str, [data[0], data[1]])
+            return data[0], data[1]
+        except Exception:
+            return None, None
+
+    async def fetch_day(self, date_str: str) -> Tuple[Optional[list], str, Optional[str], Optional[str]]:
+        """WeiboHotSearchFetcher._fetch_day 的异步版本"""
+        status_text = "重试失败"
+        for retry in range(self.max_retries):
+            try:
+                timeid, actual_time = await self._get_timeid(date_str)
+                cached = self.fetcher._cache_get("currentitems", timeid) if timeid is not None else None
+                if timeid is None:
+                    status_text = "无法获取timeid"
+                elif cached is not None:
+                    return cached, f"成功 ({len(cached)} 条，缓存)", timeid, actual_time
+                else:
+                    encrypted_timeid = self.fetcher.encrypt(str(timeid))
+                    # 与线程引擎一致：加密后的 timeid 手动转义后拼接到 URL
+                    status, text = await self._get(f"/currentitems?timeid={quote(encrypted_timeid)}", timeout=15)
+                    if status >= 400:
+                        status_text = f"HTTP {status}"
+                    elif "Invalid" in text:
+                        status_text = "API返回错误"
+                    else:
+                        data = await self._decrypt(text)
+                        if not data:
+                            status_text = "解密失败"
+                        elif not isinstance(data, list):
+                            status_text = "数据格式错误"
+                        else:
+                            self.fetcher._cache_put("currentitems", timeid, data)
+                            return data, f"成功 ({len(data)} 条)", timeid, actual_time
+            except OfflineCacheMiss:
+                # 离线回放缺少缓存时立即失败，与缺少历史时一致，不跳过该日期
+                raise
+            except Exception as e:
+                status_text = str(e)
+            if retry < self.max_retries - 1:
+                await asyncio.sleep(1)
+        return None, status_text, None, None
+
+    async def _request_series(self, keyword: str) -> Optional[KeywordSeries]:
+        from .fetcher import WeiboThrottled
+
+        async def request():
+            try:
+                status, text = await self._get("/getrankhistory", {"name": self.fetcher.encrypt(keyword)})
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                # 与线程引擎一致，连接错误和超时按可重试处理
+                raise requests.ConnectionError(str(e)) from e
+            if status >= 400:
+                # 带 status_code 的异常交由限速器判断是否为 429 / 5xx
+                error = RuntimeError(f"HTTP {status}")
+                error.status_code = status
+                raise error
+            if status != 200:
+                return None
+            if "Invalid" in text or "Code:DCE" in text:
+                raise WeiboThrottled(text[:50])
+            return await self._decrypt(text)
+
+        history_data = self.fetcher._cache_get("getrankhistory", keyword, closed_on=self.closed_on)
+        if history_data is None:
+            history_data = await self.limiter.acall(request)
+            if not history_data or not isinstance(history_data, list) or len(history_data) != 3:
+                return None
+            self.fetcher._cache_put("getrankhistory", keyword, history_data)
+        return KeywordSeries(*history_data)
+
+    async def fetch_keyword_history(self, keyword: str, date_str: str) -> Optional[Dict[str, Any]]:
+        """同一关键词在整次抓取中只请求一次，并发访问共享同一个任务"""
+        task = self._series.get(keyword)
+        if task is None:
+            task = asyncio.ensure_future(self._request_series(keyword))
+            self._series[keyword] = task
+        else:
+            self._series_reused += 1
+        try:
+            series = await asyncio.shield(task)
+        except OfflineCacheMiss:
+            # 离线回放缺少历史时立即失败，不把历史记为缺失
+            raise
+        except Exception:
+            # 失败不缓存，后续日期可以重新请求
+            if self._series.get(keyword) is task:
+                del self._series[keyword]
+            return None
+        if series is None:
+            # 无效数据同样不缓存
+            if self._series.get(keyword) is task:
+                del self._series[keyword]
+            return None
+        return self.fetcher._day_summary(series, date_str)
+
+    async def fetch_date(self, date_str: str) -> Optional[Any]:
+        data, status, timeid, actual_time = await self.fetch_day(date_str)
+        if not data or not self.with_history:
+            return data
+        histories = await asyncio.gather(*(
+            self.fetch_keyword_history(self.fetcher._keyword_of(item), date_str) for item in data
+        ))
+        return self.fetcher._build_history_result(date_str, timeid, actual_time, data, list(histories))
+
+    async def run(self, dates: List[str], max_pending: int, emit):
+        """
+        抓取所有日期，每完成一天调用一次 emit(date, data)
+
+        Args:
+            dates: 日期列表
+            max_pending: 同时在途的日期上限
+            emit: 协程函数，下游较慢时阻塞在这里，从而暂停新日期的抓取
+        """
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self.closed_on = max(dates, default=None)
+        day_slots = asyncio.Semaphore(max_pending)
+        connector = aiohttp.TCPConnector(limit=self.concurrency)
+        template = self.fetcher.create_session()
+        headers = dict(template.headers)
+        template.close()
+
+        async def one(date_str: str):
+            async with day_slots:
+                if self._cancelled:
+                    return
+                data = await self.fetch_date(date_str)
+                if data:
+                    await emit(date_str, data)
+
+        async with aiohttp.ClientSession(
+            connector=connector, headers=headers, trace_configs=[self._trace_config()]
+        ) as session:
+            self._session = session
+            await asyncio.gather(*(one(d) for d in dates))
+
+        if self.limiter is not None:
+            self.history_stats = self.limiter.snapshot()
+            self.history_stats["keywords"] = len(self._series)
+            self.history_stats["series_reused"] = self._series_reused
+
+    def iter_dates(self, dates: List[str], max_pending: int) -> Iterator[Tuple[str, Any]]:
+        """
+        在后台线程的事件循环中运行 run，并以同步生成器的形式逐日产出结果
+
+        结果经由容量为 max_pending 的队列传递；调用方停止迭代时，尚未开始的日期会被取消。
+        """
+        results: "queue.Queue" = queue.Queue(maxsize=max_pending)
+        errors: List[BaseException] = []
+
+        async def emit(date_str, data):
+            # 队列满时在默认线程池中等待，不阻塞事件循环
+            await asyncio.get_running_loop().run_in_executor(None, results.put, (date_str, data))
+
+        def worker():
+            try:
+                asyncio.run(self.run(list(dates), max_pending, emit))
+            except BaseException as e:
+                errors.append(e)
+            finally:
+                results.put(_DONE)
+
+        thread = threading.Thread(target=worker, name="async-fetch", daemon=True)
+        thread.start()
+        try:
+            while True:
+                item = results.get()
+                if item is _DONE:
+                    break
+                yield item
+        finally:
+            self._cancelled = True
+            # 清空队列，让仍在等待放入结果的任务结束
+            while thread.is_alive():
+                try:
+                    results.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+            thread.join()
+        if errors:
+            raise errors[0]
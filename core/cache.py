@@ -0,0 +1,318 @@
+"""
+分类结果缓存
+内存 LRU + SQLite 持久化的两级缓存，用于避免对同一标题重复调用 DeepSeek。
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import re
+import sqlite3
+import time
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import Future
+from pathlib import Path
+from threading import Lock
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from config.settings import (
+    CACHE_DB_PATH,
+    CACHE_TTL,
+    CACHE_MEMORY_SIZE,
+    CACHE_MAX_ENTRIES,
+)
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_title(title: str) -> str:
+    """
+    归一化标题，用作缓存键和去重键
+
+    全角转半角（NFKC）、去除首尾空白、合并连续空白并统一大小写。
+    """
+    text = unicodedata.normalize("NFKC", str(title))
+    text = _WHITESPACE_RE.sub(" ", text).strip()
+    return text.casefold()
+
+
+def prompt_hash(prompt: str) -> str:
+    """计算提示词的短哈希，提示词变化后旧缓存自动失效"""
+    return hashlib.sha1(prompt.encode("utf-8")).hexdigest()[:12]
+
+
+class TitleDecisionCache:
+    """标题判定结果的两级缓存（内存 LRU + SQLite）"""
+
+    def __init__(
+        self,
+        db_path: Optional[Path] = None,
+        ttl: Optional[float] = None,
+        memory_size: Optional[int] = None,
+        max_entries: Optional[int] = None,
+    ):
+        """
+        初始化缓存
+
+        Args:
+            db_path: SQLite 文件路径，传入 ":memory:" 时仅在进程内持久
+            ttl: 条目有效期（秒），0 或负数表示永不过期
+            memory_size: 内存 LRU 的最大条目数
+            max_entries: 磁盘上保留的最大条目数，超出时按最近访问时间淘汰
+        """
+        self.db_path = str(db_path or CACHE_DB_PATH)
+        self.ttl = CACHE_TTL if ttl is None else ttl
+        self.memory_size = CACHE_MEMORY_SIZE if memory_size is None else memory_size
+        self.max_entries = CACHE_MAX_ENTRIES if max_entries is None else max_entries
+
+        self._memory: "OrderedDict[str, Tuple[Any, Optional[float]]]" = OrderedDict()
+        self._inflight: Dict[str, Future] = {}
+        self._ainflight: Dict[str, asyncio.Future] = {}
+        self._lock = Lock()
+        self._db_lock = Lock()
+        self._writes_since_evict = 0
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "shared": 0}
+
+        if self.db_path != ":memory:":
+            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        with self._db_lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS decisions ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " expires_at REAL,"
+                " last_access REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_decisions_access ON decisions(last_access)"
+            )
+            self._conn.execute(
+                "DELETE FROM decisions WHERE expires_at IS NOT NULL AND expires_at < ?",
+                (time.time(),),
+            )
+            self._conn.commit()
+
+    @staticmethod
+    def make_key(namespace: str, title: str, model: str, prompt: str) -> str:
+        """
+        生成缓存键
+
+        Args:
+            namespace: 调用方命名空间（如 "direct"、"related"）
+            title: 原始标题
+            model: 模型名称
+            prompt: 系统提示词
+
+        Returns:
+            str: 缓存键
+        """
+        return f"{namespace}|{model}|{prompt_hash(prompt)}|{normalize_title(title)}"
+
+    def _expiry(self) -> Optional[float]:
+        return time.time() + self.ttl if self.ttl and self.ttl > 0 else None
+
+    def _memory_get(self, key: str) -> Tuple[bool, Any]:
+        entry = self._memory.get(key)
+        if entry is None:
+            return False, None
+        value, expires_at = entry
+        if expires_at is not None and expires_at < time.time():
+            del self._memory[key]
+            return False, None
+        self._memory.move_to_end(key)
+        return True, value
+
+    def _memory_put(self, key: str, value: Any, expires_at: Optional[float]):
+        self._memory[key] = (value, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def _disk_get(self, key: str) -> Tuple[bool, Any, Optional[float]]:
+        now = time.time()
+        with self._db_lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM decisions WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return False, None, None
+            value_text, expires_at = row
+            if expires_at is not None and expires_at < now:
+                self._conn.execute("DELETE FROM decisions WHERE key = ?", (key,))
+                self._conn.commit()
+                return False, None, None
+            self._conn.execute(
+                "UPDATE decisions SET last_access = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+        return True, json.loads(value_text), expires_at
+
+    def _disk_put(self, key: str, value: Any, expires_at: Optional[float]):
+        value_text = json.dumps(value, ensure_ascii=False)
+        with self._db_lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO decisions (key, value, expires_at, last_access)"
+                " VALUES (?, ?, ?, ?)",
+                (key, value_text, expires_at, time.time()),
+            )
+            self._conn.commit()
+            self._writes_since_evict += 1
+            if self.max_entries and self._writes_since_evict >= 100:
+                self._writes_since_evict = 0
+                self._evict_locked()
+
+    def _evict_locked(self):
+        """按最近访问时间淘汰超出上限的磁盘条目（调用方需持有 _db_lock）"""
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM decisions").fetchone()
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM decisions WHERE key IN ("
+                " SELECT key FROM decisions ORDER BY last_access ASC LIMIT ?)",
+                (overflow,),
+            )
+            self._conn.commit()
+            logger.info(f"缓存淘汰 {overflow} 条最久未访问的记录")
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """
+        查询缓存
+
+        Returns:
+            Tuple[bool, Any]: (是否命中, 缓存值)
+        """
+        with self._lock:
+            hit, value = self._memory_get(key)
+            if hit:
+                self.stats["memory_hits"] += 1
+                return True, value
+
+        hit, value, expires_at = self._disk_get(key)
+        if hit:
+            with self._lock:
+                self._memory_put(key, value, expires_at)
+                self.stats["disk_hits"] += 1
+            return True, value
+        return False, None
+
+    def set(self, key: str, value: Any):
+        """写入缓存（值必须可被 JSON 序列化）"""
+        expires_at = self._expiry()
+        with self._lock:
+            self._memory_put(key, value, expires_at)
+        self._disk_put(key, value, expires_at)
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Any:
+        """
+        查询缓存，未命中时调用 compute 计算并写入
+
+        同一个键的并发查询只会触发一次 compute，其余调用方等待并共享结果。
+        compute 抛出的异常不会被缓存，会原样传递给所有等待方。
+
+        Args:
+            key: 缓存键
+            compute: 计算函数
+
+        Returns:
+            Any: 缓存值或新计算的值
+        """
+        with self._lock:
+            hit, value = self._memory_get(key)
+            if hit:
+                self.stats["memory_hits"] += 1
+                return value
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[key] = future
+            else:
+                self.stats["shared"] += 1
+
+        if not owner:
+            return future.result()
+
+        try:
+            hit, value, expires_at = self._disk_get(key)
+            if hit:
+                with self._lock:
+                    self._memory_put(key, value, expires_at)
+                    self.stats["disk_hits"] += 1
+            else:
+                with self._lock:
+                    self.stats["misses"] += 1
+                value = compute()
+                self.set(key, value)
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    async def aget_or_compute(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        get_or_compute 的异步版本，compute 为返回可等待对象的函数
+
+        同一事件循环中同一个键的并发查询只会触发一次 compute。
+        """
+        with self._lock:
+            hit, value = self._memory_get(key)
+            if hit:
+                self.stats["memory_hits"] += 1
+                return value
+            future = self._ainflight.get(key)
+            owner = future is None
+            if owner:
+                future = asyncio.get_running_loop().create_future()
+                self._ainflight[key] = future
+            else:
+                self.stats["shared"] += 1
+
+        if not owner:
+            return await asyncio.shield(future)
+
+        try:
+            hit, value, expires_at = self._disk_get(key)
+            if hit:
+                with self._lock:
+                    self._memory_put(key, value, expires_at)
+                    self.stats["disk_hits"] += 1
+            else:
+                with self._lock:
+                    self.stats["misses"] += 1
+                value = await compute()
+                self.set(key, value)
+            future.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # 没有其他等待方时避免 asyncio 报告异常未被获取
+            future.exception()
+            raise
+        finally:
+            with self._lock:
+                self._ainflight.pop(key, None)
+
+    def clear(self):
+        """清空内存和磁盘缓存"""
+        with self._lock:
+            self._memory.clear()
+        with self._db_lock:
+            self._conn.execute("DELETE FROM decisions")
+            self._conn.commit()
+
+    def close(self):
+        """关闭 SQLite 连接"""
+        with self._db_lock:
+            self._conn.close()
@@ -1,7 +1,18 @@
+import asyncio
+import json
 import logging
-from typing import Tuple
-from openai import OpenAI
-from config.settings import DEEPSEEK_MODEL, CLASSIFIER_SYSTEM_PROMPT
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+from openai import OpenAI, AsyncOpenAI
+from config.settings import (
+    DEEPSEEK_MODEL,
+    CLASSIFIER_SYSTEM_PROMPT,
+    BATCH_CLASSIFIER_SYSTEM_PROMPT,
+    BATCH_MAX_TOKENS,
+    BATCH_MAX_SIZE,
+)
+from .cache import TitleDecisionCache
+from .rate_limiter import AdaptiveRateLimiter
 
 
 logger = logging.getLogger(__name__)
@@ -10,16 +21,29 @@ logger = logging.getLogger(__name__)
 """标题分类器，用于判断标题是否包含明星信息"""
 class TitleClassifier:
     
-    def __init__(self, client: OpenAI, model: str = None):
+    def __init__(
+        self,
+        client: OpenAI,
+        model: str = None,
+        cache: Optional[TitleDecisionCache] = None,
+        async_client: Optional[AsyncOpenAI] = None,
+        rate_limiter: Optional[AdaptiveRateLimiter] = None
+    ):
         """
         初始化分类器
         
         Args:
             client: OpenAI客户端实例
             model: 使用的模型名称
+            cache: 可选的判定结果缓存，命中时不再调用API
+            async_client: 可选的异步客户端，提供后可使用 aclassify_title / aclassify_titles
+            rate_limiter: 可选的自适应限速器，所有请求经由它限速并在 429/5xx 时退避重试
         """
         self.client = client
         self.model = model or DEEPSEEK_MODEL
+        self.cache = cache
+        self.async_client = async_client
+        self.rate_limiter = rate_limiter
     
     def classify_title(self, title: str) -> Tuple[bool, str]:
         """
@@ -31,36 +55,319 @@ class TitleClassifier:
         Returns:
             Tuple[bool, str]: (是否包含明星, 原始响应)
         """
-        messages = [
-            {"role": "system", "content": CLASSIFIER_SYSTEM_PROMPT},
-            {"role": "user", "content": title},
-        ]
-        
         try:
-            response = self.client.chat.completions.create(
-                model=self.model, 
-                messages=messages, 
-                stream=False
+            if self.cache is None:
+                return self._request_verdict(title)
+
+            is_celeb, text = self.cache.get_or_compute(
+                self._cache_key(title), lambda: list(self._request_verdict(title))
             )
-            text = response.choices[0].message.content.strip().upper()
-            
-            # 解析响应
-            if text.startswith("YES"):
-                return True, text
-            if text.startswith("NO"):
-                return False, text
-            
-            # 回退处理
-            return ("YES" in text), text
+            return bool(is_celeb), text
             
         except Exception as e:
             error_msg = f"API调用失败: {e}"
             logger.error(error_msg)
             return False, f"ERROR: {e}"
+
+    async def aclassify_title(self, title: str) -> Tuple[bool, str]:
+        """classify_title 的异步版本，使用 async_client 发起请求"""
+        try:
+            if self.cache is None:
+                return await self._arequest_verdict(title)
+
+            async def compute():
+                return list(await self._arequest_verdict(title))
+
+            is_celeb, text = await self.cache.aget_or_compute(self._cache_key(title), compute)
+            return bool(is_celeb), text
+
+        except Exception as e:
+            logger.error(f"API调用失败: {e}")
+            return False, f"ERROR: {e}"
+
+    def _cache_key(self, title: str) -> str:
+        return self.cache.make_key("direct", title, self.model, CLASSIFIER_SYSTEM_PROMPT)
+
+    def _batch_cache_key(self, title: str) -> str:
+        return self.cache.make_key("batch", title, self.model, BATCH_CLASSIFIER_SYSTEM_PROMPT)
+
+    def _create(self, **kwargs):
+        """发起 chat completion 请求，配置了限速器时经由限速器调用"""
+        if self.rate_limiter is None:
+            return self.client.chat.completions.create(**kwargs)
+        return self.rate_limiter.call(self.client.chat.completions.create, **kwargs)
+
+    async def _acreate(self, **kwargs):
+        if self.rate_limiter is None:
+            return await self.async_client.chat.completions.create(**kwargs)
+        return await self.rate_limiter.acall(self.async_client.chat.completions.create, **kwargs)
+
+    @staticmethod
+    def _build_messages(title: str) -> List[Dict[str, str]]:
+        return [
+            {"role": "system", "content": CLASSIFIER_SYSTEM_PROMPT},
+            {"role": "user", "content": title},
+        ]
+
+    @staticmethod
+    def _parse_verdict(content: str) -> Tuple[bool, str]:
+        text = content.strip().upper()
+        
+        # 解析响应
+        if text.startswith("YES"):
+            return True, text
+        if text.startswith("NO"):
+            return False, text
+        
+        # 回退处理
+        return ("YES" in text), text
+
+    def _request_verdict(self, title: str) -> Tuple[bool, str]:
+        """调用API获取单个标题的判定结果，异常由调用方处理"""
+        response = self._create(
+            model=self.model,
+            messages=self._build_messages(title),
+            stream=False
+        )
+        return self._parse_verdict(response.choices[0].message.content)
+
+    async def _arequest_verdict(self, title: str) -> Tuple[bool, str]:
+        response = await self._acreate(
+            model=self.model,
+            messages=self._build_messages(title),
+            stream=False
+        )
+        return self._parse_verdict(response.choices[0].message.content)
     
+    @staticmethod
+    def estimate_tokens(title: str) -> int:
+        """粗略估算一行标题占用的 token 数（中文按每字一个 token，加上编号和换行的开销）"""
+        return len(title) + 4
+
+    def pack_batches(
+        self,
+        titles: List[str],
+        max_tokens: Optional[int] = None,
+        max_size: Optional[int] = None
+    ) -> List[List[int]]:
+        """
+        按 token 预算把标题划分为若干批
+
+        Args:
+            titles: 标题列表
+            max_tokens: 每批标题部分的估算 token 上限
+            max_size: 每批最多包含的标题数
+
+        Returns:
+            List[List[int]]: 每批包含的标题下标
+        """
+        max_tokens = max_tokens or BATCH_MAX_TOKENS
+        max_size = max_size or BATCH_MAX_SIZE
+        batches, current, used = [], [], 0
+
+        for idx, title in enumerate(titles):
+            cost = self.estimate_tokens(title)
+            if current and (used + cost > max_tokens or len(current) >= max_size):
+                batches.append(current)
+                current, used = [], 0
+            current.append(idx)
+            used += cost
+
+        if current:
+            batches.append(current)
+        return batches
+
+    @staticmethod
+    def _build_batch_messages(titles: List[str]) -> List[Dict[str, str]]:
+        lines = "\n".join(f"{i}. {title}" for i, title in enumerate(titles))
+        return [
+            {"role": "system", "content": BATCH_CLASSIFIER_SYSTEM_PROMPT},
+            {"role": "user", "content": lines},
+        ]
+
+    @staticmethod
+    def _parse_batch_verdicts(content: str, count: int) -> Dict[int, bool]:
+        """
+        解析批量响应，只保留能与编号对应上的判定结果
+
+        缺失、重复或格式错误的条目不会出现在返回值中，由调用方回退到单条判断。
+        """
+        payload = json.loads(content)
+        entries = payload.get("results") if isinstance(payload, dict) else payload
+        if not isinstance(entries, list):
+            raise ValueError(f"批量响应缺少 results 列表: {payload}")
+
+        verdicts: Dict[int, bool] = {}
+        duplicated = set()
+        for entry in entries:
+            if not isinstance(entry, dict):
+                continue
+            idx = entry.get("index")
+            verdict = str(entry.get("verdict", "")).strip().upper()
+            if not isinstance(idx, int) or isinstance(idx, bool) or not 0 <= idx < count:
+                continue
+            if verdict not in ("YES", "NO"):
+                continue
+            if idx in verdicts:
+                duplicated.add(idx)
+                continue
+            verdicts[idx] = verdict == "YES"
+
+        for idx in duplicated:
+            verdicts.pop(idx, None)
+        return verdicts
+
+    def _request_batch_verdicts(self, titles: List[str]) -> Dict[int, bool]:
+        """一次请求判断多个标题，返回能与编号对应上的判定结果"""
+        response = self._create(
+            model=self.model,
+            messages=self._build_batch_messages(titles),
+            response_format={"type": "json_object"},
+            stream=False
+        )
+        return self._parse_batch_verdicts(response.choices[0].message.content, len(titles))
+
+    async def _arequest_batch_verdicts(self, titles: List[str]) -> Dict[int, bool]:
+        response = await self._acreate(
+            model=self.model,
+            messages=self._build_batch_messages(titles),
+            response_format={"type": "json_object"},
+            stream=False
+        )
+        return self._parse_batch_verdicts(response.choices[0].message.content, len(titles))
+
+    def _lookup_cached(self, titles: List[str]) -> Tuple[List[Optional[Tuple[bool, str]]], List[int]]:
+        """批量模式的缓存预查，返回 (已命中的结果, 未命中的下标)"""
+        results: List[Optional[Tuple[bool, str]]] = [None] * len(titles)
+        pending = []
+
+        for idx, title in enumerate(titles):
+            if self.cache is not None:
+                hit, value = self.cache.get(self._batch_cache_key(title))
+                if hit:
+                    results[idx] = (bool(value[0]), value[1])
+                    continue
+            pending.append(idx)
+        return results, pending
+
+    def _apply_batch_verdicts(
+        self,
+        titles: List[str],
+        batch_indices: List[int],
+        verdicts: Dict[int, bool],
+        results: List[Optional[Tuple[bool, str]]]
+    ) -> List[int]:
+        """写入批量判定结果并返回需要回退到单条判断的下标"""
+        missing = []
+        for pos, idx in enumerate(batch_indices):
+            if pos not in verdicts:
+                logger.info(f"批量响应缺少第 {pos} 条，单独判断: {titles[idx][:50]}")
+                missing.append(idx)
+                continue
+            is_celeb = verdicts[pos]
+            results[idx] = (is_celeb, "YES" if is_celeb else "NO")
+            if self.cache is not None:
+                self.cache.set(self._batch_cache_key(titles[idx]), [is_celeb, results[idx][1]])
+        return missing
+
+    def classify_titles(
+        self,
+        titles: List[str],
+        delay: float = 0,
+        max_tokens: Optional[int] = None,
+        max_size: Optional[int] = None,
+        progress: Optional[Callable[[int], None]] = None
+    ) -> List[Tuple[bool, str]]:
+        """
+        批量模式：把多个标题打包进一次请求进行判断
+
+        已缓存的标题直接返回；批量响应中缺失或格式错误的条目回退到单条调用。
+
+        Args:
+            titles: 标题列表
+            delay: 每次批量请求之间的延迟（秒），配置了限速器时忽略
+            max_tokens: 每批标题部分的估算 token 上限
+            max_size: 每批最多包含的标题数
+            progress: 进度回调，每完成若干标题时以完成数量调用
+
+        Returns:
+            List[Tuple[bool, str]]: 与输入顺序一致的 (是否包含明星, 原始响应)
+        """
+        results, pending = self._lookup_cached(titles)
+        if progress and len(pending) < len(titles):
+            progress(len(titles) - len(pending))
+
+        batches = self.pack_batches([titles[i] for i in pending], max_tokens, max_size)
+        for n, batch in enumerate(batches):
+            batch_indices = [pending[i] for i in batch]
+
+            try:
+                verdicts = self._request_batch_verdicts([titles[i] for i in batch_indices])
+            except Exception as e:
+                logger.warning(f"批量请求失败，回退到逐条判断: {e}")
+                verdicts = {}
+
+            for idx in self._apply_batch_verdicts(titles, batch_indices, verdicts, results):
+                results[idx] = self.classify_title(titles[idx])
+
+            if progress:
+                progress(len(batch_indices))
+            # 配置了自适应限速器时由限速器控制节奏，不再使用固定延迟
+            if n < len(batches) - 1 and delay > 0 and self.rate_limiter is None:
+                time.sleep(delay)
+
+        return results
+
+    async def aclassify_titles(
+        self,
+        titles: List[str],
+        semaphore: Optional[asyncio.Semaphore] = None,
+        max_tokens: Optional[int] = None,
+        max_size: Optional[int] = None,
+        progress: Optional[Callable[[int], None]] = None
+    ) -> List[Tuple[bool, str]]:
+        """
+        classify_titles 的异步版本：各批请求并发执行
+
+        Args:
+            titles: 标题列表
+            semaphore: 限制同时进行的请求数，为 None 时不限制
+            max_tokens: 每批标题部分的估算 token 上限
+            max_size: 每批最多包含的标题数
+            progress: 进度回调，每完成若干标题时以完成数量调用
+
+        Returns:
+            List[Tuple[bool, str]]: 与输入顺序一致的 (是否包含明星, 原始响应)
+        """
+        semaphore = semaphore or asyncio.Semaphore(len(titles) or 1)
+        results, pending = self._lookup_cached(titles)
+        if progress and len(pending) < len(titles):
+            progress(len(titles) - len(pending))
+
+        async def single(idx: int):
+            async with semaphore:
+                results[idx] = await self.aclassify_title(titles[idx])
+
+        async def run_batch(batch_indices: List[int]):
+            try:
+                async with semaphore:
+                    verdicts = await self._arequest_batch_verdicts([titles[i] for i in batch_indices])
+            except Exception as e:
+                logger.warning(f"批量请求失败，回退到逐条判断: {e}")
+                verdicts = {}
+
+            missing = self._apply_batch_verdicts(titles, batch_indices, verdicts, results)
+            await asyncio.gather(*(single(idx) for idx in missing))
+            if progress:
+                progress(len(batch_indices))
+
+        batches = self.pack_batches([titles[i] for i in pending], max_tokens, max_size)
+        await asyncio.gather(*(run_batch([pending[i] for i in batch]) for batch in batches))
+        return results
+
     def batch_classify(self, titles: list, delay: float = 0.5) -> list:
         """
-        批量分类多个标题
+        批量分类多个标题（使用批量模式，多个标题共用一次请求）
         
         Args:
             titles: 标题列表
@@ -69,15 +376,6 @@ class TitleClassifier:
         Returns:
             list: 分类结果列表，每个元素为(标题, 是否包含明星, 原始响应)
         """
-        import time
-        results = []
-        
-        for i, title in enumerate(titles, 1):
-            logger.info(f"正在处理第 {i}/{len(titles)} 个标题: {title[:50]}...")
-            is_celeb, resp = self.classify_title(title)
-            results.append((title, is_celeb, resp))
-            
-            if i < len(titles) and delay > 0:
-                time.sleep(delay)
-        
-        return results
\ No newline at end of file
+        logger.info(f"正在批量处理 {len(titles)} 个标题...")
+        verdicts = self.classify_titles(titles, delay=delay)
+        return [(title, is_celeb, resp) for title, (is_celeb, resp) in zip(titles, verdicts)]
@@ -1,9 +1,21 @@
 import json
 import logging
-from typing import Any, Dict, List, Tuple, Optional
+from collections.abc import Mapping
+from typing import Any, Dict, Iterable, Iterator, List, Tuple, Optional
 from pathlib import Path
 from .classifier import TitleClassifier
 from .related_classifier import RelatedCelebrityClassifier
+from .async_engine import AsyncClassificationEngine, progress_callback
+from .gazetteer import CelebrityGazetteer
+from .prefilter import NegativeRuleFilter
+from .cache import normalize_title
+from .journal import DecisionJournal, STATUS_DROPPED, STATUS_ERROR, STATUS_KEPT
+from .history_store import expand_history
+from .record_view import RecordView, json_default
+from config.settings import STREAM_CHUNK_SIZE
+from utils.json_stream import CONTAINER_KEYS, RecordStream, iter_json_records
+from utils.json_writer import write_json_atomic
+from utils.compression import open_text
 from tqdm import tqdm
 import time
 
@@ -12,6 +24,10 @@ logger = logging.getLogger(__name__)
 
 class DataProcessor:
     """数据处理类，负责JSON文件的读取、处理和保存"""
+
+    def __init__(self):
+        # 最近一次 process_records / process_batches 的统计信息（总数、不同标题数、预过滤命中数等）
+        self.last_stats: Dict[str, int] = {}
     
     @staticmethod
     def extract_title_from_item(item: Dict[str, Any]) -> Optional[str]:
@@ -29,7 +45,7 @@ class DataProcessor:
         Returns:
             Optional[str]: 提取到的标题，如果未找到则返回None
         """
-        if not isinstance(item, dict):
+        if not isinstance(item, Mapping):
             return None
 
         # 优先 Weibo 格式的字段
@@ -73,53 +89,61 @@ class DataProcessor:
             ValueError: 文件结构不支持
         """
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
+            with open_text(file_path) as f:
                 data = json.load(f)
         except (json.JSONDecodeError, UnicodeDecodeError) as e:
             logger.error(f"无法解析JSON文件 {file_path}: {e}")
             raise
 
+        return DataProcessor.extract_records(data)
+
+    @staticmethod
+    def extract_records(data: Any) -> Tuple[Optional[List], Optional[str], Dict]:
+        """
+        从已加载的数据中提取记录列表，支持的结构与 load_json_file 相同
+
+        用于数据已经在内存中的场景（如抓取结果直接交给处理器），避免写盘后再读回。
+
+        Args:
+            data: 已解析的JSON数据
+
+        Returns:
+            Tuple[Optional[List], Optional[str], Dict]:
+                (记录列表, 容器键名 or 'by_date' 表示按日期展开, 原始数据)
+
+        Raises:
+            ValueError: 数据结构不支持
+        """
         # 如果顶层是列表，直接返回
         if isinstance(data, list):
             return data, None, data
 
         # 顶层是字典，可能为按日期索引的结构
         if isinstance(data, dict):
+            # 顶层直接带常见容器键（如 {"items": [...]}）时不是日期索引，与 iter_json_records 保持一致
+            for key in CONTAINER_KEYS:
+                if key in data and isinstance(data[key], list):
+                    return data[key], key, data
+
             # 检查是否为日期索引（每个值是 dict 或 list 包含 items）
-            # 如果发现 date-like 结构，则展开
+            # 如果发现 date-like 结构，则展开；记录以视图形式引用原始数据，不复制
             expanded = []
             found_date_structure = False
 
             for key, value in data.items():
                 # 忽略非日期和元数据项（例如：metadata 等）——但我们只要能找到 items/list 就处理
                 if isinstance(value, dict) and 'items' in value and isinstance(value['items'], list):
-                    for it in value['items']:
-                        if isinstance(it, dict):
-                            new_item = dict(it)
-                        else:
-                            new_item = {'raw_data': it}
-                        new_item['_source_date'] = key
-                        expanded.append(new_item)
-                    found_date_structure = True
+                    items = value['items']
                 elif isinstance(value, list):
-                    for it in value:
-                        if isinstance(it, dict):
-                            new_item = dict(it)
-                        else:
-                            new_item = {'raw_data': it}
-                        new_item['_source_date'] = key
-                        expanded.append(new_item)
-                    found_date_structure = True
+                    items = value
+                else:
+                    continue
+                expanded.extend(RecordView(it, key, i) for i, it in enumerate(items))
+                found_date_structure = True
 
             if found_date_structure:
                 return expanded, 'by_date', data
 
-            # 否则按原有逻辑查找常见键名
-            container_keys = ["items", "data", "rows", "trends", "results", "records"]
-            for key in container_keys:
-                if key in data and isinstance(data[key], list):
-                    return data[key], key, data
-
             # 回退：查找第一个列表值
             for key, value in data.items():
                 if isinstance(value, list):
@@ -130,82 +154,389 @@ class DataProcessor:
 
         raise ValueError("不支持的JSON顶层结构")
     
+    @staticmethod
+    def iter_json_records(file_path: Path) -> RecordStream:
+        """
+        以流的方式读取JSON文件中的记录，支持的格式与 load_json_file 相同
+
+        内存占用以单条记录为上限；迭代结束后可从返回对象的 container_key 和
+        skeleton 属性取得容器键与（不含记录的）原始结构。
+
+        Args:
+            file_path: JSON文件路径
+
+        Returns:
+            RecordStream: 可迭代一次的记录流
+        """
+        return iter_json_records(file_path)
+
+    @staticmethod
+    def _iter_chunks(records: Iterable, size: int) -> Iterator[List]:
+        chunk = []
+        for item in records:
+            chunk.append(item)
+            if len(chunk) >= size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    @staticmethod
+    def _classify_direct_batched(
+        classifier,
+        titles: List[Optional[str]],
+        delay: float
+    ) -> Optional[List[Tuple[bool, str]]]:
+        """
+        阶段一的批量判断：多个标题共用一次请求
+
+        Args:
+            classifier: 分类器实例
+            titles: 待判断的标题（不需要判断的为 None）
+            delay: 批量请求之间的延迟
+
+        Returns:
+            Optional[List[Tuple[bool, str]]]: 与 titles 一一对应的判定结果；
+                分类器不支持批量模式时返回 None，由调用方逐条判断
+        """
+        if not hasattr(classifier, 'classify_titles'):
+            return None
+
+        indices = [i for i, title in enumerate(titles) if title]
+        results: List[Tuple[bool, str]] = [(False, "")] * len(titles)
+
+        with tqdm(total=len(indices), desc="批量判断", unit="条", ncols=80, leave=False) as bar:
+            verdicts = classifier.classify_titles(
+                [titles[i] for i in indices],
+                delay=delay,
+                progress=progress_callback(bar, getattr(classifier, 'rate_limiter', None))
+            )
+        for i, verdict in zip(indices, verdicts):
+            results[i] = verdict
+        return results
+
+    def _decide_titles(
+        self,
+        new_titles: List[str],
+        decisions: Dict[str, Dict[str, Any]],
+        direct_classifier,
+        related_classifier,
+        delay: float,
+        concurrency: int,
+        gazetteer: Optional[CelebrityGazetteer],
+        negative_filter: Optional[NegativeRuleFilter]
+    ):
+        """
+        为一批尚未判断过的不同标题生成判定结果，写入 decisions（键为归一化标题）
+
+        判定结果可能包含：gazetteer（词典命中的姓名）、rule（命中的负向规则）、
+        direct（直接判断结果）、related（关联明星推断结果）。顺序模式下 direct /
+        related 可能留空，由调用方在组装结果时逐条补齐。
+        """
+        pending: List[Optional[str]] = []
+        for title in new_titles:
+            decision: Dict[str, Any] = {}
+            decisions[normalize_title(title)] = decision
+
+            # --- 阶段零：明星词典预过滤，命中的标题不再调用API ---
+            name = gazetteer.match(title) if gazetteer is not None else None
+            if name:
+                decision["gazetteer"] = name
+                pending.append(None)
+                continue
+
+            # 负向规则：明显与明星无关的话题直接丢弃
+            rule = negative_filter.match(title) if negative_filter is not None else None
+            if rule:
+                decision["rule"] = rule
+                pending.append(None)
+                continue
+            pending.append(title)
+
+        if not any(pending):
+            return
+
+        if concurrency > 1 and AsyncClassificationEngine.supports(direct_classifier):
+            # 异步引擎并发完成两个阶段的判断
+            engine = AsyncClassificationEngine(direct_classifier, related_classifier, concurrency)
+            direct_results, related_results = engine.run(pending)
+            for pos, title in enumerate(pending):
+                if title:
+                    decision = decisions[normalize_title(title)]
+                    decision["direct"] = direct_results[pos]
+                    if pos in related_results:
+                        decision["related"] = related_results[pos]
+        else:
+            # 分类器支持批量模式时，先把所有标题打包批量判断；否则在组装结果时逐个判断
+            direct_results = self._classify_direct_batched(direct_classifier, pending, delay)
+            if direct_results is not None:
+                for pos, title in enumerate(pending):
+                    if title:
+                        decisions[normalize_title(title)]["direct"] = direct_results[pos]
+
     def process_file(
         self,
         input_path: Path,
         classifier,
         delay: float = 0.5,
-        enhance_model = False
+        enhance_model = False,
+        concurrency: int = 1,
+        gazetteer: Optional[CelebrityGazetteer] = None,
+        negative_filter: Optional[NegativeRuleFilter] = None,
+        chunk_size: Optional[int] = None,
+        journal: Optional[DecisionJournal] = None
     ) -> Tuple[List, int, int]:
         """
         处理文件，过滤包含明星的条目
-        
+
+        文件以流的方式读取，每读满 chunk_size 条记录就开始分类，不必等待整个文件解析完成。
+        需要回写原始结构时，可先调用 iter_json_records 取得记录流并传给 process_records，
+        结束后使用记录流的 skeleton / container_key 保存结果，整个过程只解析一次文件。
+
         Args:
             input_path: 输入文件路径
+            其余参数同 process_records
+
+        Returns:
+            Tuple[List, int, int]: (过滤后的记录, 总记录数, 保留记录数)
+        """
+        return self.process_records(
+            self.iter_json_records(input_path),
+            classifier,
+            delay=delay,
+            enhance_model=enhance_model,
+            concurrency=concurrency,
+            gazetteer=gazetteer,
+            negative_filter=negative_filter,
+            chunk_size=chunk_size,
+            journal=journal
+        )
+
+    def process_records(
+        self,
+        records: Iterable[Dict[str, Any]],
+        classifier,
+        delay: float = 0.5,
+        enhance_model = False,
+        concurrency: int = 1,
+        gazetteer: Optional[CelebrityGazetteer] = None,
+        negative_filter: Optional[NegativeRuleFilter] = None,
+        chunk_size: Optional[int] = None,
+        journal: Optional[DecisionJournal] = None
+    ) -> Tuple[List, int, int]:
+        """
+        处理已加载（或流式读取）的记录，过滤包含明星的条目
+
+        每凑满 chunk_size 条记录就开始分类，records 可以是列表，也可以是 RecordStream 等迭代器。
+        
+        Args:
+            records: 记录列表或迭代器（如 extract_records / iter_json_records 的结果）
             classifier: 分类器实例
-            delay: API请求之间的延迟
+            delay: API请求之间的延迟（仅顺序模式使用）
+            enhance_model: 是否启用关联明星推断
+            concurrency: 最大并发请求数；大于 1 且分类器配置了异步客户端时使用异步引擎
+            gazetteer: 可选的明星词典，命中的标题直接保留而不调用API，处理结束后从结果中学习新姓名
+            negative_filter: 可选的负向规则过滤器，命中的标题直接丢弃而不调用API（在词典之后执行）
+            chunk_size: 每批分类的记录数，默认使用 STREAM_CHUNK_SIZE
+            journal: 可选的决策日志，用于崩溃后恢复（见 process_batches）
             
         Returns:
             Tuple[List, int, int]: (过滤后的记录, 总记录数, 保留记录数)
         """
-        # 加载数据
-        records, container_key, original_data = self.load_json_file(input_path)
+        return self.process_batches(
+            self._iter_chunks(records, chunk_size or STREAM_CHUNK_SIZE),
+            classifier,
+            delay=delay,
+            enhance_model=enhance_model,
+            concurrency=concurrency,
+            gazetteer=gazetteer,
+            negative_filter=negative_filter,
+            journal=journal
+        )
+
+    def process_batches(
+        self,
+        batches: Iterable[List[Dict[str, Any]]],
+        classifier,
+        delay: float = 0.5,
+        enhance_model = False,
+        concurrency: int = 1,
+        gazetteer: Optional[CelebrityGazetteer] = None,
+        negative_filter: Optional[NegativeRuleFilter] = None,
+        journal: Optional[DecisionJournal] = None
+    ) -> Tuple[List, int, int]:
+        """
+        按批处理记录：每取到一批就立即分类，适合边抓取边过滤的流水线
+
+        batches 通常是生成器（例如每抓完一天产出当天的记录），处理器只在处理完
+        当前批次后才会拉取下一批，因此生产方可以据此施加背压。
+
+        Args:
+            batches: 记录批次的可迭代对象
+            journal: 可选的决策日志，每条记录处理完立即落盘；日志中已有决策的记录直接复用，
+                不再调用API（调用失败的记录除外）
+            其余参数同 process_records
+
+        Returns:
+            Tuple[List, int, int]: (过滤后的记录, 总记录数, 保留记录数)
+        """
         filtered = []
-        total = len(records)
+        total = 0
+        errors = 0
+        resumed = 0
 
         # 使用传入的分类器作为直接分类器
         direct_classifier = classifier
         related_classifier = None
         if enhance_model:
             # RelatedCelebrityClassifier 需要底层 client（如 OpenAI 客户端），使用 classifier.client
-            related_classifier = RelatedCelebrityClassifier(getattr(classifier, 'client', None))
-        
-        # 创建tqdm进度条迭代器
-        progress_bar = tqdm(records, desc="正在过滤", unit="条", ncols=80)
+            related_classifier = RelatedCelebrityClassifier(
+                getattr(classifier, 'client', None),
+                cache=getattr(classifier, 'cache', None),
+                async_client=getattr(classifier, 'async_client', None),
+                rate_limiter=getattr(classifier, 'rate_limiter', None)
+            )
+
+        # 归一化标题 -> 判定结果；同一标题（如连续多天上榜）只判断一次，结果分发到每条记录
+        decisions: Dict[str, Dict[str, Any]] = {}
+
+        # 创建tqdm进度条（流式读取时总数未知）
+        progress_bar = tqdm(desc="正在过滤", unit="条", ncols=80)
+
+        for chunk in batches:
+            titles = [self.extract_title_from_item(item) for item in chunk]
+            # 日志中已有决策的记录直接复用
+            previous = [
+                journal.lookup(total + offset, title) if journal is not None and title else None
+                for offset, title in enumerate(titles)
+            ]
+
+            new_titles, seen = [], set()
+            for title, entry in zip(titles, previous):
+                if title and entry is None:
+                    key = normalize_title(title)
+                    if key not in decisions and key not in seen:
+                        seen.add(key)
+                        new_titles.append(title)
+            self._decide_titles(
+                new_titles, decisions, direct_classifier, related_classifier,
+                delay, concurrency, gazetteer, negative_filter
+            )
+
+            for item, title, entry in zip(chunk, titles, previous):
+                index = total
+                total += 1
+                progress_bar.update(1)
+                if not title:
+                    progress_bar.set_postfix_str('跳过: 无标题', refresh=False)
+                    continue
 
-        for item in progress_bar:
-            title = self.extract_title_from_item(item)
-            if not title:
-                progress_bar.set_postfix_str('跳过: 无标题', refresh=False)
-                continue
+                if entry is not None:
+                    resumed += 1
+                    if entry["status"] == STATUS_KEPT:
+                        filtered.append(entry["record"])
+                    progress_bar.set_postfix_str(f"已恢复: {entry['reason']}", refresh=False)
+                    continue
+
+                decision = decisions[normalize_title(title)]
+
+                output_item = None
+                current_reason = ""
+                error = None
+
+                # 保留的记录以视图表示：引用源记录，新增字段写入覆盖层
+                if "gazetteer" in decision:
+                    output_item = RecordView(item, overlay={
+                        "filter_reason": "gazetteer_celebrity",
+                        "matched_celebrity": decision["gazetteer"],
+                    })
+                    current_reason = f"词典命中: {decision['gazetteer'][:15]}"
+
+                elif "rule" in decision:
+                    current_reason = f"规则丢弃: {decision['rule']}"
 
-            output_item = None
-            current_reason = ""
-
-            # --- 阶段一：直接明星判断 ---
-            is_celeb, _ = direct_classifier.classify_title(title)
-            if is_celeb:
-                output_item = dict(item)  # 创建副本
-                output_item["filter_reason"] = "direct_celebrity"
-                current_reason = f"直接明星: {title[:15]}..."
-
-            # --- 阶段二：关联明星推断 ---
-            elif enhance_model and related_classifier:
-                related_result = related_classifier.infer_related_celebrity(title)
-                if related_result and related_result.get("name"):
-                    # 成功推断出关联明星，创建新条目
-                    output_item = dict(item)
-                    output_item["original_title"] = title  # 保留原始标题
-                    output_item["title"] = related_result["name"]  # 替换为关联明星
-                    output_item["filter_reason"] = "inferred_celebrity"
-                    output_item["inference_reasoning"] = related_result.get("reasoning", "")
-                    current_reason = f"推断为: {related_result['name'][:15]}..."
                 else:
-                    # 无法推断，丢弃
-                    current_reason = "丢弃: 无关联明星"
-            else:
-                # 非增强模式，且非直接明星 -> 丢弃
-                current_reason = "丢弃: 非明星主题"
-
-            # 4. 更新进度条信息并收集结果
-            progress_bar.set_postfix_str(current_reason, refresh=False)
-            if output_item:
-                filtered.append(output_item)
-                # 可选：添加微小延迟，使进度条更平滑（对API延迟影响可忽略）
-                # time.sleep(delay * 0.05)
+                    # --- 阶段一：直接明星判断 ---
+                    if decision.get("direct") is None:
+                        decision["direct"] = direct_classifier.classify_title(title)
+                    is_celeb, text = decision["direct"]
+                    if text.startswith("ERROR:"):
+                        # 调用失败与真实的 NO 判定分开记录，恢复时重新处理
+                        error = text
+                        current_reason = "失败: 直接判断"
+                    elif is_celeb:
+                        output_item = RecordView(item, overlay={"filter_reason": "direct_celebrity"})
+                        current_reason = f"直接明星: {title[:15]}..."
+
+                    # --- 阶段二：关联明星推断 ---
+                    elif enhance_model and related_classifier:
+                        if "related" not in decision:
+                            decision["related"] = related_classifier.infer_related_celebrity(title)
+                        related_result = decision["related"]
+                        if related_result and related_result.get("error"):
+                            error = f"ERROR: {related_result['error']}"
+                            current_reason = "失败: 关联推断"
+                        elif related_result and related_result.get("name"):
+                            # 成功推断出关联明星，创建新条目
+                            output_item = RecordView(item, overlay={
+                                "original_title": title,  # 保留原始标题
+                                "title": related_result["name"],  # 替换为关联明星
+                                "filter_reason": "inferred_celebrity",
+                                "inference_reasoning": related_result.get("reasoning", ""),
+                            })
+                            current_reason = f"推断为: {related_result['name'][:15]}..."
+                        else:
+                            # 无法推断，丢弃
+                            current_reason = "丢弃: 无关联明星"
+                    else:
+                        # 非增强模式，且非直接明星 -> 丢弃
+                        current_reason = "丢弃: 非明星主题"
+
+                # 4. 更新进度条信息并收集结果
+                progress_bar.set_postfix_str(current_reason, refresh=False)
+                if output_item:
+                    filtered.append(output_item)
+                if error:
+                    errors += 1
+
+                if journal is not None:
+                    if error:
+                        journal.record(index, title, STATUS_ERROR, error)
+                    elif output_item:
+                        journal.record(index, title, STATUS_KEPT, current_reason, output_item)
+                    else:
+                        journal.record(index, title, STATUS_DROPPED, current_reason)
+
+            if journal is not None:
+                journal.sync()
 
         progress_bar.close()
 
+        if gazetteer is not None:
+            gazetteer.learn_from_records(filtered)
+
+        gazetteer_hits = sum(1 for d in decisions.values() if "gazetteer" in d)
+        rule_hits = sum(1 for d in decisions.values() if "rule" in d)
+        logger.info(f"共 {total} 条记录，{len(decisions)} 个不同标题")
+        if gazetteer_hits:
+            logger.info(f"明星词典命中 {gazetteer_hits} 个标题，跳过对应的API调用")
+        if negative_filter is not None:
+            logger.info(negative_filter.report(calls_per_item=2 if enhance_model else 1))
+        if resumed:
+            logger.info(f"从决策日志恢复 {resumed} 条记录")
+        if errors:
+            logger.warning(f"{errors} 条记录的API调用失败，已按丢弃处理；可使用决策日志恢复运行以重试")
+
+        self.last_stats = {
+            "total": total,
+            "unique_titles": len(decisions),
+            "gazetteer_hits": gazetteer_hits,
+            "rule_hits": rule_hits,
+            "resumed": resumed,
+            "errors": errors,
+            "kept": len(filtered),
+        }
+
         # 处理每个记录
         # for idx, item in enumerate(records, 1):
         #     title = self.extract_title_from_item(item)
@@ -226,21 +557,37 @@ class DataProcessor:
         
         return filtered, total, len(filtered)
     
+    @staticmethod
+    def _with_full_history(item: Any) -> Any:
+        """compact 历史转换为 full 格式；视图以覆盖字段替换，不修改源记录"""
+        history = item.get('history') if isinstance(item, Mapping) else None
+        if not isinstance(history, Mapping) or 'series' not in history:
+            return item
+        if isinstance(item, RecordView):
+            return item.derive(history=expand_history(history))
+        return {**item, 'history': expand_history(history)}
+
     def save_filtered_data(
         self,
         filtered_records: List,
         original_data: Dict,
         container_key: Optional[str],
-        output_path: Path
+        output_path: Path,
+        indent: Optional[int] = 2
     ):
         """
-        保存过滤后的数据
+        保存过滤后的数据（逐条流式写入临时文件，完成后原子替换）
 
         兼容多种输入结构：
         - 如果是按日期展开（container_key == 'by_date'），则把结果分配回对应日期下的 `items` 或列表中
         - 如果是普通容器键，则直接替换
         - 如果没有容器键（顶层列表），直接保存列表
+
+        indent 为 None 时使用紧凑格式输出。保留记录中的 compact 历史明细还原为 full 格式，
+        过滤结果的读者不必区分原始数据使用的历史格式。
         """
+        filtered_records = [self._with_full_history(item) for item in filtered_records]
+
         # 构建输出数据结构
         if container_key == 'by_date' and isinstance(original_data, dict):
             out_data = dict(original_data)
@@ -248,16 +595,20 @@ class DataProcessor:
             # 初始化每个日期的目标容器
             for date_key, value in out_data.items():
                 if isinstance(value, dict) and 'items' in value and isinstance(value['items'], list):
-                    out_data[date_key]['items'] = []
+                    # 复制日期层，避免清空调用方仍持有的原始数据
+                    out_data[date_key] = {**value, 'items': []}
                 elif isinstance(value, list):
                     out_data[date_key] = []
                 else:
                     # 保持原样，如果需要可创建 items
                     out_data[date_key] = value
 
-            # 分配每个过滤后的记录
+            # 分配每个过滤后的记录；视图在写出时才合并为字典，来源日期不会写入输出
             for item in filtered_records:
-                src_date = item.pop('_source_date', None)
+                if isinstance(item, RecordView):
+                    src_date = item.date
+                else:
+                    src_date = item.pop('_source_date', None)
                 if not src_date:
                     # 如果没有来源日期，追加到顶层（不常见）
                     continue
@@ -282,7 +633,6 @@ class DataProcessor:
             out_data = filtered_records
 
         # 保存文件
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(out_data, f, ensure_ascii=False, indent=2)
+        write_json_atomic(out_data, Path(output_path), indent=indent, default=json_default)
 
         logger.info(f"已保存过滤后的数据到: {output_path}")
\ No newline at end of file
@@ -0,0 +1,156 @@
+"""
+weibotop 响应解密
+base64 解码、AES-ECB 解密、去填充与 json.loads 都是纯 CPU 工作，在抓取线程中执行时会争用 GIL。
+DecryptPool 把较大的响应（关键词历史）交给进程池解密，抓取线程等待结果期间不占用 GIL；
+每个进程（线程）只创建一次 cipher 对象并复用。
+"""
+import base64
+import json
+import logging
+import multiprocessing
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
+from threading import Lock, local
+from typing import Any, List, Optional, Sequence
+
+from Crypto.Cipher import AES
+from Crypto.Util.Padding import pad, unpad
+
+from config.settings import DECRYPT_BATCH_SIZE, DECRYPT_INLINE_BYTES, DECRYPT_PROCESSES
+
+logger = logging.getLogger(__name__)
+
+# 每个线程按密钥缓存 cipher；ECB 模式没有链式状态，同一对象可以反复加解密
+_local = local()
+# 进程池工作进程的密钥，由 _init_worker 设置
+_worker_key: Optional[bytes] = None
+
+
+def _cipher(key: bytes):
+    ciphers = getattr(_local, "ciphers", None)
+    if ciphers is None:
+        ciphers = _local.ciphers = {}
+    cipher = ciphers.get(key)
+    if cipher is None:
+        cipher = ciphers[key] = AES.new(key, AES.MODE_ECB)
+    return cipher
+
+
+def encrypt_text(key: bytes, plaintext: str) -> str:
+    encrypted = _cipher(key).encrypt(pad(plaintext.encode('utf-8'), AES.block_size))
+    return base64.b64encode(encrypted).decode('utf-8')
+
+
+def decrypt_payload(key: bytes, encrypted_data: str) -> Optional[Any]:
+    """
+    解密一条接口响应并解析 JSON
+
+    Returns:
+        Optional[Any]: 解析后的数据，任何一步失败时返回 None
+    """
+    try:
+        decrypted = _cipher(key).decrypt(base64.b64decode(encrypted_data))
+        return json.loads(unpad(decrypted, AES.block_size).decode('utf-8'))
+    except Exception:
+        return None
+
+
+def _init_worker(key: bytes):
+    global _worker_key
+    _worker_key = key
+
+
+def _decrypt_one(encrypted_data: str) -> Optional[Any]:
+    return decrypt_payload(_worker_key, encrypted_data)
+
+
+def _decrypt_batch(payloads: List[str]) -> List[Optional[Any]]:
+    return [decrypt_payload(_worker_key, payload) for payload in payloads]
+
+
+def resolve_processes(processes: Optional[int] = None) -> int:
+    """解密进程数：None 取 DECRYPT_PROCESSES，0 表示按 CPU 核数自动选择"""
+    if processes is None:
+        processes = DECRYPT_PROCESSES
+    if processes <= 0:
+        processes = os.cpu_count() or 1
+    return processes
+
+
+class DecryptPool:
+    """解密进程池；小于 inline_bytes 的响应直接在调用线程中解密（进程间传输的开销大于解密本身）"""
+
+    def __init__(
+        self,
+        key: bytes,
+        processes: Optional[int] = None,
+        inline_bytes: Optional[int] = None,
+        batch_size: Optional[int] = None
+    ):
+        """
+        Args:
+            key: AES 密钥
+            processes: 工作进程数，默认 DECRYPT_PROCESSES
+            inline_bytes: 小于该长度的响应不进入进程池，默认 DECRYPT_INLINE_BYTES
+            batch_size: decrypt_many 每个任务包含的响应数，默认 DECRYPT_BATCH_SIZE
+        """
+        self.key = key
+        self.processes = resolve_processes(processes)
+        self.inline_bytes = DECRYPT_INLINE_BYTES if inline_bytes is None else inline_bytes
+        self.batch_size = batch_size or DECRYPT_BATCH_SIZE
+        # 不使用 fork：创建进程池时调用方可能已有其他线程（如 tqdm 的监控线程），fork 会复制它们持有的锁
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.processes,
+            mp_context=multiprocessing.get_context("forkserver"),
+            initializer=_init_worker,
+            initargs=(key,)
+        )
+        # 在抓取开始前一次性启动全部工作进程，避免首批任务等待进程启动
+        self._executor.submit(int).result()
+        self._lock = Lock()
+        self.stats = {"inline": 0, "offloaded": 0, "tasks": 0}
+
+    def _count(self, payloads: int, tasks: int):
+        with self._lock:
+            if tasks:
+                self.stats["offloaded"] += payloads
+                self.stats["tasks"] += tasks
+            else:
+                self.stats["inline"] += payloads
+
+    def submit(self, encrypted_data: str) -> Future:
+        """提交一条响应，返回 Future；小响应在当前线程解密并返回已完成的 Future"""
+        if len(encrypted_data) < self.inline_bytes:
+            self._count(1, 0)
+            future = Future()
+            future.set_result(decrypt_payload(self.key, encrypted_data))
+            return future
+        self._count(1, 1)
+        return self._executor.submit(_decrypt_one, encrypted_data)
+
+    def decrypt(self, encrypted_data: str) -> Optional[Any]:
+        return self.submit(encrypted_data).result()
+
+    def decrypt_many(self, payloads: Sequence[str]) -> List[Optional[Any]]:
+        """
+        批量解密，每 batch_size 条响应作为一个任务，减少进程间往返次数
+
+        Returns:
+            List[Optional[Any]]: 与输入顺序一致的解析结果
+        """
+        payloads = list(payloads)
+        batches = [payloads[i:i + self.batch_size] for i in range(0, len(payloads), self.batch_size)]
+        self._count(len(payloads), len(batches))
+        results: List[Optional[Any]] = []
+        for batch_result in self._executor.map(_decrypt_batch, batches):
+            results.extend(batch_result)
+        return results
+
+    def close(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
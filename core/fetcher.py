@@ -1,24 +1,133 @@
-import base64
-import json
 import hashlib
 import time
-from datetime import datetime, timedelta
-from typing import Optional, Tuple, Dict, Any
+from datetime import date as date_cls, datetime, timedelta
+from typing import Optional, Tuple, Dict, Any, Iterator, List
 from urllib.parse import quote
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from threading import Lock
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from threading import Lock, local
 
 import requests
-from Crypto.Cipher import AES
-from Crypto.Util.Padding import unpad, pad
+from requests.adapters import HTTPAdapter
 from tqdm import tqdm
 
-from config.settings import SECRET_KEY
+from config.settings import (
+    SECRET_KEY,
+    WEIBOTOP_BASE_URL,
+    FETCH_ENGINE,
+    HISTORY_FORMAT,
+    HISTORY_BUCKET_MINUTES,
+    HISTORY_RATE_LIMIT_INITIAL,
+    HISTORY_RATE_LIMIT_MIN,
+    HISTORY_RATE_LIMIT_MAX,
+    HISTORY_RATE_LIMIT_MAX_RETRIES,
+)
+from .rate_limiter import AdaptiveRateLimiter, is_retryable
+from .history_store import KeywordHistoryStore, KeywordSeries, json_default
+from .response_cache import OfflineCacheMiss, ResponseCache
+from .decrypt_pool import DecryptPool, decrypt_payload, encrypt_text, resolve_processes
+
+
+class WeiboThrottled(Exception):
+    """weibotop 返回 Invalid / Code:DCE，通常意味着请求过快"""
+
+
+def _is_history_retryable(error: Exception) -> bool:
+    if isinstance(error, (WeiboThrottled, requests.ConnectionError, requests.Timeout)):
+        return True
+    return is_retryable(error)
+
+
+class SessionPool:
+    """每个线程一个长期存活的 Session，所有 Session 共用一个连接池，在整次抓取中复用 TCP/TLS 连接"""
+
+    def __init__(self, factory, pool_size: int = 10):
+        """
+        Args:
+            factory: 创建并配置 Session 的函数
+            pool_size: 连接池大小，应与抓取线程数一致
+        """
+        self._factory = factory
+        self._local = local()
+        self._lock = Lock()
+        self._sessions = []
+        self.adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.stats = {"sessions": 0, "requests": 0, "connections": 0, "reused": 0}
+
+    def get(self) -> requests.Session:
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._factory()
+            session.mount("https://", self.adapter)
+            session.mount("http://", self.adapter)
+            self._local.session = session
+            with self._lock:
+                self._sessions.append(session)
+        return session
+
+    def collect_stats(self) -> Dict[str, int]:
+        """统计连接复用情况：reused 为复用已有连接发出的请求数"""
+        requests_count = connections = 0
+        pools = self.adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is not None:
+                requests_count += pool.num_requests
+                connections += pool.num_connections
+        self.stats.update(
+            sessions=len(self._sessions),
+            requests=requests_count,
+            connections=connections,
+            reused=max(requests_count - connections, 0),
+        )
+        return self.stats
+
+    def close(self):
+        self.collect_stats()
+        with self._lock:
+            for session in self._sessions:
+                session.close()
+            self._sessions.clear()
+        self.adapter.close()
 
 
 class WeiboHotSearchFetcher:
-    def __init__(self, secret_key: Optional[str] = None):
+    def __init__(
+        self,
+        secret_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        engine: Optional[str] = None,
+        response_cache: Optional[ResponseCache] = None,
+        decrypt_processes: Optional[int] = None,
+        history_format: Optional[str] = None,
+        history_bucket_minutes: Optional[int] = None,
+        history_rate: Optional[float] = None
+    ):
+        """
+        Args:
+            secret_key: 接口加解密密钥
+            base_url: 接口地址，默认 WEIBOTOP_BASE_URL（测试时可指向本地桩服务）
+            engine: 批量抓取引擎，"thread" 为线程池，"async" 为 asyncio（需要 aiohttp），默认 FETCH_ENGINE
+            response_cache: 可选的响应缓存；离线模式的缓存会使抓取完全不访问网络
+            decrypt_processes: 抓取历史时的解密进程数，默认 DECRYPT_PROCESSES；为 1 时在抓取线程中解密
+            history_format: 关键词历史明细格式，"full" 或 "compact"，默认 HISTORY_FORMAT
+            history_bucket_minutes: 历史明细降采样时段（分钟），0 表示不降采样，默认 HISTORY_BUCKET_MINUTES
+            history_rate: 历史请求全局限速器的初始与最高速率（请求/秒），
+                默认 HISTORY_RATE_LIMIT_INITIAL / HISTORY_RATE_LIMIT_MAX
+        """
         self.secret_key = secret_key or SECRET_KEY or "tSdGtmwh49BcR1irt18mxG41dGsBuGKS"
+        self.base_url = (base_url or WEIBOTOP_BASE_URL).rstrip("/")
+        self.engine = engine or FETCH_ENGINE
+        self.response_cache = response_cache
+        self.decrypt_processes = resolve_processes(decrypt_processes)
+        self.history_format = history_format or HISTORY_FORMAT
+        self.history_bucket_minutes = HISTORY_BUCKET_MINUTES if history_bucket_minutes is None else history_bucket_minutes
+        self.history_rate = history_rate
+        if self.engine not in ("thread", "async"):
+            raise ValueError(f"未知的抓取引擎: {self.engine}")
+        if self.history_format not in ("full", "compact"):
+            raise ValueError(f"未知的历史格式: {self.history_format}")
+        if self.history_bucket_minutes < 0:
+            raise ValueError(f"降采样时段不能为负数: {self.history_bucket_minutes}")
         sha1_hash = hashlib.sha1(self.secret_key.encode('utf-8')).hexdigest()
         key_hex = sha1_hash[:32]
         try:
@@ -26,6 +135,19 @@ class WeiboHotSearchFetcher:
         except Exception:
             self.aes_key = b"\x00" * 16
         self.lock = Lock()
+        # 抓取期间的共享会话池；不在抓取过程中调用时为 None，每次请求单独建立会话
+        self._session_pool: Optional[SessionPool] = None
+        # 抓取历史时的全局限速器（所有线程共享）
+        self._history_limiter: Optional[AdaptiveRateLimiter] = None
+        # 抓取历史时按关键词缓存完整序列，跨日期复用
+        self._history_store: Optional[KeywordHistoryStore] = None
+        # 本次抓取需要的最后一天，用于判断缓存的历史序列是否已定型
+        self._history_closed_on: Optional[str] = None
+        # 抓取历史时的解密进程池
+        self._decrypt_pool: Optional[DecryptPool] = None
+        self.http_stats: Dict[str, int] = {}
+        self.history_stats: Dict[str, float] = {}
+        self.decrypt_stats: Dict[str, int] = {}
 
     def create_session(self):
         session = requests.Session()
@@ -40,109 +162,174 @@ class WeiboHotSearchFetcher:
         return session
 
     def decrypt_data(self, encrypted_data: str) -> Optional[Any]:
-        try:
-            encrypted_bytes = base64.b64decode(encrypted_data)
-            cipher = AES.new(self.aes_key, AES.MODE_ECB)
-            decrypted = cipher.decrypt(encrypted_bytes)
-            decrypted = unpad(decrypted, AES.block_size)
-            result = decrypted.decode('utf-8')
-            return json.loads(result)
-        except Exception:
-            return None
+        pool = self._decrypt_pool
+        if pool is not None:
+            # 较大的响应交给解密进程，当前线程等待期间释放 GIL
+            return pool.decrypt(encrypted_data)
+        return decrypt_payload(self.aes_key, encrypted_data)
 
     def encrypt(self, plaintext: Optional[str]) -> Optional[str]:
         if plaintext is None:
             return None
-        cipher = AES.new(self.aes_key, AES.MODE_ECB)
-        padded_data = pad(plaintext.encode('utf-8'), AES.block_size)
-        encrypted = cipher.encrypt(padded_data)
-        return base64.b64encode(encrypted).decode('utf-8')
+        return encrypt_text(self.aes_key, plaintext)
+
+    def _open_decrypt_pool(self, with_history: bool):
+        """只有抓取历史（响应较大）且配置了多个进程时才启用解密进程池"""
+        if with_history and self.decrypt_processes > 1:
+            self._decrypt_pool = DecryptPool(self.aes_key, processes=self.decrypt_processes)
+
+    def _close_decrypt_pool(self):
+        pool, self._decrypt_pool = self._decrypt_pool, None
+        if pool is not None:
+            pool.close()
+            self.decrypt_stats = dict(pool.stats, processes=pool.processes)
+
+    def _cache_get(self, endpoint: str, param: Any, closed_on: Optional[str] = None) -> Optional[Any]:
+        """读取响应缓存；离线模式下未命中时抛出 OfflineCacheMiss"""
+        cache = self.response_cache
+        if cache is None:
+            return None
+        data = cache.get(endpoint, param, closed_on)
+        if data is None and cache.offline:
+            raise cache.miss(endpoint, param)
+        return data
+
+    def _cache_put(self, endpoint: str, param: Any, data: Any):
+        if self.response_cache is not None:
+            self.response_cache.put(endpoint, param, data)
 
     def get_timeid_for_date(self, session: requests.Session, date_str: str) -> Tuple[Optional[str], Optional[str]]:
+        cached = self._cache_get("getclosesttime", date_str, closed_on=date_str)
+        if cached is not None:
+            return cached[0], cached[1]
         try:
             timestamp = f"{date_str} 00:00:00"
             encrypted_timestamp = self.encrypt(timestamp)
 
             response = session.get(
-                "https://api.weibotop.cn/getclosesttime",
+                f"{self.base_url}/getclosesttime",
                 params={"timestamp": encrypted_timestamp},
                 timeout=10
             )
 
             if response.status_code == 200:
                 data = response.json()
+                self._cache_put("getclosesttime", date_str, [data[0], data[1]])
                 return data[0], data[1]
             else:
                 return None, None
         except Exception:
             return None, None
 
-    def fetch_keyword_history(self, session: requests.Session, keyword: str, date_str: str) -> Optional[Dict[str, Any]]:
-        try:
-            encrypted_keyword = self.encrypt(keyword)
+    def _get_history_series(self, session: requests.Session, keyword: str) -> Optional[list]:
+        """
+        请求并解密关键词的完整历史序列
 
-            response = session.get(
-                "https://api.weibotop.cn/getrankhistory",
-                params={"name": encrypted_keyword},
-                timeout=10
-            )
+        Raises:
+            WeiboThrottled: 接口返回 Invalid / Code:DCE（请求过快）
+            requests.HTTPError: 429 / 5xx 等错误状态码
+        """
+        encrypted_keyword = self.encrypt(keyword)
 
-            if response.status_code != 200:
-                return None
+        response = session.get(
+            f"{self.base_url}/getrankhistory",
+            params={"name": encrypted_keyword},
+            timeout=10
+        )
 
-            if "Invalid" in response.text or "Code:DCE" in response.text:
-                return None
+        if response.status_code != 200:
+            response.raise_for_status()
+            return None
 
-            history_data = self.decrypt_data(response.text)
-            if not history_data or not isinstance(history_data, list) or len(history_data) != 3:
-                return None
+        if "Invalid" in response.text or "Code:DCE" in response.text:
+            raise WeiboThrottled(response.text[:50])
 
-            timestamps, ranks, hotness = history_data
-            daily_history = []
-            for i, ts in enumerate(timestamps):
-                if ts.startswith(date_str):
-                    daily_history.append({
-                        "time": ts,
-                        "rank": int(ranks[i]),
-                        "hotness": int(hotness[i])
-                    })
-
-            if not daily_history:
-                return None
+        history_data = self.decrypt_data(response.text)
+        if not history_data or not isinstance(history_data, list) or len(history_data) != 3:
+            return None
+        return history_data
+
+    def _request_history_series(self, session: requests.Session, keyword: str) -> Optional[list]:
+        # 缓存条目在本次所需的最后一天结束后抓取时才视为定型
+        closed_on = self._history_closed_on or date_cls.today().isoformat()
+        cached = self._cache_get("getrankhistory", keyword, closed_on=closed_on)
+        if cached is not None:
+            return cached
+
+        limiter = self._history_limiter
+        if limiter is not None:
+            # 全局限速：遇到 Invalid / Code:DCE / 429 / 5xx 时降速并重试
+            history_data = limiter.call(self._get_history_series, session, keyword)
+        else:
+            history_data = self._get_history_series(session, keyword)
+        if history_data is not None:
+            self._cache_put("getrankhistory", keyword, history_data)
+        return history_data
 
-            return {
-                "total_points": len(daily_history),
-                "min_rank": min(d["rank"] for d in daily_history),
-                "max_rank": max(d["rank"] for d in daily_history),
-                "min_hotness": min(d["hotness"] for d in daily_history),
-                "max_hotness": max(d["hotness"] for d in daily_history),
-                "first_time": daily_history[0]["time"],
-                "last_time": daily_history[-1]["time"],
-                "details": daily_history
-            }
+    def fetch_keyword_history(self, session: requests.Session, keyword: str, date_str: str) -> Optional[Dict[str, Any]]:
+        try:
+            store = self._history_store
+            if store is not None:
+                # 同一关键词在整次抓取中只下载一次，各日期从中切片
+                series = store.get(keyword, lambda: self._request_history_series(session, keyword))
+            else:
+                history_data = self._request_history_series(session, keyword)
+                series = KeywordSeries(*history_data) if history_data is not None else None
+            if series is None:
+                return None
+            return self._day_summary(series, date_str)
+        except OfflineCacheMiss:
+            # 离线回放缺少历史时立即失败，不把历史记为缺失
+            raise
         except Exception:
             return None
 
-    def fetch_data_for_date(self, date_str: str, with_history: bool = False, max_retries: int = 3) -> Tuple[Optional[Any], str]:
+    def _day_summary(self, series: KeywordSeries, date_str: str) -> Optional[Dict[str, Any]]:
+        return series.day_summary(
+            date_str, compact=self.history_format == "compact", bucket_minutes=self.history_bucket_minutes
+        )
+
+    def _acquire_session(self) -> Tuple[requests.Session, bool]:
+        """返回 (session, 是否为临时会话)；临时会话由调用方负责关闭"""
+        pool = self._session_pool
+        if pool is not None:
+            return pool.get(), False
+        return self.create_session(), True
+
+    def _fetch_day(self, date_str: str, max_retries: int = 3) -> Tuple[Optional[list], str, Optional[str], Optional[str]]:
+        """
+        抓取某一天的热搜列表（不含关键词历史）
+
+        Returns:
+            Tuple: (热搜列表, 状态说明, timeid, 实际时间)，失败时列表为 None
+
+        Raises:
+            OfflineCacheMiss: 离线模式下缓存中没有该日期的数据
+        """
         for retry in range(max_retries):
-            session = self.create_session()
+            session, temporary = self._acquire_session()
             try:
                 timeid, actual_time = self.get_timeid_for_date(session, date_str)
                 if timeid is None:
                     if retry < max_retries - 1:
                         time.sleep(1)
                         continue
-                    return None, "无法获取timeid"
+                    return None, "无法获取timeid", None, None
+
+                # timeid 对应的快照不会变化，缓存永不过期
+                cached = self._cache_get("currentitems", timeid)
+                if cached is not None:
+                    return cached, f"成功 ({len(cached)} 条，缓存)", timeid, actual_time
 
                 encrypted_timeid = self.encrypt(str(timeid))
                 if not encrypted_timeid:
                     if retry < max_retries - 1:
                         time.sleep(1)
                         continue
-                    return None, "加密失败"
+                    return None, "加密失败", None, None
 
                 timeid_param = quote(encrypted_timeid)
-                url = f"https://api.weibotop.cn/currentitems?timeid={timeid_param}"
+                url = f"{self.base_url}/currentitems?timeid={timeid_param}"
                 response = session.get(url, timeout=15)
                 response.raise_for_status()
 
@@ -150,88 +337,261 @@ class WeiboHotSearchFetcher:
                     if retry < max_retries - 1:
                         time.sleep(1)
                         continue
-                    return None, f"API返回错误"
+                    return None, f"API返回错误", None, None
 
                 data = self.decrypt_data(response.text)
                 if not data:
                     if retry < max_retries - 1:
                         time.sleep(1)
                         continue
-                    return None, "解密失败"
+                    return None, "解密失败", None, None
 
                 if not isinstance(data, list):
                     if retry < max_retries - 1:
                         time.sleep(1)
                         continue
-                    return None, "数据格式错误"
-
-                if with_history:
-                    enriched_data = []
-                    for rank, item in enumerate(tqdm(data, desc=f"{date_str} 关键词", leave=False), 1):
-                        keyword = item[0] if isinstance(item, list) else item
-                        history = self.fetch_keyword_history(session, keyword, date_str)
-                        enriched_item = {
-                            "rank": rank,
-                            "keyword": keyword,
-                            "raw_data": item,
-                            "history": history
-                        }
-                        enriched_data.append(enriched_item)
-                        time.sleep(0.1)
-
-                    result = {
-                        "date": date_str,
-                        "timeid": timeid,
-                        "actual_time": actual_time,
-                        "total_items": len(enriched_data),
-                        "items": enriched_data
-                    }
-                    return result, f"成功 ({len(data)} 条，含历史数据)"
-                else:
-                    return data, f"成功 ({len(data)} 条)"
+                    return None, "数据格式错误", None, None
+
+                self._cache_put("currentitems", timeid, data)
+                return data, f"成功 ({len(data)} 条)", timeid, actual_time
+            except OfflineCacheMiss:
+                # 离线回放缺少缓存时立即失败，与缺少历史时一致，不跳过该日期
+                raise
             except Exception as e:
                 if retry < max_retries - 1:
                     time.sleep(1)
                     continue
-                return None, str(e)
+                return None, str(e), None, None
             finally:
+                if temporary:
+                    session.close()
+        return None, "重试失败", None, None
+
+    @staticmethod
+    def _keyword_of(item: Any) -> Any:
+        return item[0] if isinstance(item, list) else item
+
+    @staticmethod
+    def _build_history_result(date_str: str, timeid: Any, actual_time: Any, data: list, histories: list) -> Dict[str, Any]:
+        enriched_data = [
+            {
+                "rank": rank,
+                "keyword": WeiboHotSearchFetcher._keyword_of(item),
+                "raw_data": item,
+                "history": history
+            }
+            for rank, (item, history) in enumerate(zip(data, histories), 1)
+        ]
+        return {
+            "date": date_str,
+            "timeid": timeid,
+            "actual_time": actual_time,
+            "total_items": len(enriched_data),
+            "items": enriched_data
+        }
+
+    def _history_task(self, keyword: Any, date_str: str) -> Optional[Dict[str, Any]]:
+        """调度器中的单个 (日期, 关键词) 历史任务"""
+        session, temporary = self._acquire_session()
+        try:
+            return self.fetch_keyword_history(session, keyword, date_str)
+        finally:
+            if temporary:
                 session.close()
-        return None, "重试失败"
 
-    def fetch_date_range(self, start_date: str, end_date: str, max_workers: int = 10, with_history: bool = False) -> Dict[str, Any]:
+    def _new_history_limiter(self) -> AdaptiveRateLimiter:
+        return AdaptiveRateLimiter(
+            initial_rate=self.history_rate or HISTORY_RATE_LIMIT_INITIAL,
+            min_rate=HISTORY_RATE_LIMIT_MIN,
+            max_rate=self.history_rate or HISTORY_RATE_LIMIT_MAX,
+            max_retries=HISTORY_RATE_LIMIT_MAX_RETRIES,
+            is_retryable=_is_history_retryable,
+        )
+
+    def fetch_data_for_date(self, date_str: str, with_history: bool = False, max_retries: int = 3) -> Tuple[Optional[Any], str]:
+        data, status, timeid, actual_time = self._fetch_day(date_str, max_retries)
+        if data is None or not with_history:
+            return data, status
+
+        # 单独调用时逐个抓取历史；批量抓取请使用 iter_dates，由全局调度器并行处理
+        own_limiter = self._history_limiter is None
+        if own_limiter:
+            self._history_limiter = self._new_history_limiter()
+            self._history_store = KeywordHistoryStore()
+            self._history_closed_on = date_str
+        try:
+            histories = [
+                self._history_task(self._keyword_of(item), date_str)
+                for item in tqdm(data, desc=f"{date_str} 关键词", leave=False)
+            ]
+        finally:
+            if own_limiter:
+                self._history_limiter = None
+                self._history_store = None
+                self._history_closed_on = None
+        result = self._build_history_result(date_str, timeid, actual_time, data, histories)
+        return result, f"成功 ({len(data)} 条，含历史数据)"
+
+    @staticmethod
+    def date_list(start_date: str, end_date: str) -> List[str]:
         start = datetime.strptime(start_date, "%Y-%m-%d")
         end = datetime.strptime(end_date, "%Y-%m-%d")
 
-        date_list = []
+        dates = []
         current = start
         while current <= end:
-            date_list.append(current.strftime("%Y-%m-%d"))
+            dates.append(current.strftime("%Y-%m-%d"))
             current += timedelta(days=1)
+        return dates
+
+    def iter_date_range(
+        self,
+        start_date: str,
+        end_date: str,
+        max_workers: int = 10,
+        with_history: bool = False,
+        max_pending: Optional[int] = None
+    ) -> Iterator[Tuple[str, Any]]:
+        """按完成顺序逐日产出 start_date 到 end_date 的抓取结果，参数含义见 iter_dates"""
+        return self.iter_dates(
+            self.date_list(start_date, end_date),
+            max_workers=max_workers,
+            with_history=with_history,
+            max_pending=max_pending
+        )
+
+    def iter_dates(
+        self,
+        dates: List[str],
+        max_workers: int = 10,
+        with_history: bool = False,
+        max_pending: Optional[int] = None
+    ) -> Iterator[Tuple[str, Any]]:
+        """按完成顺序逐日产出抓取结果，供下游边抓取边处理。
+
+        同时在途的日期数不超过 max_pending；调用方处理当前结果期间，已提交的任务继续
+        在后台执行，但不会再开始新的日期，因此下游较慢时内存占用保持平稳。
+
+        抓取历史时，每个日期的热搜列表到达后，其中每个关键词作为一个 (日期, 关键词)
+        任务放入同一个线程池，由全局限速器控制总请求速率；即使只抓取一天也能用满所有线程。
 
-        all_data = {}
-        success_count = 0
-        fail_count = 0
+        Args:
+            dates: 要抓取的日期列表 (YYYY-MM-DD)
+            max_workers: 抓取线程数
+            with_history: 是否抓取关键词历史
+            max_pending: 同时在途的日期上限，默认 max_workers 的两倍
 
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            future_to_date = {
-                executor.submit(self.fetch_data_for_date, date, with_history): date
-                for date in date_list
-            }
+        Yields:
+            Tuple[str, Any]: (日期, 当天数据)，抓取失败的日期不产出
+        """
+        max_pending = max_pending or max_workers * 2
+        dates = list(dates)
+        if self.engine == "async":
+            yield from self._iter_dates_async(dates, max_workers, with_history, max_pending)
+            return
+
+        last_date = max(dates, default=None)
+        dates = iter(dates)
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        # future -> (日期, 关键词序号)；序号为 None 表示热搜列表任务
+        pending: Dict[Any, Tuple[str, Optional[int]]] = {}
+        # 等待历史任务完成的日期: 日期 -> [列表, timeid, 实际时间, 历史结果, 剩余任务数]
+        days: Dict[str, list] = {}
+        in_flight = 0
+        # 整次抓取共用会话池，避免每个日期、每次重试都重新握手
+        self._session_pool = SessionPool(self.create_session, pool_size=max_workers)
+        self._open_decrypt_pool(with_history)
+        if with_history:
+            self._history_limiter = self._new_history_limiter()
+            self._history_store = KeywordHistoryStore()
+            self._history_closed_on = last_date
+        try:
+            def submit_next() -> bool:
+                nonlocal in_flight
+                date = next(dates, None)
+                if date is None:
+                    return False
+                pending[executor.submit(self._fetch_day, date)] = (date, None)
+                in_flight += 1
+                return True
+
+            def finish_day():
+                nonlocal in_flight
+                in_flight -= 1
+                submit_next()
+
+            while in_flight < max_pending and submit_next():
+                pass
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    date, index = pending.pop(future)
+
+                    if index is None:
+                        try:
+                            data, status, timeid, actual_time = future.result()
+                        except OfflineCacheMiss:
+                            raise
+                        except Exception:
+                            data = None
+                        if not data:
+                            finish_day()
+                            continue
+                        if not with_history:
+                            yield date, data
+                            finish_day()
+                            continue
+                        days[date] = [data, timeid, actual_time, [None] * len(data), len(data)]
+                        for i, item in enumerate(data):
+                            pending[executor.submit(self._history_task, self._keyword_of(item), date)] = (date, i)
+                        continue
 
-            for future in as_completed(future_to_date):
-                date = future_to_date[future]
-                try:
-                    data, status = future.result()
-                    with self.lock:
-                        if data:
-                            all_data[date] = data
-                            success_count += 1
-                        else:
-                            fail_count += 1
-                except Exception:
-                    with self.lock:
-                        fail_count += 1
+                    state = days[date]
+                    try:
+                        state[3][index] = future.result()
+                    except OfflineCacheMiss:
+                        raise
+                    except Exception:
+                        state[3][index] = None
+                    state[4] -= 1
+                    if state[4] == 0:
+                        del days[date]
+                        yield date, self._build_history_result(date, state[1], state[2], state[0], state[3])
+                        finish_day()
+        finally:
+            # 下游提前结束时取消尚未开始的任务
+            executor.shutdown(wait=True, cancel_futures=True)
+            self._close_decrypt_pool()
+            pool, self._session_pool = self._session_pool, None
+            pool.close()
+            self.http_stats = dict(pool.stats)
+            if self._history_limiter is not None:
+                self.history_stats = self._history_limiter.snapshot()
+                self.history_stats["keywords"] = len(self._history_store)
+                self.history_stats["series_reused"] = self._history_store.stats["reused"]
+                self._history_limiter = None
+                self._history_store = None
+                self._history_closed_on = None
+
+    def _iter_dates_async(self, dates: List[str], concurrency: int, with_history: bool, max_pending: int) -> Iterator[Tuple[str, Any]]:
+        """asyncio 引擎：max_workers 作为同时在途的 HTTP 请求数上限"""
+        from .async_fetcher import AsyncFetchEngine
+
+        engine = AsyncFetchEngine(self, concurrency=concurrency, with_history=with_history)
+        self._open_decrypt_pool(with_history)
+        try:
+            yield from engine.iter_dates(dates, max_pending)
+        finally:
+            self._close_decrypt_pool()
+            self.http_stats = dict(engine.http_stats)
+            if with_history:
+                self.history_stats = dict(engine.history_stats)
 
+    def fetch_date_range(self, start_date: str, end_date: str, max_workers: int = 10, with_history: bool = False) -> Dict[str, Any]:
+        all_data = {}
+        for date, data in self.iter_date_range(start_date, end_date, max_workers=max_workers, with_history=with_history):
+            all_data[date] = data
         return all_data
 
     def save_data(self, data: Dict[str, Any], filename: str = "weibo_hotsearch.json", with_history: bool = False) -> bool:
@@ -239,27 +599,37 @@ class WeiboHotSearchFetcher:
 
         Args:
             data: 按日期字典的数据
-            filename: 输出完整数据文件路径
-            with_history: 是否为带历史的输出（如果 False，将生成简化版文件）
+            filename: 输出完整数据文件路径，扩展名为 .json.gz / .json.xz / .json.zst 时压缩保存
+            with_history: 是否为带历史的输出（如果 False，将生成简化版文件，压缩格式与完整文件相同）
 
         Returns:
             bool: 是否保存成功
         """
         try:
             from pathlib import Path
-            from utils.file_utils import save_json_safely
+            from utils.compression import sibling_path
+            from utils.json_writer import JSONStreamWriter, write_streamed
 
             out_path = Path(filename)
-            # 保存完整数据
-            saved = save_json_safely(data, out_path)
-            if not saved:
-                return False
-
+            # compact 历史不缩进，避免每个数值单独占一行
+            indent = None if self.history_format == "compact" else 2
+            full = JSONStreamWriter(out_path, indent=indent, default=json_default)
+            writers = [full]
+            simplified = None
             if not with_history:
-                simplified = {}
+                simplified = JSONStreamWriter(sibling_path(out_path, '_simplified'))
+                writers.append(simplified)
+
+            for writer in writers:
+                writer.open()
+            try:
+                for writer in writers:
+                    writer.begin_object()
+                # 完整数据与简化版在同一遍遍历中逐日写出
                 for date, day in data.items():
-                    if isinstance(day, dict) and 'items' in day and isinstance(day['items'], list):
-                        simplified[date] = [
+                    write_streamed(full, day, date, depth=2)
+                    if simplified is not None and isinstance(day, dict) and 'items' in day and isinstance(day['items'], list):
+                        simplified.value([
                             {
                                 'rank': it.get('rank', i + 1),
                                 'title': it.get('keyword', it.get('word', it.get('title', ''))),
@@ -267,9 +637,18 @@ class WeiboHotSearchFetcher:
                                 'url': it.get('url', '') if isinstance(it, dict) else ''
                             }
                             for i, it in enumerate(day['items'])
-                        ]
-                simplified_path = out_path.with_name(out_path.stem + '_simplified.json')
-                save_json_safely(simplified, simplified_path)
+                        ], date)
+                for writer in writers:
+                    writer.end()
+            except BaseException:
+                # 写入过程中任一文件失败时两个文件都保持原样
+                for writer in writers:
+                    writer.abort()
+                raise
+            # 两次替换不是一个原子操作：先替换简化版，完整数据最后落盘；
+            # 完整文件替换失败时保留上一次的完整数据（增量抓取以它为准），简化版可能已是新内容
+            for writer in reversed(writers):
+                writer.commit()
 
             return True
         except Exception:
@@ -0,0 +1,245 @@
+"""
+明星词典预过滤
+用 Aho-Corasick 自动机在标题中查找已知明星姓名/别名，命中时无需调用 API 即可保留该条目。
+"""
+import json
+import logging
+from collections import deque
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from config.settings import GAZETTEER_FILE, GAZETTEER_LEARNED_FILE, GAZETTEER_MIN_NAME_LENGTH
+from .cache import normalize_title
+
+logger = logging.getLogger(__name__)
+
+
+class AhoCorasick:
+    """Aho-Corasick 多模式匹配自动机，匹配耗时与文本长度成线性关系"""
+
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Optional[str]] = [None]
+        self._built = True
+
+    def __len__(self) -> int:
+        return sum(1 for out in self._output if out is not None)
+
+    def add(self, pattern: str, value: Optional[str] = None):
+        """
+        添加模式串
+
+        Args:
+            pattern: 模式串
+            value: 命中时返回的值，默认为模式串本身
+        """
+        node = 0
+        for ch in pattern:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(None)
+            node = nxt
+        if self._output[node] is None:
+            self._output[node] = value or pattern
+        self._built = False
+
+    def build(self):
+        """按 BFS 计算失败指针（添加模式串后必须重新构建）"""
+        queue = deque()
+        for child in self._goto[0].values():
+            self._fail[child] = 0
+            queue.append(child)
+
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+                queue.append(child)
+        self._built = True
+
+    def find_all(self, text: str) -> List[Tuple[int, str]]:
+        """
+        查找文本中所有命中的模式
+
+        Returns:
+            List[Tuple[int, str]]: (结束位置, 命中值) 列表
+        """
+        if not self._built:
+            self.build()
+
+        matches = []
+        node = 0
+        for pos, ch in enumerate(text):
+            while node and ch not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(ch, 0)
+
+            out = node
+            while out:
+                if self._output[out] is not None:
+                    matches.append((pos, self._output[out]))
+                out = self._fail[out]
+        return matches
+
+    def find_first(self, text: str) -> Optional[str]:
+        """返回最早结束、同位置中最长的命中值"""
+        matches = self.find_all(text)
+        return matches[0][1] if matches else None
+
+
+class CelebrityGazetteer:
+    """已知明星姓名词典，支持从文件加载并从历史判定结果中自动扩充"""
+
+    def __init__(
+        self,
+        names_file: Optional[Path] = None,
+        learned_file: Optional[Path] = None,
+        min_length: Optional[int] = None
+    ):
+        """
+        初始化词典
+
+        Args:
+            names_file: 人工维护的词典文件，每行一个明星，别名用 "|" 分隔，"#" 开头为注释
+            learned_file: 自动学习结果的保存位置（JSON）
+            min_length: 参与子串匹配的最短姓名长度，过短的名字容易误命中
+        """
+        self.names_file = Path(names_file or GAZETTEER_FILE)
+        self.learned_file = Path(learned_file or GAZETTEER_LEARNED_FILE)
+        self.min_length = GAZETTEER_MIN_NAME_LENGTH if min_length is None else min_length
+
+        self._automaton = AhoCorasick()
+        self._names: Set[str] = set()
+        self._learned_names: Set[str] = set()
+        # direct_celebrity 命中的整条标题不是姓名，只做整句精确匹配
+        self._learned_titles: Set[str] = set()
+        self.stats = {"hits": 0, "lookups": 0}
+
+        if self.names_file.exists():
+            self.load_names_file(self.names_file)
+        if self.learned_file.exists():
+            self._load_learned()
+
+    def __len__(self) -> int:
+        return len(self._names) + len(self._learned_titles)
+
+    def add_name(self, name: str, aliases: Iterable[str] = ()) -> bool:
+        """
+        添加明星姓名及别名
+
+        Returns:
+            bool: 是否有新的模式被加入
+        """
+        canonical = str(name).strip()
+        added = False
+        for pattern in (canonical, *aliases):
+            key = normalize_title(pattern)
+            if len(key) < self.min_length or key in self._names:
+                continue
+            self._automaton.add(key, canonical)
+            self._names.add(key)
+            added = True
+        return added
+
+    def load_names_file(self, path: Path) -> int:
+        """
+        从词典文件加载姓名
+
+        Returns:
+            int: 加载的明星数量
+        """
+        count = 0
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith('#'):
+                    continue
+                parts = [p.strip() for p in line.split('|') if p.strip()]
+                if parts and self.add_name(parts[0], parts[1:]):
+                    count += 1
+        logger.info(f"从 {path} 加载了 {count} 个明星姓名")
+        return count
+
+    def _load_learned(self):
+        try:
+            with open(self.learned_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            logger.warning(f"读取已学习的明星词典失败: {e}")
+            return
+        for name in data.get("names", []):
+            if self.add_name(name):
+                self._learned_names.add(name)
+        self._learned_titles.update(data.get("titles", []))
+
+    def match(self, title: str) -> Optional[str]:
+        """
+        在标题中查找已知明星
+
+        Returns:
+            Optional[str]: 命中的明星姓名（整句命中时为原标题），未命中返回 None
+        """
+        self.stats["lookups"] += 1
+        key = normalize_title(title)
+        if key in self._learned_titles:
+            self.stats["hits"] += 1
+            return title
+        name = self._automaton.find_first(key)
+        if name:
+            self.stats["hits"] += 1
+        return name
+
+    def learn_from_records(self, records: Iterable[Dict[str, Any]]) -> int:
+        """
+        从过滤结果中扩充词典
+
+        - inferred_celebrity：`title` 已被替换为关联明星姓名，加入子串匹配
+        - direct_celebrity：标题本身不是姓名，只记录整句用于精确匹配
+
+        Returns:
+            int: 新学习到的条目数
+        """
+        learned = 0
+        for item in records:
+            if not isinstance(item, Mapping):
+                continue
+            reason = item.get("filter_reason")
+            if reason == "inferred_celebrity" and item.get("title"):
+                name = str(item["title"])
+                if self.add_name(name):
+                    self._learned_names.add(name)
+                    learned += 1
+            elif reason == "direct_celebrity":
+                raw = item.get("raw_data")
+                title = item.get("keyword") or (raw[0] if isinstance(raw, list) and raw else item.get("title"))
+                key = normalize_title(title) if title else ""
+                if key and key not in self._learned_titles:
+                    self._learned_titles.add(key)
+                    learned += 1
+        if learned:
+            logger.info(f"明星词典新增 {learned} 条")
+        return learned
+
+    def save_learned(self) -> bool:
+        """把自动学习的条目保存到 learned_file"""
+        try:
+            self.learned_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.learned_file, 'w', encoding='utf-8') as f:
+                json.dump(
+                    {"names": sorted(self._learned_names), "titles": sorted(self._learned_titles)},
+                    f, ensure_ascii=False, indent=2
+                )
+            return True
+        except OSError as e:
+            logger.error(f"保存明星词典失败: {e}")
+            return False
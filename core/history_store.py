@@ -0,0 +1,280 @@
+"""
+关键词历史存储
+getrankhistory 返回关键词的完整时间序列，同一关键词在一次抓取中只请求、解密一次，
+各日期的数据通过有序时间索引二分查找切片得到。
+
+历史明细有两种格式：
+- full：details 为 [{"time", "rank", "hotness"}, ...]
+- compact：series 为按列存储的 CompactHistory，保存为 {"time": [epoch 秒], "rank": [...], "hotness": [...]}
+history_details / expand_history 对两种格式给出相同的明细，json_default 用于序列化内存中的 CompactHistory。
+原始数据按所选格式保存；过滤结果（DataProcessor.save_filtered_data）经 expand_history 总是以 full 格式写出。
+"""
+import calendar
+import logging
+import time
+from array import array
+from bisect import bisect_left
+from concurrent.futures import Future
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# weibotop 的时间为北京时间（UTC+8）
+_TZ_OFFSET = 8 * 3600
+_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def _to_epoch(text: str) -> int:
+    fields = (int(text[0:4]), int(text[5:7]), int(text[8:10]), int(text[11:13]), int(text[14:16]), int(text[17:19]))
+    return calendar.timegm(fields + (0, 0, 0)) - _TZ_OFFSET
+
+
+def _from_epoch(epoch: int) -> str:
+    return time.strftime(_TIME_FORMAT, time.gmtime(epoch + _TZ_OFFSET))
+
+
+class CompactHistory:
+    """一天的历史数据点，按列保存在 array 中；每个点约 20 字节，而 dict 明细需要数百字节"""
+
+    __slots__ = ("epochs", "ranks", "hotness", "time_suffix")
+
+    def __init__(self, epochs: Sequence[int], ranks: Sequence[int], hotness: Sequence[int], time_suffix: str = ""):
+        """
+        Args:
+            epochs: 各数据点的 epoch 秒
+            ranks: 排名
+            hotness: 热度
+            time_suffix: 原始时间字符串在秒之后的固定后缀（如 ".0"），还原时原样拼回
+        """
+        self.epochs = array("q", epochs)
+        self.ranks = array("i", ranks)
+        self.hotness = array("q", hotness)
+        self.time_suffix = time_suffix
+
+    @classmethod
+    def from_points(cls, times: Sequence[str], ranks: Sequence[int], hotness: Sequence[int]) -> Optional["CompactHistory"]:
+        """
+        由时间字符串构造；时间格式不统一、无法无损还原时返回 None（调用方回退为 full 格式）
+        """
+        if not times:
+            return cls([], ranks, hotness)
+        suffix = times[0][19:]
+        epochs = []
+        for text in times:
+            if text[19:] != suffix:
+                return None
+            try:
+                epoch = _to_epoch(text)
+            except ValueError:
+                return None
+            if _from_epoch(epoch) != text[:19]:
+                return None
+            epochs.append(epoch)
+        return cls(epochs, ranks, hotness, suffix)
+
+    @classmethod
+    def from_json(cls, columns: Dict[str, Any]) -> "CompactHistory":
+        return cls(columns["time"], columns["rank"], columns["hotness"], columns.get("time_suffix", ""))
+
+    def to_json(self) -> Dict[str, Any]:
+        columns = {"time": self.epochs.tolist(), "rank": self.ranks.tolist(), "hotness": self.hotness.tolist()}
+        if self.time_suffix:
+            columns["time_suffix"] = self.time_suffix
+        return columns
+
+    def __len__(self) -> int:
+        return len(self.epochs)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, CompactHistory):
+            return NotImplemented
+        return self.to_json() == other.to_json()
+
+    def times(self) -> List[str]:
+        return [_from_epoch(epoch) + self.time_suffix for epoch in self.epochs]
+
+    def details(self) -> List[Dict[str, Any]]:
+        """还原为 full 格式的明细"""
+        return [
+            {"time": t, "rank": r, "hotness": h}
+            for t, r, h in zip(self.times(), self.ranks, self.hotness)
+        ]
+
+
+def history_details(history: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    取得历史明细，兼容 full / compact 两种格式（compact 可以是内存中的 CompactHistory 或从文件读出的列）
+
+    Returns:
+        List[Dict[str, Any]]: [{"time", "rank", "hotness"}, ...]，没有历史时为空列表
+    """
+    if not history:
+        return []
+    if "details" in history:
+        return history["details"]
+    series = history.get("series")
+    if series is None:
+        return []
+    if not isinstance(series, CompactHistory):
+        series = CompactHistory.from_json(series)
+    return series.details()
+
+
+def expand_history(history: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """把 compact 格式的历史摘要转换为 full 格式，full 格式原样返回"""
+    if not history or "series" not in history:
+        return history
+    expanded = {k: v for k, v in history.items() if k != "series"}
+    expanded["details"] = history_details(history)
+    return expanded
+
+
+def json_default(obj: Any) -> Any:
+    """json.dump 的 default 钩子：CompactHistory 序列化为列"""
+    if isinstance(obj, CompactHistory):
+        return obj.to_json()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class KeywordSeries:
+    """单个关键词的历史序列，按时间排序"""
+
+    __slots__ = ("times", "ranks", "hotness")
+
+    def __init__(self, timestamps: List[str], ranks: List[Any], hotness: List[Any]):
+        points = list(zip(timestamps, ranks, hotness))
+        # 接口返回的序列通常已按时间排序，仅在必要时排序
+        if any(points[i][0] > points[i + 1][0] for i in range(len(points) - 1)):
+            points.sort(key=lambda p: p[0])
+        self.times = [p[0] for p in points]
+        self.ranks = [int(p[1]) for p in points]
+        self.hotness = [int(p[2]) for p in points]
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def day_range(self, date_str: str) -> Tuple[int, int]:
+        """返回某一天（YYYY-MM-DD）数据点在序列中的下标区间 [lo, hi)"""
+        lo = bisect_left(self.times, date_str)
+        # 时间戳格式为 "YYYY-MM-DD HH:MM:SS"，"~" 大于其中任何字符
+        hi = bisect_left(self.times, date_str + "~", lo)
+        return lo, hi
+
+    def day_summary(self, date_str: str, compact: bool = False, bucket_minutes: int = 0) -> Optional[Dict[str, Any]]:
+        """
+        生成某一天的历史摘要，格式与 WeiboHotSearchFetcher.fetch_keyword_history 相同
+
+        Args:
+            date_str: 日期 YYYY-MM-DD
+            compact: 为 True 时明细以 CompactHistory 保存在 series 中，否则为 details 列表
+            bucket_minutes: 大于 0 时把明细降采样为每 bucket_minutes 分钟一个点（该时段内最好的排名
+                和最高的热度，时间取时段内第一个点）；摘要字段始终按全部数据点计算
+
+        Returns:
+            Optional[Dict[str, Any]]: 当天没有数据点时返回 None
+        """
+        lo, hi = self.day_range(date_str)
+        if lo == hi:
+            return None
+        ranks = self.ranks[lo:hi]
+        hotness = self.hotness[lo:hi]
+        summary = {
+            "total_points": hi - lo,
+            "min_rank": min(ranks),
+            "max_rank": max(ranks),
+            "min_hotness": min(hotness),
+            "max_hotness": max(hotness),
+            "first_time": self.times[lo],
+            "last_time": self.times[hi - 1],
+        }
+        times = self.times[lo:hi]
+        if bucket_minutes > 0:
+            times, ranks, hotness = _downsample(times, ranks, hotness, bucket_minutes)
+            summary["bucket_minutes"] = bucket_minutes
+        series = CompactHistory.from_points(times, ranks, hotness) if compact else None
+        if series is not None:
+            summary["series"] = series
+        else:
+            summary["details"] = [
+                {"time": t, "rank": r, "hotness": h}
+                for t, r, h in zip(times, ranks, hotness)
+            ]
+        return summary
+
+
+def _downsample(
+    times: List[str], ranks: List[int], hotness: List[int], bucket_minutes: int
+) -> Tuple[List[str], List[int], List[int]]:
+    """按固定时段聚合同一天的数据点：排名取最小值，热度取最大值，峰值因此不会丢失"""
+    out_times: List[str] = []
+    out_ranks: List[int] = []
+    out_hotness: List[int] = []
+    last_bucket = None
+    for t, r, h in zip(times, ranks, hotness):
+        bucket = (int(t[11:13]) * 60 + int(t[14:16])) // bucket_minutes
+        if bucket != last_bucket:
+            last_bucket = bucket
+            out_times.append(t)
+            out_ranks.append(r)
+            out_hotness.append(h)
+        else:
+            if r < out_ranks[-1]:
+                out_ranks[-1] = r
+            if h > out_hotness[-1]:
+                out_hotness[-1] = h
+    return out_times, out_ranks, out_hotness
+
+
+class KeywordHistoryStore:
+    """以关键词为键的历史序列存储，线程安全；并发请求同一关键词时只发起一次请求"""
+
+    def __init__(self):
+        self._series: Dict[str, Future] = {}
+        self._lock = Lock()
+        self.stats = {"requests": 0, "reused": 0, "failed": 0}
+
+    def __len__(self) -> int:
+        return len(self._series)
+
+    def get(self, keyword: str, fetch: Callable[[], Optional[list]]) -> Optional[KeywordSeries]:
+        """
+        取得关键词的历史序列，首次访问时调用 fetch 下载
+
+        Args:
+            keyword: 关键词
+            fetch: 返回 [timestamps, ranks, hotness] 的函数，可能抛出异常
+
+        Returns:
+            Optional[KeywordSeries]: 下载失败或数据无效时返回 None（失败不会被缓存）
+        """
+        with self._lock:
+            future = self._series.get(keyword)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._series[keyword] = future
+                self.stats["requests"] += 1
+            else:
+                self.stats["reused"] += 1
+
+        if not owner:
+            return future.result()
+
+        try:
+            raw = fetch()
+            series = KeywordSeries(*raw) if raw is not None else None
+        except Exception as e:
+            with self._lock:
+                # 失败不缓存，后续日期可以重新请求
+                del self._series[keyword]
+                self.stats["failed"] += 1
+            future.set_exception(e)
+            raise
+        if series is None:
+            with self._lock:
+                # 无效数据（如一次性的 Invalid 响应）同样不缓存，等待中的调用方仍得到 None
+                del self._series[keyword]
+                self.stats["failed"] += 1
+        future.set_result(series)
+        return series
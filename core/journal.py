@@ -0,0 +1,135 @@
+"""
+逐条决策日志（JSONL，只追加）
+每处理完一条记录就写入一行并交给操作系统，进程中途崩溃后可以从日志恢复，只需重新处理尚未落盘的记录；
+每批记录结束时 sync() 把日志 fsync 到磁盘，断电时最多丢失最后一批的决策。
+保留的记录只写入公开字段，以 "_" 开头的内部字段（如来源日期）不写入，来源日期单独保存在 date 中。
+"""
+import json
+import logging
+import os
+from pathlib import Path
+from collections.abc import Mapping
+from typing import Any, Dict, Optional
+
+from .record_view import SOURCE_DATE_KEY, RecordView, json_default
+
+logger = logging.getLogger(__name__)
+
+# 记录状态：保留 / 丢弃（真实的 NO 判定或规则丢弃） / 调用失败（恢复时会重新处理）
+STATUS_KEPT = "kept"
+STATUS_DROPPED = "dropped"
+STATUS_ERROR = "error"
+
+
+class DecisionJournal:
+    """以 (来源文件, 记录序号, 标题) 为键的决策日志"""
+
+    def __init__(self, path: Path, source: str, resume: bool = False):
+        """
+        打开决策日志
+
+        Args:
+            path: 日志文件路径（JSONL）
+            source: 输入来源标识（通常为输入文件路径），只恢复同一来源的决策
+            resume: 是否加载已有决策；为 False 时清空旧日志重新开始
+        """
+        self.path = Path(path)
+        self.source = str(source)
+        self._decisions: Dict[int, Dict[str, Any]] = {}
+        self.stats = {"resumed": 0, "written": 0, "errors": 0}
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if resume and self.path.exists():
+            self._load()
+        self._fp = open(self.path, 'a' if resume else 'w', encoding='utf-8')
+        if resume and self._fp.tell() and not self._ends_with_newline():
+            # 补齐崩溃时写了一半的行，避免与后续条目粘连
+            self._fp.write("\n")
+
+    def _load(self):
+        skipped = 0
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # 崩溃时最后一行可能只写了一半
+                    skipped += 1
+                    continue
+                if entry.get("source") != self.source:
+                    continue
+                # 同一序号以最后一次写入为准（例如失败后重试成功）
+                self._decisions[entry["index"]] = entry
+        if skipped:
+            logger.warning(f"决策日志中有 {skipped} 行无法解析，已忽略")
+        logger.info(f"从 {self.path} 恢复了 {len(self._decisions)} 条决策")
+
+    def _ends_with_newline(self) -> bool:
+        with open(self.path, 'rb') as f:
+            f.seek(-1, 2)
+            return f.read(1) == b"\n"
+
+    def lookup(self, index: int, title: Optional[str]) -> Optional[Dict[str, Any]]:
+        """
+        查找已有决策
+
+        调用失败的记录以及标题与日志不一致的记录（输入文件已变化）视为没有决策。
+
+        Returns:
+            Optional[Dict[str, Any]]: 日志条目，包含 status、reason，保留的记录还包含 record（带来源日期的 RecordView）
+        """
+        entry = self._decisions.get(index)
+        if entry is None or entry.get("title") != title or entry.get("status") == STATUS_ERROR:
+            return None
+        self.stats["resumed"] += 1
+        if "record" in entry and not isinstance(entry["record"], RecordView):
+            entry["record"] = RecordView(entry["record"], date=entry.get("date"))
+        return entry
+
+    def record(
+        self,
+        index: int,
+        title: Optional[str],
+        status: str,
+        reason: str = "",
+        record: Optional[Mapping] = None
+    ):
+        """
+        追加一条决策并立即刷新到操作系统（fsync 在 sync() 中按批执行）
+
+        Args:
+            index: 记录在输入中的序号
+            title: 记录标题
+            status: STATUS_KEPT / STATUS_DROPPED / STATUS_ERROR
+            reason: 判定说明（失败时为错误信息）
+            record: 保留的输出记录
+        """
+        entry = {"source": self.source, "index": index, "title": title, "status": status, "reason": reason}
+        if record is not None:
+            # 内部字段不写入日志；来源日期单独保存，恢复时才能放回对应日期
+            entry["record"] = {k: v for k, v in record.items() if not k.startswith("_")}
+            date = record.get(SOURCE_DATE_KEY)
+            if date is not None:
+                entry["date"] = date
+        self._fp.write(json.dumps(entry, ensure_ascii=False, default=json_default) + "\n")
+        self._fp.flush()
+        self.stats["written"] += 1
+        if status == STATUS_ERROR:
+            self.stats["errors"] += 1
+
+    def sync(self):
+        """把已写入的决策 fsync 到磁盘，在每批记录处理完后调用"""
+        if not self._fp.closed:
+            self._fp.flush()
+            os.fsync(self._fp.fileno())
+
+    def close(self):
+        if not self._fp.closed:
+            self.sync()
+            self._fp.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
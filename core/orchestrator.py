@@ -1,12 +1,72 @@
 """Orchestrator: 把抓取、保存原始、调用 DeepSeek 处理并保存结果串成链路"""
 from pathlib import Path
-from typing import Optional, Dict, Any
-from utils import setup_logger
+from datetime import date as date_cls, timedelta
+from typing import Optional, Dict, Any, List
+from utils import setup_logger, read_json_safely
 from .fetcher import WeiboHotSearchFetcher
 from .api_client import DeepSeekClient
 from .classifier import TitleClassifier
+from .cache import TitleDecisionCache
+from .rate_limiter import AdaptiveRateLimiter
+from .gazetteer import CelebrityGazetteer
+from .prefilter import NegativeRuleFilter
 from .data_processor import DataProcessor
-from config.settings import DEFAULT_DELAY
+from .response_cache import ResponseCache
+from config.settings import DEFAULT_DELAY, DEFAULT_CONCURRENCY, INCREMENTAL_REFRESH_DAYS
+
+
+def _load_by_date(path: Path, logger) -> Dict[str, Any]:
+    """读取已有的按日期索引的输出文件，不存在或无法解析时返回空字典"""
+    if not path.exists():
+        return {}
+    try:
+        data = read_json_safely(path)
+    except Exception as e:
+        logger.warning(f"无法读取已有文件 {path}，将全部重新抓取: {e}")
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def plan_incremental_dates(
+    dates: List[str],
+    raw_data: Dict[str, Any],
+    filtered_data: Dict[str, Any],
+    with_history: bool = False,
+    refresh_days: int = INCREMENTAL_REFRESH_DAYS,
+    today: Optional[date_cls] = None,
+) -> List[str]:
+    """
+    计算增量模式下需要抓取的日期
+
+    以下日期需要（重新）抓取：
+    - 原始文件或过滤结果中缺失的日期（后者说明上次分类未完成）
+    - 原始数据格式与 with_history 不符的日期（例如以前没有抓取历史）
+    - 距今天不足 refresh_days 天的日期（当天的热搜仍在变化）
+
+    Args:
+        dates: 请求的日期范围
+        raw_data: 已有的原始数据（按日期索引）
+        filtered_data: 已有的过滤结果（按日期索引）
+        with_history: 本次是否抓取关键词历史
+        refresh_days: 总是重新抓取的最近天数
+        today: 当前日期，默认为系统日期
+
+    Returns:
+        List[str]: 需要抓取的日期
+    """
+    today = today or date_cls.today()
+    fresh_from = (today - timedelta(days=refresh_days - 1)).isoformat() if refresh_days > 0 else None
+
+    todo = []
+    for d in dates:
+        day = raw_data.get(d)
+        if day is None or d not in filtered_data:
+            todo.append(d)
+        elif with_history and not isinstance(day, dict):
+            todo.append(d)
+        elif fresh_from is not None and d >= fresh_from:
+            todo.append(d)
+    return todo
 
 
 def fetch_and_process(
@@ -19,42 +79,147 @@ def fetch_and_process(
     model: Optional[str] = None,
     enhanced: bool = False,
     delay: Optional[float] = None,
+    concurrency: Optional[int] = None,
     client: Optional[DeepSeekClient] = None,
+    use_cache: bool = True,
+    cache: Optional[TitleDecisionCache] = None,
+    adaptive_rate: bool = True,
+    use_gazetteer: bool = True,
+    gazetteer: Optional[CelebrityGazetteer] = None,
+    use_negative_rules: bool = True,
+    incremental: bool = False,
+    refresh_days: Optional[int] = None,
+    fetch_engine: Optional[str] = None,
+    use_http_cache: bool = True,
+    response_cache: Optional[ResponseCache] = None,
+    offline: bool = False,
+    history_format: Optional[str] = None,
+    history_bucket_minutes: Optional[int] = None,
     logger=None,
 ) -> Dict[str, Any]:
     logger = logger or setup_logger("orchestrator")
     raw_path = Path(raw_path)
     output_path = Path(output_path)
     delay = DEFAULT_DELAY if delay is None else delay
+    concurrency = DEFAULT_CONCURRENCY if concurrency is None else concurrency
+    refresh_days = INCREMENTAL_REFRESH_DAYS if refresh_days is None else refresh_days
+
+    # 离线模式只从响应缓存回放，不访问网络
+    if response_cache is None and (use_http_cache or offline):
+        response_cache = ResponseCache(offline=offline)
+    fetcher = WeiboHotSearchFetcher(
+        engine=fetch_engine, response_cache=response_cache,
+        history_format=history_format, history_bucket_minutes=history_bucket_minutes
+    )
+    dates = fetcher.date_list(start_date, end_date)
+
+    # 增量模式：只抓取并分类缺失或过期的日期，结果合并进已有的原始文件和过滤结果
+    existing_raw: Dict[str, Any] = {}
+    existing_filtered: Dict[str, Any] = {}
+    if incremental:
+        existing_raw = _load_by_date(raw_path, logger)
+        existing_filtered = _load_by_date(output_path, logger)
+        dates = plan_incremental_dates(dates, existing_raw, existing_filtered, with_history, refresh_days)
+        logger.info(f"增量模式: 需要抓取 {len(dates)} 天 {dates}")
+        if not dates:
+            logger.info("所有日期均已是最新，无需抓取")
+            return {
+                "total": 0,
+                "kept": 0,
+                "filtered": 0,
+                "unique_titles": 0,
+                "fetched_dates": [],
+                "http": {},
+                "output_path": str(output_path)
+            }
+
+    logger.info("初始化 DeepSeek 客户端")
+    # 自适应限速器接管 429/5xx 重试，SDK 内部不再重试；固定延迟随之停用
+    rate_limiter = AdaptiveRateLimiter() if adaptive_rate else None
+    client = client or DeepSeekClient(max_retries=0 if rate_limiter else 2)
+    if rate_limiter is not None:
+        delay = 0
+    # 调用方传入的缓存由调用方关闭
+    own_cache = cache is None and use_cache
+    if own_cache:
+        cache = TitleDecisionCache()
+    classifier = TitleClassifier(
+        client.get_client(),
+        model=model,
+        cache=cache,
+        async_client=client.get_async_client(),
+        rate_limiter=rate_limiter,
+    )
+    processor = DataProcessor()
+    if gazetteer is None and use_gazetteer:
+        gazetteer = CelebrityGazetteer()
+    negative_filter = NegativeRuleFilter() if use_negative_rules else None
+
+    logger.info(f"开始抓取并处理: {start_date} -> {end_date} (with_history={with_history})")
+    all_data: Dict[str, Any] = {}
 
-    logger.info(f"开始抓取: {start_date} -> {end_date} (with_history={with_history})")
-    fetcher = WeiboHotSearchFetcher()
-    all_data = fetcher.fetch_date_range(start_date, end_date, max_workers=workers, with_history=with_history)
+    def fetched_batches():
+        # 每抓完一天就把当天的记录交给分类；分类期间抓取线程继续处理已提交的日期，
+        # 但在当前批次处理完之前不会提交新的日期（背压）
+        for date, day in fetcher.iter_dates(dates, max_workers=workers, with_history=with_history):
+            all_data[date] = day
+            records, _, _ = processor.extract_records({date: day})
+            yield records
+
+    filtered_records, total, kept = processor.process_batches(
+        fetched_batches(),
+        classifier=classifier,
+        delay=delay,
+        enhance_model=enhanced,
+        concurrency=concurrency,
+        gazetteer=gazetteer,
+        negative_filter=negative_filter,
+    )
 
-    if not all_data:
+    if not all_data and not existing_raw:
         logger.error("未抓取到任何数据")
         raise RuntimeError("empty result from fetcher")
 
+    fetched_dates = sorted(all_data)
+    if existing_raw:
+        # 保留未重新抓取的日期的过滤结果，合并后按日期排序
+        kept_before = [
+            item for item in processor.extract_records(existing_filtered)[0]
+            if item.get('_source_date') not in all_data
+        ] if existing_filtered else []
+        merged = dict(existing_raw)
+        merged.update(all_data)
+        all_data = {d: merged[d] for d in sorted(merged)}
+        filtered_records = kept_before + filtered_records
+
     # 保存原始数据
     saved = fetcher.save_data(all_data, filename=str(raw_path), with_history=with_history)
     if not saved:
         logger.error("保存原始数据失败")
         raise RuntimeError("failed to save raw data")
 
-    logger.info("初始化 DeepSeek 客户端并开始处理")
-    client = client or DeepSeekClient()
-    classifier = TitleClassifier(client.get_client(), model=model)
-    processor = DataProcessor()
-
-    filtered_records, total, kept = processor.process_file(
-        input_path=raw_path,
-        classifier=classifier,
-        delay=delay,
-        enhance_model=enhanced,
-    )
+    processor.save_filtered_data(filtered_records, all_data, 'by_date', output_path)
 
-    records, container_key, original_data = processor.load_json_file(raw_path)
-    processor.save_filtered_data(filtered_records, original_data, container_key, output_path)
+    if cache is not None:
+        logger.info(f"缓存统计: {cache.stats}")
+        if own_cache:
+            cache.close()
+    http_stats = getattr(fetcher, "http_stats", {})
+    if http_stats:
+        logger.info(f"抓取连接统计: {http_stats}")
+    if response_cache is not None:
+        logger.info(f"响应缓存统计: {response_cache.stats}")
+    history_stats = getattr(fetcher, "history_stats", {})
+    if history_stats:
+        logger.info(f"历史抓取限速统计: {history_stats}")
+    decrypt_stats = getattr(fetcher, "decrypt_stats", {})
+    if decrypt_stats:
+        logger.info(f"解密进程池统计: {decrypt_stats}")
+    if rate_limiter is not None:
+        logger.info(f"限速器统计: {rate_limiter.snapshot()}")
+    if gazetteer is not None:
+        logger.info(f"明星词典统计: {gazetteer.stats}")
+        gazetteer.save_learned()
 
     logger.info("抓取并处理完成")
 
@@ -62,5 +227,8 @@ def fetch_and_process(
         "total": total,
         "kept": kept,
         "filtered": total - kept if total is not None else None,
+        "unique_titles": processor.last_stats.get("unique_titles"),
+        "fetched_dates": fetched_dates,
+        "http": http_stats,
         "output_path": str(output_path)
     }
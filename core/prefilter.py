@@ -0,0 +1,110 @@
+"""
+负向规则预过滤
+节日、天气、交通、政策通报、地名新闻等明显与明星无关的话题在调用 API 之前直接丢弃。
+"""
+import json
+import logging
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Pattern
+
+from config.settings import NEGATIVE_RULES_FILE
+from .cache import normalize_title
+from .gazetteer import AhoCorasick
+
+logger = logging.getLogger(__name__)
+
+
+class NegativeRuleFilter:
+    """基于关键词集合和预编译正则的负向规则过滤器，统计每条规则的命中次数"""
+
+    def __init__(self, rules_file: Optional[Path] = None):
+        """
+        初始化过滤器
+
+        Args:
+            rules_file: 规则文件（JSON），格式为
+                {"rules": [{"name": ..., "keywords": [...], "patterns": [...]}]}
+        """
+        self.rules_file = Path(rules_file or NEGATIVE_RULES_FILE)
+        self._keywords = AhoCorasick()
+        self._patterns: List[tuple] = []
+        self.rule_names: List[str] = []
+        self.stats: Dict[str, int] = {}
+
+        if self.rules_file.exists():
+            self.load_rules_file(self.rules_file)
+        else:
+            logger.warning(f"负向规则文件不存在: {self.rules_file}")
+
+    def add_rule(self, name: str, keywords: Iterable[str] = (), patterns: Iterable[str] = ()):
+        """
+        添加一条规则
+
+        Args:
+            name: 规则名称，用于命中统计
+            keywords: 子串关键词，标题包含任意一个即命中
+            patterns: 正则表达式，作用于归一化后的标题，忽略大小写
+        """
+        for keyword in keywords:
+            key = normalize_title(keyword)
+            if key:
+                self._keywords.add(key, name)
+
+        compiled: List[Pattern] = [re.compile(p, re.IGNORECASE) for p in patterns]
+        if compiled:
+            self._patterns.append((name, compiled))
+
+        if name not in self.stats:
+            self.rule_names.append(name)
+            self.stats[name] = 0
+
+    def load_rules_file(self, path: Path) -> int:
+        """
+        从规则文件加载规则
+
+        Returns:
+            int: 加载的规则数量
+        """
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+        rules = data.get("rules", []) if isinstance(data, dict) else data
+        for rule in rules:
+            self.add_rule(rule["name"], rule.get("keywords", []), rule.get("patterns", []))
+        logger.info(f"从 {path} 加载了 {len(rules)} 条负向规则")
+        return len(rules)
+
+    def match(self, title: str) -> Optional[str]:
+        """
+        检查标题是否命中负向规则
+
+        Returns:
+            Optional[str]: 命中的规则名称，未命中返回 None
+        """
+        key = normalize_title(title)
+        name = self._keywords.find_first(key)
+        if name is None:
+            for rule_name, patterns in self._patterns:
+                if any(p.search(key) for p in patterns):
+                    name = rule_name
+                    break
+
+        if name is not None:
+            self.stats[name] += 1
+        return name
+
+    @property
+    def total_hits(self) -> int:
+        return sum(self.stats.values())
+
+    def report(self, calls_per_item: int = 1) -> str:
+        """
+        生成命中统计摘要
+
+        Args:
+            calls_per_item: 每条被丢弃的标题原本需要的 API 调用次数（增强模式为 2）
+        """
+        parts = [f"{name}={count}" for name, count in self.stats.items() if count]
+        saved = self.total_hits * calls_per_item
+        return f"负向规则命中 {self.total_hits} 条，节省约 {saved} 次API调用 ({', '.join(parts) or '无'})"
@@ -0,0 +1,214 @@
+"""
+自适应限速器
+令牌桶 + AIMD：请求成功时加性提高速率，遇到 429 / 5xx / Retry-After 时乘性降低速率。
+两个分类器共享同一个实例，即可在接口允许的最高吞吐下运行而无需手动调节 --delay。
+"""
+import asyncio
+import logging
+import time
+from email.utils import parsedate_to_datetime
+from threading import Lock
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from config.settings import (
+    RATE_LIMIT_INITIAL,
+    RATE_LIMIT_MIN,
+    RATE_LIMIT_MAX,
+    RATE_LIMIT_MAX_RETRIES,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def is_retryable(error: Exception) -> bool:
+    """429、5xx 以及连接类错误视为可重试的限流信号"""
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    if isinstance(status, int):
+        return status == 429 or status >= 500
+    return type(error).__name__ in ("APIConnectionError", "APITimeoutError")
+
+
+def parse_retry_after(headers: Any) -> Optional[float]:
+    """
+    从响应头解析 Retry-After（支持秒数、HTTP 日期以及 retry-after-ms）
+
+    Returns:
+        Optional[float]: 需要等待的秒数，无法解析时返回 None
+    """
+    if not headers:
+        return None
+    try:
+        value = headers.get("retry-after-ms")
+        if value:
+            return max(0.0, float(value) / 1000)
+        value = headers.get("retry-after")
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except Exception:
+        return None
+
+
+class AdaptiveRateLimiter:
+    """线程安全、同时支持同步与异步调用的 AIMD 令牌桶限速器"""
+
+    def __init__(
+        self,
+        initial_rate: Optional[float] = None,
+        min_rate: Optional[float] = None,
+        max_rate: Optional[float] = None,
+        increase: float = 1.0,
+        decrease_factor: float = 0.5,
+        burst: float = 1.0,
+        max_retries: Optional[int] = None,
+        is_retryable: Callable[[Exception], bool] = is_retryable,
+    ):
+        """
+        初始化限速器
+
+        Args:
+            initial_rate: 初始速率（请求/秒）
+            min_rate: 速率下限
+            max_rate: 速率上限
+            increase: 加性增长幅度，约等于每秒成功请求带来的速率增量
+            decrease_factor: 遇到限流时速率乘以的系数
+            burst: 令牌桶容量，允许的瞬时突发请求数
+            max_retries: 遇到可重试错误时的最大重试次数
+            is_retryable: 判断异常是否为限流/服务端错误的函数
+        """
+        self.min_rate = RATE_LIMIT_MIN if min_rate is None else min_rate
+        self.max_rate = RATE_LIMIT_MAX if max_rate is None else max_rate
+        rate = RATE_LIMIT_INITIAL if initial_rate is None else initial_rate
+        self._rate = min(self.max_rate, max(self.min_rate, rate))
+        self.increase = increase
+        self.decrease_factor = decrease_factor
+        self.burst = max(1.0, burst)
+        self.max_retries = RATE_LIMIT_MAX_RETRIES if max_retries is None else max_retries
+        self.is_retryable = is_retryable
+
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._last_decrease = 0.0
+        self._lock = Lock()
+        self.stats = {"requests": 0, "successes": 0, "throttled": 0, "retries": 0}
+
+    @property
+    def current_rate(self) -> float:
+        """当前允许的速率（请求/秒）"""
+        return self._rate
+
+    def snapshot(self) -> Dict[str, float]:
+        """返回当前速率和计数，用于日志与监控"""
+        with self._lock:
+            return dict(self.stats, rate=round(self._rate, 3))
+
+    def _reserve(self) -> float:
+        """尝试取出一个令牌，返回需要等待的秒数（0 表示已取得）"""
+        with self._lock:
+            now = time.monotonic()
+            if now < self._blocked_until:
+                return self._blocked_until - now
+
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self._rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                self.stats["requests"] += 1
+                return 0.0
+            return (1 - self._tokens) / self._rate
+
+    def acquire(self):
+        """阻塞直到可以发出下一个请求"""
+        while True:
+            wait = self._reserve()
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        """acquire 的异步版本，等待期间不阻塞事件循环"""
+        while True:
+            wait = self._reserve()
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    def record_success(self):
+        """加性增长：每次成功按 increase / rate 提高速率"""
+        with self._lock:
+            self.stats["successes"] += 1
+            self._rate = min(self.max_rate, self._rate + self.increase / max(self._rate, 1.0))
+
+    def record_throttle(self, retry_after: Optional[float] = None):
+        """
+        乘性下降：遇到限流或服务端错误时降低速率
+
+        在途请求可能同时收到多个 429，同一个冷却窗口内只降速一次。
+
+        Args:
+            retry_after: 服务端要求的等待秒数，期间暂停发放令牌
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.stats["throttled"] += 1
+            if now - self._last_decrease >= 1.0 / self._rate:
+                self._rate = max(self.min_rate, self._rate * self.decrease_factor)
+                self._last_decrease = now
+                logger.info(f"触发限流，速率降低到 {self._rate:.2f} 请求/秒")
+            if retry_after:
+                self._blocked_until = max(self._blocked_until, now + retry_after)
+            self._tokens = 0.0
+
+    def _handle_error(self, error: Exception, attempt: int) -> bool:
+        """记录失败并返回是否应当重试"""
+        if not self.is_retryable(error):
+            return False
+        headers = getattr(getattr(error, "response", None), "headers", None)
+        self.record_throttle(parse_retry_after(headers))
+        if attempt >= self.max_retries:
+            return False
+        with self._lock:
+            self.stats["retries"] += 1
+        logger.warning(f"请求被限流或失败，第 {attempt + 1} 次重试: {error}")
+        return True
+
+    def call(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        在限速器控制下调用 fn，遇到可重试错误时自动退避重试
+
+        Returns:
+            Any: fn 的返回值；重试耗尽或不可重试时抛出最后一次的异常
+        """
+        attempt = 0
+        while True:
+            self.acquire()
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                if not self._handle_error(e, attempt):
+                    raise
+                attempt += 1
+                continue
+            self.record_success()
+            return result
+
+    async def acall(self, fn: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        """call 的异步版本，fn 为返回可等待对象的函数"""
+        attempt = 0
+        while True:
+            await self.acquire_async()
+            try:
+                result = await fn(*args, **kwargs)
+            except Exception as e:
+                if not self._handle_error(e, attempt):
+                    raise
+                attempt += 1
+                continue
+            self.record_success()
+            return result
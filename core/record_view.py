@@ -0,0 +1,89 @@
+"""
+记录视图
+按日期展开的记录不再复制源数据：RecordView 只保存源字典的引用、来源日期与序号，
+处理过程中新增的字段（filter_reason 等）写入独立的覆盖层。视图在读取时表现为只读字典，
+写出时（json_default）才合并为普通字典，因此整个流程中输入数据只有一份。
+"""
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, Optional
+
+from .history_store import json_default as _history_json_default
+
+SOURCE_DATE_KEY = "_source_date"
+
+
+class RecordView(Mapping):
+    """源记录的只读视图，附带来源日期和覆盖字段"""
+
+    __slots__ = ("source", "date", "index", "overlay")
+
+    def __init__(
+        self,
+        source: Any,
+        date: Optional[str] = None,
+        index: Optional[int] = None,
+        overlay: Optional[Dict[str, Any]] = None
+    ):
+        """
+        Args:
+            source: 源记录（不会被修改）；不是字典时按 {"raw_data": source} 处理
+            date: 来源日期，通过 "_source_date" 键读取，写出时省略
+            index: 记录在当天列表中的序号
+            overlay: 覆盖源记录的字段
+        """
+        if isinstance(source, RecordView):
+            overlay = {**(source.overlay or {}), **(overlay or {})}
+            date = source.date if date is None else date
+            index = source.index if index is None else index
+            source = source.source
+        elif not isinstance(source, Mapping):
+            source = {"raw_data": source}
+        if date is None and SOURCE_DATE_KEY in source:
+            date = source[SOURCE_DATE_KEY]
+        self.source = source
+        self.date = date
+        self.index = index
+        self.overlay = overlay or None
+
+    def __getitem__(self, key: str) -> Any:
+        overlay = self.overlay
+        if overlay is not None and key in overlay:
+            return overlay[key]
+        if key == SOURCE_DATE_KEY and self.date is not None:
+            return self.date
+        return self.source[key]
+
+    def __iter__(self) -> Iterator[str]:
+        overlay = self.overlay or {}
+        for key in self.source:
+            if key != SOURCE_DATE_KEY or self.date is None:
+                yield key
+        for key in overlay:
+            if key not in self.source:
+                yield key
+        if self.date is not None:
+            yield SOURCE_DATE_KEY
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"RecordView({self.materialize()!r}, date={self.date!r})"
+
+    def derive(self, **fields: Any) -> "RecordView":
+        """返回共享同一源记录、带有额外覆盖字段的新视图（替代 dict(item) 后再赋值）"""
+        return RecordView(self, overlay=fields)
+
+    def materialize(self) -> Dict[str, Any]:
+        """合并为普通字典（不含来源日期），只在写出时调用"""
+        record = {k: v for k, v in self.source.items() if k != SOURCE_DATE_KEY}
+        if self.overlay:
+            record.update(self.overlay)
+        return record
+
+
+def json_default(obj: Any) -> Any:
+    """json.dump 的 default 钩子：RecordView 合并为字典，CompactHistory 序列化为列"""
+    if isinstance(obj, RecordView):
+        return obj.materialize()
+    return _history_json_default(obj)
@@ -5,21 +5,12 @@
 import json
 import logging
 from typing import Optional, Dict, Any
+from .cache import TitleDecisionCache
+from .rate_limiter import AdaptiveRateLimiter
 
 logger = logging.getLogger(__name__)
 
-class RelatedCelebrityClassifier:
-    def __init__(self, client, model="deepseek-chat"):
-        self.client = client
-        self.model = model
-    
-    def infer_related_celebrity(self, title: str) -> Optional[Dict[str, Any]]:
-        """
-        分析标题，推断最相关的明星。
-        返回一个字典，包含明星姓名和推理原因。
-        如果无法推断，则返回None。
-        """
-        system_prompt = """你是一个精通流行文化和网络热点的分析专家。你的任务是从一个不直接提及真实人物明星的标题中，推断出与之关联最紧密、在网络讨论中热度最高的现实世界明星（演员、导演、歌手、知名公众人物等）。
+RELATED_SYSTEM_PROMPT = """你是一个精通流行文化和网络热点的分析专家。你的任务是从一个不直接提及真实人物明星的标题中，推断出与之关联最紧密、在网络讨论中热度最高的现实世界明星（演员、导演、歌手、知名公众人物等）。
 
 分析步骤：
 1. **理解主题**：识别标题所指的文化产品（电影、电视剧、综艺、书籍）、作品、事件、网络梗或抽象概念。
@@ -41,40 +32,118 @@ class RelatedCelebrityClassifier:
 
 请确保‘related_celebrity’字段只包含人名，不要带称谓和额外说明。"""
 
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": f"请分析以下标题，并推断最相关的明星：\n标题：{title}"}
-        ]
-        
+
+class RelatedCelebrityClassifier:
+    def __init__(
+        self,
+        client,
+        model="deepseek-chat",
+        cache: Optional[TitleDecisionCache] = None,
+        async_client=None,
+        rate_limiter: Optional[AdaptiveRateLimiter] = None
+    ):
+        self.client = client
+        self.model = model
+        self.cache = cache
+        self.async_client = async_client
+        self.rate_limiter = rate_limiter
+    
+    def infer_related_celebrity(self, title: str) -> Optional[Dict[str, Any]]:
+        """
+        分析标题，推断最相关的明星。
+        返回一个字典，包含明星姓名和推理原因。
+        如果无法推断，则返回None；API调用失败时返回 {"name": None, "error": 错误信息}。
+        """
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                response_format={ "type": "json_object" }, # 要求返回结构化JSON
-                stream=False
-            )
-            result_text = response.choices[0].message.content
-            result = json.loads(result_text)
-            
-            # 解析结果
-            related_celebrity = result.get("related_celebrity")
-            reasoning = result.get("reasoning", "无说明")
-            
-            if related_celebrity:
-                logger.info(f"标题 ‘{title}’ 的关联明星推断为: {related_celebrity}， 原因: {reasoning}")
-                return {
-                    "name": related_celebrity,
-                    "original_title": title,
-                    "reasoning": reasoning,
-                    "type": "related" # 标记为关联推断结果
-                }
-            else:
-                logger.info(f"标题 ‘{title}’ 未推断出明确关联明星。原因: {reasoning}")
-                return None
-                
-        except json.JSONDecodeError:
-            logger.error(f"解析关联明星推断的JSON响应失败。原始响应: {result_text}")
+            if self.cache is None:
+                return self._infer(title)
+
+            key = self.cache.make_key("related", title, self.model, RELATED_SYSTEM_PROMPT)
+            result = self.cache.get_or_compute(key, lambda: self._infer(title))
+            if result:
+                # 缓存中保存的是首次出现时的标题，替换为当前标题
+                result = dict(result, original_title=title)
+            return result
+
+        except json.JSONDecodeError as e:
+            logger.error(f"解析关联明星推断的JSON响应失败。原始响应: {e.doc}")
             return None
         except Exception as e:
             logger.error(f"关联明星推断API调用失败: {e}")
-            return None
\ No newline at end of file
+            return {"name": None, "error": str(e)}
+
+    async def ainfer_related_celebrity(self, title: str) -> Optional[Dict[str, Any]]:
+        """infer_related_celebrity 的异步版本，使用 async_client 发起请求"""
+        try:
+            if self.cache is None:
+                return await self._ainfer(title)
+
+            key = self.cache.make_key("related", title, self.model, RELATED_SYSTEM_PROMPT)
+            result = await self.cache.aget_or_compute(key, lambda: self._ainfer(title))
+            if result:
+                result = dict(result, original_title=title)
+            return result
+
+        except json.JSONDecodeError as e:
+            logger.error(f"解析关联明星推断的JSON响应失败。原始响应: {e.doc}")
+            return None
+        except Exception as e:
+            logger.error(f"关联明星推断API调用失败: {e}")
+            return {"name": None, "error": str(e)}
+
+    def _create(self, **kwargs):
+        """发起 chat completion 请求，配置了限速器时经由限速器调用"""
+        if self.rate_limiter is None:
+            return self.client.chat.completions.create(**kwargs)
+        return self.rate_limiter.call(self.client.chat.completions.create, **kwargs)
+
+    async def _acreate(self, **kwargs):
+        if self.rate_limiter is None:
+            return await self.async_client.chat.completions.create(**kwargs)
+        return await self.rate_limiter.acall(self.async_client.chat.completions.create, **kwargs)
+
+    @staticmethod
+    def _build_messages(title: str):
+        return [
+            {"role": "system", "content": RELATED_SYSTEM_PROMPT},
+            {"role": "user", "content": f"请分析以下标题，并推断最相关的明星：\n标题：{title}"}
+        ]
+
+    def _infer(self, title: str) -> Optional[Dict[str, Any]]:
+        """调用API推断关联明星，异常由调用方处理"""
+        response = self._create(
+            model=self.model,
+            messages=self._build_messages(title),
+            response_format={ "type": "json_object" }, # 要求返回结构化JSON
+            stream=False
+        )
+        return self._parse_result(title, response.choices[0].message.content)
+
+    async def _ainfer(self, title: str) -> Optional[Dict[str, Any]]:
+        response = await self._acreate(
+            model=self.model,
+            messages=self._build_messages(title),
+            response_format={ "type": "json_object" },
+            stream=False
+        )
+        return self._parse_result(title, response.choices[0].message.content)
+
+    @staticmethod
+    def _parse_result(title: str, result_text: str) -> Optional[Dict[str, Any]]:
+        result = json.loads(result_text)
+        
+        # 解析结果
+        related_celebrity = result.get("related_celebrity")
+        reasoning = result.get("reasoning", "无说明")
+        
+        if related_celebrity:
+            logger.info(f"标题 ‘{title}’ 的关联明星推断为: {related_celebrity}， 原因: {reasoning}")
+            return {
+                "name": related_celebrity,
+                "original_title": title,
+                "reasoning": reasoning,
+                "type": "related" # 标记为关联推断结果
+            }
+        else:
+            logger.info(f"标题 ‘{title}’ 未推断出明确关联明星。原因: {reasoning}")
+            return None
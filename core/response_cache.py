@@ -0,0 +1,178 @@
+"""
+weibotop 响应缓存
+以 "接口 + 逻辑参数"（日期、timeid、关键词）为键，把解密后的响应保存在磁盘上；
+键与密文无关，换密钥或加密结果变化都不影响命中。已经结束的日期和 timeid 对应的快照
+不会再变化，永不过期；仍在变化的（当天的）数据按 TTL 过期。条目总数超过上限时按最近访问时间淘汰。
+"""
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from collections import OrderedDict
+from datetime import date
+from pathlib import Path
+from threading import Lock
+from typing import Any, List, Optional
+
+from config.settings import WEIBOTOP_CACHE_DIR, WEIBOTOP_CACHE_MAX_ENTRIES, WEIBOTOP_CACHE_TTL
+
+logger = logging.getLogger(__name__)
+
+
+class OfflineCacheMiss(Exception):
+    """离线模式下缓存未命中"""
+
+
+class ResponseCache:
+    """内容寻址的磁盘缓存，每个条目一个 JSON 文件，写入为原子操作"""
+
+    def __init__(
+        self,
+        root: Optional[Path] = None,
+        ttl: Optional[float] = None,
+        offline: bool = False,
+        max_entries: Optional[int] = None
+    ):
+        """
+        Args:
+            root: 缓存目录，默认 WEIBOTOP_CACHE_DIR
+            ttl: 仍在变化的条目的有效期（秒）
+            offline: 离线/回放模式：只读缓存（过期条目同样可用），从不访问网络
+            max_entries: 磁盘上保留的最大条目数，超出时按最近访问时间淘汰，0 表示不限制
+        """
+        self.root = Path(root or WEIBOTOP_CACHE_DIR)
+        self.ttl = WEIBOTOP_CACHE_TTL if ttl is None else ttl
+        self.offline = offline
+        self.max_entries = WEIBOTOP_CACHE_MAX_ENTRIES if max_entries is None else max_entries
+        self._lock = Lock()
+        # 条目路径按最近访问时间排序（最久未访问的在前）；首次写入时扫描一次目录建立，之后在内存中维护
+        self._index: "Optional[OrderedDict[Path, None]]" = None
+        self.stats = {"hits": 0, "misses": 0, "stale": 0, "writes": 0, "evicted": 0}
+
+    def _path(self, endpoint: str, param: str) -> Path:
+        digest = hashlib.sha256(f"{endpoint}\x00{param}".encode("utf-8")).hexdigest()
+        return self.root / digest[:2] / f"{digest}.json"
+
+    def _count(self, name: str):
+        with self._lock:
+            self.stats[name] += 1
+
+    def get(self, endpoint: str, param: Any, closed_on: Optional[str] = None) -> Optional[Any]:
+        """
+        读取缓存
+
+        Args:
+            endpoint: 接口名（getclosesttime / currentitems / getrankhistory）
+            param: 逻辑参数
+            closed_on: 所需数据对应的日期（YYYY-MM-DD）。条目在该日期之后抓取时视为已定型、
+                永不过期，否则按 TTL 判断；为 None 表示数据不会变化（如 timeid 对应的快照）
+
+        Returns:
+            Optional[Any]: 缓存的数据，未命中或已过期时返回 None
+        """
+        path = self._path(endpoint, str(param))
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            self._count("misses")
+            return None
+
+        if not self.offline and closed_on is not None and entry["fetched_on"] <= closed_on:
+            if time.time() - entry["fetched_at"] > self.ttl:
+                self._count("stale")
+                return None
+        if not self.offline:
+            # 文件修改时间记录最近访问时间，下次运行重建索引时使用
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+        with self._lock:
+            self.stats["hits"] += 1
+            if self._index is not None and path in self._index:
+                self._index.move_to_end(path)
+        return entry["data"]
+
+    def put(self, endpoint: str, param: Any, data: Any):
+        """写入缓存（先写临时文件再替换，并发写入和中途崩溃都不会留下损坏的条目）"""
+        path = self._path(endpoint, str(param))
+        entry = {
+            "endpoint": endpoint,
+            "param": str(param),
+            "fetched_at": time.time(),
+            "fetched_on": date.today().isoformat(),
+            "data": data,
+        }
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning(f"写入响应缓存失败: {e}")
+            return
+        with self._lock:
+            self.stats["writes"] += 1
+            if not self.max_entries:
+                return
+            index = self._load_index()
+            index[path] = None
+            index.move_to_end(path)
+            overflow = self._pop_overflow()
+        self._remove(overflow)
+
+    def _load_index(self) -> "OrderedDict[Path, None]":
+        """扫描缓存目录建立访问顺序索引（调用方需持有 _lock），每个实例只扫描一次"""
+        if self._index is None:
+            entries = []
+            for path in self.root.glob("*/*.json"):
+                try:
+                    entries.append((path.stat().st_mtime, path))
+                except OSError:
+                    pass
+            entries.sort()
+            self._index = OrderedDict((path, None) for _, path in entries)
+        return self._index
+
+    def _pop_overflow(self) -> List[Path]:
+        """从索引中取出超出 max_entries 的最久未访问条目（调用方需持有 _lock）"""
+        overflow = []
+        while len(self._index) > self.max_entries:
+            overflow.append(self._index.popitem(last=False)[0])
+        return overflow
+
+    def _remove(self, paths: List[Path]) -> int:
+        removed = 0
+        for path in paths:
+            try:
+                path.unlink()
+                removed += 1
+            except OSError:
+                pass
+        if removed:
+            with self._lock:
+                self.stats["evicted"] += removed
+            logger.info(f"响应缓存淘汰 {removed} 条最久未访问的记录")
+        return removed
+
+    def evict(self) -> int:
+        """
+        按最近访问时间淘汰超出 max_entries 的条目（写入时会自动执行）
+
+        Returns:
+            int: 删除的条目数
+        """
+        if not self.max_entries:
+            return 0
+        with self._lock:
+            self._load_index()
+            overflow = self._pop_overflow()
+        return self._remove(overflow)
+
+    def miss(self, endpoint: str, param: Any) -> OfflineCacheMiss:
+        """构造离线模式下的未命中异常"""
+        return OfflineCacheMiss(f"离线模式: 缓存中没有 {endpoint}({param})")
@@ -26,6 +26,18 @@ def parse_args():
     p.add_argument("--workers", type=int, default=10, help="并发线程数（含历史时建议小些）")
     p.add_argument("--model", type=str, default=None, help="DeepSeek 模型名称（可选）")
     p.add_argument("--enhanced", action="store_true", help="启用增强模式（关联明星推断）")
+    p.add_argument("--no-cache", action="store_true", help="禁用标题判定结果缓存")
+    p.add_argument("--no-gazetteer", action="store_true", help="禁用明星词典预过滤")
+    p.add_argument("--no-negative-rules", action="store_true", help="禁用负向规则预过滤")
+    p.add_argument("--no-rate-limit", action="store_true", help="禁用自适应限速，改用固定请求延迟")
+    p.add_argument("--concurrency", type=int, default=None, help="DeepSeek 最大并发请求数（大于 1 时启用异步引擎）")
+    p.add_argument("--fetch-engine", choices=["thread", "async"], default=None, help="抓取引擎：thread（线程池）或 async（asyncio，需要 aiohttp），默认见配置")
+    p.add_argument("--no-http-cache", action="store_true", help="禁用 weibotop 响应缓存，所有请求都访问网络")
+    p.add_argument("--offline", action="store_true", help="离线回放模式：只使用响应缓存中的数据，不访问网络")
+    p.add_argument("--history-format", choices=["full", "compact"], default=None, help="关键词历史明细格式：full（逐点记录）或 compact（按列存储，体积小得多），默认见配置")
+    p.add_argument("--history-bucket", type=int, default=None, help="历史明细降采样时段（分钟，如 5/15/60），0 表示保留全部数据点，默认见配置")
+    p.add_argument("--incremental", action="store_true", help="增量模式：只抓取原始文件/输出文件中缺失或过期的日期，并合并进已有文件")
+    p.add_argument("--refresh-days", type=int, default=None, help="增量模式下总是重新抓取的最近天数（默认见配置，0 表示不刷新）")
     return p.parse_args()
 
 
@@ -64,6 +76,18 @@ def main():
             model=args.model,
             enhanced=args.enhanced,
             delay=None,
+            use_cache=not args.no_cache,
+            concurrency=args.concurrency,
+            adaptive_rate=not args.no_rate_limit,
+            use_gazetteer=not args.no_gazetteer,
+            use_negative_rules=not args.no_negative_rules,
+            incremental=args.incremental,
+            refresh_days=args.refresh_days,
+            fetch_engine=args.fetch_engine,
+            use_http_cache=not args.no_http_cache,
+            offline=args.offline,
+            history_format=args.history_format,
+            history_bucket_minutes=args.history_bucket,
         )
         logger.info(f"处理完成: {result}")
     except Exception as e:
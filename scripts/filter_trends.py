@@ -13,9 +13,13 @@ sys.path.insert(0, str(project_root))
 from config.settings import (
     DEFAULT_INPUT_FILE, 
     DEFAULT_OUTPUT_FILE, 
-    DEFAULT_DELAY
+    DEFAULT_DELAY,
+    DEFAULT_CONCURRENCY
 )
-from core import DeepSeekClient, TitleClassifier, DataProcessor, RelatedCelebrityClassifier
+from core import DeepSeekClient, TitleClassifier, DataProcessor, RelatedCelebrityClassifier, TitleDecisionCache, DecisionJournal
+from core.rate_limiter import AdaptiveRateLimiter
+from core.gazetteer import CelebrityGazetteer
+from core.prefilter import NegativeRuleFilter
 from utils import setup_logger
 
 
@@ -66,21 +70,89 @@ def main():
         action="store_true",  # 启用时设为True
         help="启用增强模式，对非直接明星标题进行关联明星推断"
     )
+
+    parser.add_argument(
+        "--gazetteer",
+        type=str,
+        default=None,
+        help="明星词典文件（每行一个明星，别名用 | 分隔），命中的标题不调用API"
+    )
+
+    parser.add_argument(
+        "--no-gazetteer",
+        action="store_true",
+        help="禁用明星词典预过滤"
+    )
+
+    parser.add_argument(
+        "--rules",
+        type=str,
+        default=None,
+        help="负向规则文件（JSON），命中的节日/天气/政策等标题不调用API直接丢弃"
+    )
+
+    parser.add_argument(
+        "--no-negative-rules",
+        action="store_true",
+        help="禁用负向规则预过滤"
+    )
+
+    parser.add_argument(
+        "--no-rate-limit",
+        action="store_true",
+        help="禁用自适应限速（AIMD），改用 --delay 指定的固定延迟"
+    )
+
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help=f"最大并发请求数，大于 1 时启用异步并发引擎，默认 {DEFAULT_CONCURRENCY}"
+    )
+
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="禁用标题判定结果缓存，所有标题都重新调用API"
+    )
+
+    parser.add_argument(
+        "--journal",
+        type=str,
+        default=None,
+        help="写入逐条决策日志（JSONL）的路径；默认不写日志，指定 --resume 时默认为输出文件名加 .journal.jsonl"
+    )
+
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="从决策日志恢复：跳过已有决策的记录，只重新处理未完成和调用失败的记录"
+    )
     
     args = parser.parse_args()
     
-    # 处理延迟参数
-    delay = 0 if args.no_delay else args.delay
+    # 处理延迟参数；启用自适应限速时由限速器控制请求节奏
+    rate_limiter = None if args.no_rate_limit else AdaptiveRateLimiter()
+    delay = 0 if args.no_delay or rate_limiter else args.delay
     
     try:
         # 初始化客户端和处理器
         logger.info("初始化DeepSeek客户端...")
-        client = DeepSeekClient()
+        client = DeepSeekClient(max_retries=0 if rate_limiter else 2)
         
         logger.info("初始化分类器...")
-        classifier = TitleClassifier(client.get_client(), model=args.model)
+        cache = None if args.no_cache else TitleDecisionCache()
+        classifier = TitleClassifier(
+            client.get_client(),
+            model=args.model,
+            cache=cache,
+            async_client=client.get_async_client(),
+            rate_limiter=rate_limiter
+        )
         
         processor = DataProcessor()
+        gazetteer = None if args.no_gazetteer else CelebrityGazetteer(names_file=args.gazetteer)
+        negative_filter = None if args.no_negative_rules else NegativeRuleFilter(rules_file=args.rules)
         
         # 处理文件
         input_path = Path(args.input)
@@ -88,22 +160,35 @@ def main():
         
         logger.info(f"开始处理文件: {input_path}")
         
-        # 加载数据
-        records, container_key, original_data = processor.load_json_file(input_path)
+        # 流式读取数据（只解析一次，处理结束后记录流保留原始结构用于回写）
+        records = processor.iter_json_records(input_path)
+        # 决策日志按需开启：指定 --journal 或 --resume 时才写入
+        journal_path = None
+        if args.journal or args.resume:
+            journal_path = Path(args.journal) if args.journal else output_path.with_name(output_path.name + ".journal.jsonl")
+        journal = DecisionJournal(journal_path, source=input_path.resolve(), resume=args.resume) if journal_path else None
         
         # 处理数据
-        filtered_records, total, kept = processor.process_file(
-            input_path=Path(args.input),
-            classifier=classifier,
-            delay=delay,
-            enhance_model=args.enhanced
-        )
+        try:
+            filtered_records, total, kept = processor.process_records(
+                records,
+                classifier=classifier,
+                delay=delay,
+                enhance_model=args.enhanced,
+                concurrency=args.concurrency,
+                gazetteer=gazetteer,
+                negative_filter=negative_filter,
+                journal=journal
+            )
+        finally:
+            if journal is not None:
+                journal.close()
         
         # 保存结果
         processor.save_filtered_data(
             filtered_records, 
-            original_data, 
-            container_key, 
+            records.skeleton, 
+            records.container_key, 
             output_path
         )
         
@@ -111,10 +196,22 @@ def main():
         logger.info("=" * 50)
         logger.info(f"处理完成!")
         logger.info(f"总记录数: {total}")
+        logger.info(f"不同标题数: {processor.last_stats.get('unique_titles', total)}")
         logger.info(f"保留记录数: {kept}")
         logger.info(f"过滤记录数: {total - kept}")
+        logger.info(f"从日志恢复数: {processor.last_stats.get('resumed', 0)}")
+        logger.info(f"调用失败数: {processor.last_stats.get('errors', 0)}")
         logger.info(f"保留比例: {kept/total*100:.1f}%" if total > 0 else "N/A")
         logger.info(f"输出文件: {output_path}")
+        if journal_path:
+            logger.info(f"决策日志: {journal_path}")
+        if cache is not None:
+            logger.info(f"缓存统计: {cache.stats}")
+        if rate_limiter is not None:
+            logger.info(f"限速器统计: {rate_limiter.snapshot()}")
+        if gazetteer is not None:
+            logger.info(f"明星词典统计: {gazetteer.stats}")
+            gazetteer.save_learned()
         logger.info("=" * 50)
         
     except ValueError as e:
@@ -0,0 +1,125 @@
+import asyncio
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import Mock
+
+from core import TitleClassifier, DataProcessor, AsyncClassificationEngine
+
+
+def _response(content):
+    response = Mock()
+    response.choices = [Mock(message=Mock(content=content))]
+    return response
+
+
+class FakeAsyncCompletions:
+    """按标题返回 YES/NO 的异步 chat.completions 替身，记录最大并发数"""
+
+    def __init__(self, celebrities):
+        self.celebrities = set(celebrities)
+        self.active = 0
+        self.max_active = 0
+        self.calls = 0
+
+    async def create(self, model, messages, stream=False, response_format=None):
+        self.calls += 1
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            user = messages[-1]["content"]
+            # 让后面的标题先返回，检验结果按原顺序回写
+            await asyncio.sleep(0.01 if "Z" in user else 0.03)
+            if response_format:
+                if "请分析以下标题" in user:
+                    return _response('{"related_celebrity": null, "reasoning": "无"}')
+                results = []
+                for line in user.splitlines():
+                    idx, title = line.split(". ", 1)
+                    verdict = "YES" if title in self.celebrities else "NO"
+                    results.append({"index": int(idx), "verdict": verdict})
+                return _response(json.dumps({"results": results}))
+            return _response("YES" if user in self.celebrities else "NO")
+        finally:
+            self.active -= 1
+
+
+class TestAsyncClassificationEngine(unittest.TestCase):
+
+    def _classifier(self, celebrities):
+        completions = FakeAsyncCompletions(celebrities)
+        async_client = Mock()
+        async_client.chat.completions = completions
+        return TitleClassifier(Mock(), async_client=async_client), completions
+
+    def test_results_keep_original_order(self):
+        classifier, _ = self._classifier({"A", "Z"})
+        engine = AsyncClassificationEngine(classifier, concurrency=4)
+
+        direct, related = engine.run(["A", None, "B", "Z"])
+
+        self.assertEqual([d[0] for d in direct], [True, False, False, True])
+        self.assertEqual(related, {})
+
+    def test_failed_direct_results_skip_related_inference(self):
+        classifier, _ = self._classifier(set())
+
+        async def aclassify_titles(titles, semaphore=None, progress=None):
+            return [(False, "ERROR: 429") if t == "E" else (False, "NO") for t in titles]
+
+        classifier.aclassify_titles = aclassify_titles
+        related = Mock()
+        inferred = []
+
+        async def ainfer(title):
+            inferred.append(title)
+            return None
+
+        related.ainfer_related_celebrity = ainfer
+        engine = AsyncClassificationEngine(classifier, related_classifier=related, concurrency=2)
+
+        direct, _ = engine.run(["E", "B"])
+
+        self.assertEqual(direct[0], (False, "ERROR: 429"))
+        self.assertEqual(inferred, ["B"])
+
+    def test_concurrency_limit(self):
+        classifier, completions = self._classifier(set())
+        engine = AsyncClassificationEngine(classifier, concurrency=2)
+
+        # 每批 1 条，共 6 次请求
+        async def run():
+            return await classifier.aclassify_titles(
+                list("ABCDEF"), semaphore=asyncio.Semaphore(2), max_size=1
+            )
+
+        from core.async_engine import run_sync
+        run_sync(run())
+        self.assertEqual(completions.calls, 6)
+        self.assertLessEqual(completions.max_active, 2)
+        self.assertTrue(engine.supports(classifier))
+
+    def test_process_file_with_concurrency(self):
+        classifier, _ = self._classifier({"A"})
+        data = {"items": [{"title": "A"}, {"title": "B"}, {"title": "Z"}]}
+
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
+            json.dump(data, f)
+            temp_path = Path(f.name)
+
+        try:
+            filtered, total, kept = DataProcessor().process_file(
+                temp_path, classifier, delay=0, enhance_model=True, concurrency=3
+            )
+        finally:
+            temp_path.unlink()
+
+        self.assertEqual(total, 3)
+        self.assertEqual(kept, 1)
+        self.assertEqual(filtered[0]["title"], "A")
+        self.assertEqual(filtered[0]["filter_reason"], "direct_celebrity")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from benchmarks.weibotop_stub import SECRET_KEY, WeiboTopStub
+from core.fetcher import WeiboHotSearchFetcher
+
+
+@pytest.fixture
+def stub():
+    server = WeiboTopStub(items_per_day=6, keyword_pool=9, throttle_every=7)
+    url = server.start()
+    server.url = url
+    yield server
+    server.stop()
+
+
+@pytest.mark.parametrize("with_history", [False, True])
+def test_async_engine_matches_thread_engine(stub, monkeypatch, with_history):
+    monkeypatch.setattr('core.fetcher.HISTORY_RATE_LIMIT_INITIAL', 500.0)
+    monkeypatch.setattr('core.fetcher.HISTORY_RATE_LIMIT_MAX', 500.0)
+
+    threaded = WeiboHotSearchFetcher(secret_key=SECRET_KEY, base_url=stub.url, engine="thread")
+    expected = threaded.fetch_date_range("2025-12-01", "2025-12-04", max_workers=4, with_history=with_history)
+
+    async_fetcher = WeiboHotSearchFetcher(secret_key=SECRET_KEY, base_url=stub.url, engine="async")
+    actual = async_fetcher.fetch_date_range("2025-12-01", "2025-12-04", max_workers=4, with_history=with_history)
+
+    assert len(expected) == 4
+    assert {d: actual[d] for d in sorted(actual)} == {d: expected[d] for d in sorted(expected)}
+    stats = async_fetcher.http_stats
+    assert stats["reused"] > 0
+    assert stats["connections"] <= 4
+    if with_history:
+        assert all(it["history"] for day in actual.values() for it in day["items"])
+        # 每个关键词只请求一次；Code:DCE 被退避重试
+        assert async_fetcher.history_stats["keywords"] == 9
+        assert async_fetcher.history_stats["throttled"] >= 1
+
+
+def test_async_engine_stops_when_consumer_stops(stub):
+    fetcher = WeiboHotSearchFetcher(secret_key=SECRET_KEY, base_url=stub.url, engine="async")
+    dates = fetcher.date_list("2025-12-01", "2025-12-20")
+    it = fetcher.iter_dates(dates, max_workers=2, max_pending=2)
+    first = next(it)
+    it.close()
+    assert first[0] in dates
+    # 停止迭代后不会再抓取剩余的日期
+    assert stub.counts["currentitems"] < len(dates)
+
+
+def test_unknown_engine():
+    with pytest.raises(ValueError):
+        WeiboHotSearchFetcher(engine="gevent")
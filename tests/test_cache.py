@@ -0,0 +1,136 @@
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import Mock
+
+from core import TitleClassifier, RelatedCelebrityClassifier
+from core.cache import TitleDecisionCache, normalize_title
+
+
+def _mock_response(content):
+    response = Mock()
+    response.choices = [Mock(message=Mock(content=content))]
+    return response
+
+
+class TestTitleDecisionCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = Path(self.tmpdir.name) / "cache.sqlite3"
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_normalize_title(self):
+        self.assertEqual(normalize_title("  骄阳似我 "), "骄阳似我")
+        self.assertEqual(normalize_title("Taylor   SWIFT"), "taylor swift")
+        # 全角字符归一化
+        self.assertEqual(normalize_title("ＡＢＣ"), "abc")
+
+    def test_persist_across_instances(self):
+        cache = TitleDecisionCache(self.db_path, ttl=0)
+        key = cache.make_key("direct", "骄阳似我", "deepseek-chat", "prompt")
+        cache.set(key, [True, "YES"])
+        cache.close()
+
+        cache = TitleDecisionCache(self.db_path, ttl=0)
+        hit, value = cache.get(key)
+        self.assertTrue(hit)
+        self.assertEqual(value, [True, "YES"])
+        self.assertEqual(cache.stats["disk_hits"], 1)
+        cache.close()
+
+    def test_key_depends_on_model_and_prompt(self):
+        k1 = TitleDecisionCache.make_key("direct", "A", "m1", "p1")
+        self.assertNotEqual(k1, TitleDecisionCache.make_key("direct", "A", "m2", "p1"))
+        self.assertNotEqual(k1, TitleDecisionCache.make_key("direct", "A", "m1", "p2"))
+        self.assertEqual(k1, TitleDecisionCache.make_key("direct", " a ", "m1", "p1"))
+
+    def test_ttl_expiry(self):
+        cache = TitleDecisionCache(self.db_path, ttl=0.05)
+        cache.set("k", 1)
+        self.assertEqual(cache.get("k"), (True, 1))
+        time.sleep(0.1)
+        self.assertEqual(cache.get("k"), (False, None))
+        cache.close()
+
+    def test_memory_lru_eviction(self):
+        cache = TitleDecisionCache(":memory:", ttl=0, memory_size=2)
+        for k in ("a", "b", "c"):
+            cache.set(k, k)
+        self.assertNotIn("a", cache._memory)
+        # 内存淘汰后仍能从 SQLite 取回
+        self.assertEqual(cache.get("a"), (True, "a"))
+        cache.close()
+
+    def test_concurrent_lookups_share_one_call(self):
+        cache = TitleDecisionCache(":memory:", ttl=0)
+        calls = []
+        release = threading.Event()
+
+        def compute():
+            calls.append(1)
+            release.wait(1)
+            return "value"
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(cache.get_or_compute("k", compute)))
+            for _ in range(5)
+        ]
+        for t in threads:
+            t.start()
+        time.sleep(0.05)
+        release.set()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ["value"] * 5)
+        cache.close()
+
+
+class TestClassifierCaching(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = TitleDecisionCache(":memory:", ttl=0)
+        self.mock_client = Mock()
+
+    def tearDown(self):
+        self.cache.close()
+
+    def test_classify_title_uses_cache(self):
+        self.mock_client.chat.completions.create.return_value = _mock_response("YES")
+        classifier = TitleClassifier(self.mock_client, cache=self.cache)
+
+        self.assertEqual(classifier.classify_title("骄阳似我"), (True, "YES"))
+        self.assertEqual(classifier.classify_title("骄阳似我 "), (True, "YES"))
+        self.assertEqual(self.mock_client.chat.completions.create.call_count, 1)
+
+    def test_classify_title_errors_not_cached(self):
+        self.mock_client.chat.completions.create.side_effect = [
+            RuntimeError("boom"), _mock_response("NO")
+        ]
+        classifier = TitleClassifier(self.mock_client, cache=self.cache)
+
+        is_celeb, text = classifier.classify_title("感恩节")
+        self.assertFalse(is_celeb)
+        self.assertTrue(text.startswith("ERROR"))
+        self.assertEqual(classifier.classify_title("感恩节"), (False, "NO"))
+
+    def test_related_classifier_caches_null_result(self):
+        self.mock_client.chat.completions.create.return_value = _mock_response(
+            '{"related_celebrity": null, "reasoning": "节日"}'
+        )
+        classifier = RelatedCelebrityClassifier(self.mock_client, cache=self.cache)
+
+        self.assertIsNone(classifier.infer_related_celebrity("感恩节"))
+        self.assertIsNone(classifier.infer_related_celebrity("感恩节"))
+        self.assertEqual(self.mock_client.chat.completions.create.call_count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -46,5 +46,63 @@ class TestTitleClassifier(unittest.TestCase):
         self.assertEqual(text, "YES, THIS IS ABOUT A CELEBRITY")
 
 
+    def test_classify_titles_batch(self):
+        mock_response = Mock()
+        mock_response.choices = [Mock(message=Mock(
+            content='{"results": [{"index": 0, "verdict": "YES"}, {"index": 1, "verdict": "NO"}]}'
+        ))]
+        self.mock_client.chat.completions.create.return_value = mock_response
+
+        results = self.classifier.classify_titles(["Taylor Swift", "Thanksgiving"])
+
+        self.assertEqual(results, [(True, "YES"), (False, "NO")])
+        self.assertEqual(self.mock_client.chat.completions.create.call_count, 1)
+
+    def test_batch_verdicts_use_separate_cache_namespace(self):
+        from core.cache import TitleDecisionCache
+
+        cache = TitleDecisionCache(":memory:")
+        self.addCleanup(cache.close)
+        classifier = TitleClassifier(self.mock_client, cache=cache)
+        batch_response = Mock()
+        batch_response.choices = [Mock(message=Mock(content='{"results": [{"index": 0, "verdict": "YES"}]}'))]
+        single_response = Mock()
+        single_response.choices = [Mock(message=Mock(content="NO"))]
+        self.mock_client.chat.completions.create.side_effect = [batch_response, single_response]
+
+        self.assertEqual(classifier.classify_titles(["Taylor Swift"]), [(True, "YES")])
+        # 批量缓存命中，不再请求
+        self.assertEqual(classifier.classify_titles(["Taylor Swift"]), [(True, "YES")])
+        # 批量提示词得到的结果不用于单条判断
+        self.assertEqual(classifier.classify_title("Taylor Swift"), (False, "NO"))
+        self.assertEqual(self.mock_client.chat.completions.create.call_count, 2)
+
+    @patch('core.classifier.logger')
+    def test_classify_titles_fallback_for_missing_and_malformed(self, mock_logger):
+        batch_response = Mock()
+        batch_response.choices = [Mock(message=Mock(
+            content='{"results": [{"index": 0, "verdict": "YES"}, {"index": 1, "verdict": "MAYBE"}, '
+                    '{"index": 7, "verdict": "NO"}]}'
+        ))]
+        single_response = Mock()
+        single_response.choices = [Mock(message=Mock(content="NO"))]
+        self.mock_client.chat.completions.create.side_effect = [
+            batch_response, single_response, single_response
+        ]
+
+        results = self.classifier.classify_titles(["Taylor Swift", "Thanksgiving", "Weather"])
+
+        self.assertEqual(results, [(True, "YES"), (False, "NO"), (False, "NO")])
+        self.assertEqual(self.mock_client.chat.completions.create.call_count, 3)
+
+    def test_pack_batches_respects_budget(self):
+        titles = ["a" * 6] * 5  # 每条估算 10 token
+        batches = self.classifier.pack_batches(titles, max_tokens=25, max_size=10)
+        self.assertEqual(batches, [[0, 1], [2, 3], [4]])
+
+        batches = self.classifier.pack_batches(titles, max_tokens=1000, max_size=2)
+        self.assertEqual(batches, [[0, 1], [2, 3], [4]])
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,72 @@
+import gzip
+import tempfile
+import unittest
+from pathlib import Path
+
+from core.data_processor import DataProcessor
+from utils.compression import compression_of, sibling_path, split_suffix
+from utils.file_utils import read_json_safely, save_json_safely, validate_file_path
+from utils.json_stream import iter_json_records
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+DATA = {
+    "2025-12-01": {
+        "date": "2025-12-01",
+        "items": [
+            {"rank": i, "keyword": f"话题{i}", "history": {"details": [{"time": "2025-12-01 00:10:05.0", "rank": 1}] * 20}}
+            for i in range(1, 30)
+        ],
+    }
+}
+
+
+class TestCompression(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.dir = Path(self.tmp.name)
+
+    def test_suffix_helpers(self):
+        self.assertEqual(split_suffix(Path("raw.json.gz")), ("raw", ".json.gz"))
+        self.assertEqual(split_suffix(Path("raw.json")), ("raw", ".json"))
+        self.assertEqual(sibling_path(Path("d/raw.json.xz"), "_simplified"), Path("d/raw_simplified.json.xz"))
+        self.assertEqual(compression_of(Path("raw.JSON.GZ")), "gz")
+        self.assertIsNone(compression_of(Path("raw.json")))
+
+    def test_roundtrip_by_extension(self):
+        plain = self.dir / "raw.json"
+        save_json_safely(DATA, plain)
+        suffixes = [".json.gz", ".json.xz"] + ([".json.zst"] if zstandard is not None else [])
+        for suffix in suffixes:
+            with self.subTest(suffix=suffix):
+                path = self.dir / f"raw{suffix}"
+                self.assertTrue(save_json_safely(DATA, path))
+                self.assertTrue(validate_file_path(path))
+                self.assertLess(path.stat().st_size, plain.stat().st_size / 5)
+                self.assertEqual(read_json_safely(path), DATA)
+                records, container_key, _ = DataProcessor.load_json_file(path)
+                self.assertEqual(container_key, "by_date")
+                self.assertEqual(len(records), 29)
+                self.assertEqual(len(list(iter_json_records(path))), 29)
+
+        with gzip.open(self.dir / "raw.json.gz", "rt", encoding="utf-8") as f:
+            with open(plain, encoding="utf-8") as g:
+                self.assertEqual(f.read(), g.read())
+
+    def test_save_data_keeps_compression_for_simplified(self):
+        from core.fetcher import WeiboHotSearchFetcher
+
+        out = self.dir / "raw.json.gz"
+        self.assertTrue(WeiboHotSearchFetcher().save_data(DATA, str(out), with_history=False))
+        simplified = read_json_safely(self.dir / "raw_simplified.json.gz")
+        self.assertEqual(simplified["2025-12-01"][0]["title"], "话题1")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,6 +2,7 @@ import unittest
 import json
 import tempfile
 from pathlib import Path
+from unittest.mock import Mock
 from core.data_processor import DataProcessor
 
 
@@ -96,5 +97,51 @@ class TestDataProcessor(unittest.TestCase):
             temp_path.unlink()
 
 
+    def test_process_file_dedups_titles_across_dates(self):
+        test_data = {
+            "2025-12-20": {"items": [{"keyword": "骄阳似我", "rank": 1}, {"keyword": "丽江"}]},
+            "2025-12-21": {"items": [{"keyword": "骄阳似我 ", "rank": 5}]},
+        }
+
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
+            json.dump(test_data, f)
+            temp_path = Path(f.name)
+
+        classifier = Mock(spec=["classify_title"])
+        classifier.classify_title.side_effect = lambda t: (t.strip() == "骄阳似我", "")
+
+        try:
+            filtered, total, kept = self.processor.process_file(temp_path, classifier, delay=0)
+        finally:
+            temp_path.unlink()
+
+        self.assertEqual((total, kept), (3, 2))
+        self.assertEqual(classifier.classify_title.call_count, 2)
+        self.assertEqual(self.processor.last_stats["unique_titles"], 2)
+        # 每条记录保留自己的字段和来源日期
+        self.assertEqual([(r["_source_date"], r["rank"]) for r in filtered],
+                         [("2025-12-20", 1), ("2025-12-21", 5)])
+
+    def test_process_records_in_memory(self):
+        data = {"2025-12-20": {"date": "2025-12-20", "items": [{"keyword": "骄阳似我"}, {"keyword": "丽江"}]}}
+        classifier = Mock(spec=["classify_title"])
+        classifier.classify_title.side_effect = lambda t: (t == "骄阳似我", "")
+
+        records, container_key, original_data = self.processor.extract_records(data)
+        filtered, total, kept = self.processor.process_records(records, classifier, delay=0)
+        self.assertEqual((total, kept), (2, 1))
+
+        with tempfile.TemporaryDirectory() as tmp:
+            output_path = Path(tmp) / "out.json"
+            self.processor.save_filtered_data(filtered, original_data, container_key, output_path)
+            with open(output_path, 'r', encoding='utf-8') as f:
+                out = json.load(f)
+
+        self.assertEqual(out["2025-12-20"]["date"], "2025-12-20")
+        self.assertEqual([r["keyword"] for r in out["2025-12-20"]["items"]], ["骄阳似我"])
+        # 保存结果不会改写调用方持有的原始数据
+        self.assertEqual(len(data["2025-12-20"]["items"]), 2)
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,55 @@
+import unittest
+
+from benchmarks.weibotop_stub import SECRET_KEY, WeiboTopStub
+from core.decrypt_pool import DecryptPool, decrypt_payload, encrypt_text
+from core.fetcher import WeiboHotSearchFetcher
+
+
+class TestDecryptPool(unittest.TestCase):
+
+    def setUp(self):
+        self.key = WeiboHotSearchFetcher(secret_key=SECRET_KEY).aes_key
+
+    def test_roundtrip_reuses_cipher(self):
+        payload = encrypt_text(self.key, '[["话题", 1]]')
+        self.assertEqual(decrypt_payload(self.key, payload), [["话题", 1]])
+        self.assertEqual(decrypt_payload(self.key, payload), [["话题", 1]])
+        self.assertIsNone(decrypt_payload(self.key, "not base64!"))
+
+    def test_offload_and_batch(self):
+        payloads = [encrypt_text(self.key, f'[{i}, "{"x" * i}"]') for i in range(40)]
+        expected = [[i, "x" * i] for i in range(40)]
+        with DecryptPool(self.key, processes=2, inline_bytes=0, batch_size=8) as pool:
+            self.assertEqual(pool.decrypt(payloads[3]), expected[3])
+            self.assertEqual(pool.decrypt_many(payloads + ["bad"]), expected + [None])
+            self.assertEqual(pool.stats["tasks"], 1 + 6)
+        with DecryptPool(self.key, processes=2) as pool:
+            # 小响应不进入进程池
+            self.assertEqual(pool.decrypt(payloads[0]), expected[0])
+            self.assertEqual(pool.stats["inline"], 1)
+
+    def test_fetch_with_pool_matches_inline(self):
+        stub = WeiboTopStub(items_per_day=4, keyword_pool=5)
+        url = stub.start()
+        try:
+            inline = WeiboHotSearchFetcher(secret_key=SECRET_KEY, base_url=url, decrypt_processes=1)
+            expected = inline.fetch_date_range("2025-12-01", "2025-12-02", max_workers=2, with_history=True)
+            self.assertEqual(inline.decrypt_stats, {})
+
+            pooled = WeiboHotSearchFetcher(secret_key=SECRET_KEY, base_url=url, decrypt_processes=2)
+            original = pooled._open_decrypt_pool
+
+            def open_pool(with_history):
+                original(with_history)
+                pooled._decrypt_pool.inline_bytes = 0
+
+            pooled._open_decrypt_pool = open_pool
+            self.assertEqual(pooled.fetch_date_range("2025-12-01", "2025-12-02", max_workers=2, with_history=True), expected)
+            self.assertEqual(pooled.decrypt_stats["processes"], 2)
+            self.assertGreater(pooled.decrypt_stats["offloaded"], 0)
+        finally:
+            stub.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -31,3 +31,124 @@ def test_save_data_creates_files(tmp_path):
     assert '2025-12-24' in s
     assert isinstance(s['2025-12-24'], list)
     assert s['2025-12-24'][0]['title'] == 'A'
+
+
+def test_iter_date_range_bounds_pending_dates(monkeypatch):
+    import threading
+    import time
+    from core.fetcher import WeiboHotSearchFetcher
+
+    f = WeiboHotSearchFetcher()
+    started = []
+    lock = threading.Lock()
+
+    def fake_fetch(date):
+        with lock:
+            started.append(date)
+        time.sleep(0.01)
+        if date == '2025-12-03':
+            return None, "无法获取timeid", None, None
+        return [[date, 1]], "成功", 1, date
+
+    monkeypatch.setattr(f, '_fetch_day', fake_fetch)
+
+    results = []
+    for date, data in f.iter_date_range('2025-12-01', '2025-12-10', max_workers=2, max_pending=3):
+        # 下游尚未取走结果时，已提交的日期不会超过 max_pending
+        assert len(started) <= len(results) + 1 + 3
+        results.append(date)
+        time.sleep(0.02)
+
+    assert sorted(results) == [d for d in f.date_list('2025-12-01', '2025-12-10') if d != '2025-12-03']
+    assert sorted(f.fetch_date_range('2025-12-01', '2025-12-02', max_workers=2)) == ['2025-12-01', '2025-12-02']
+
+
+def test_session_pool_reuses_connections(monkeypatch):
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from core.fetcher import WeiboHotSearchFetcher
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            body = b"ok"
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/"
+
+    f = WeiboHotSearchFetcher()
+
+    def fake_fetch(date):
+        session, temporary = f._acquire_session()
+        assert not temporary
+        for _ in range(3):
+            assert session.get(url, timeout=5).text == "ok"
+        return [[date, 1]], "成功", 1, date
+
+    monkeypatch.setattr(f, '_fetch_day', fake_fetch)
+    try:
+        data = f.fetch_date_range('2025-12-01', '2025-12-08', max_workers=2)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert len(data) == 8
+    stats = f.http_stats
+    assert stats["requests"] == 24
+    assert stats["sessions"] <= 2
+    assert stats["connections"] <= 2
+    assert stats["reused"] == stats["requests"] - stats["connections"]
+    # 抓取结束后不再持有会话池
+    assert f._session_pool is None
+
+
+def test_history_tasks_share_one_worker_pool(monkeypatch):
+    import threading
+    import time
+    from core.fetcher import WeiboHotSearchFetcher, WeiboThrottled
+
+    f = WeiboHotSearchFetcher()
+    active = []
+    peak = []
+    lock = threading.Lock()
+    throttled_once = set()
+
+    monkeypatch.setattr(f, '_fetch_day', lambda date: ([[f"kw{i}", i] for i in range(8)], "成功", 7, date))
+
+    def fake_series(session, keyword):
+        with lock:
+            active.append(keyword)
+            peak.append(len(active))
+        try:
+            time.sleep(0.02)
+            if keyword == "kw3" and keyword not in throttled_once:
+                throttled_once.add(keyword)
+                raise WeiboThrottled("Code:DCE")
+            return [["2025-12-01 10:00:00", "2025-12-02 10:00:00"], ["1", "2"], ["100", "200"]]
+        finally:
+            with lock:
+                active.remove(keyword)
+
+    monkeypatch.setattr(f, '_get_history_series', fake_series)
+    monkeypatch.setattr('core.fetcher.HISTORY_RATE_LIMIT_INITIAL', 1000.0)
+    monkeypatch.setattr('core.fetcher.HISTORY_RATE_LIMIT_MAX', 1000.0)
+
+    data = f.fetch_date_range('2025-12-01', '2025-12-01', max_workers=4, with_history=True)
+
+    day = data['2025-12-01']
+    assert day['timeid'] == 7 and day['total_items'] == 8
+    assert [it['keyword'] for it in day['items']] == [f"kw{i}" for i in range(8)]
+    # Code:DCE 触发退避重试，最终仍然取得历史
+    assert all(it['history']['max_hotness'] == 100 for it in day['items'])
+    assert f.history_stats['throttled'] == 1
+    # 只抓取一天时也会并行使用多个线程
+    assert max(peak) > 1
@@ -0,0 +1,91 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import Mock
+
+from core import DataProcessor
+from core.gazetteer import AhoCorasick, CelebrityGazetteer
+
+
+class TestAhoCorasick(unittest.TestCase):
+
+    def test_find_all_overlapping(self):
+        ac = AhoCorasick()
+        for word in ("he", "she", "his", "hers"):
+            ac.add(word)
+        matches = ac.find_all("ushers")
+        self.assertEqual(matches, [(3, "she"), (3, "he"), (5, "hers")])
+
+    def test_find_first_returns_value(self):
+        ac = AhoCorasick()
+        ac.add("大幂幂", "杨幂")
+        self.assertEqual(ac.find_first("大幂幂新剧开播"), "杨幂")
+        self.assertIsNone(ac.find_first("丽江古城"))
+
+
+class TestCelebrityGazetteer(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        root = Path(self.tmpdir.name)
+        self.names_file = root / "celebrities.txt"
+        self.names_file.write_text("# 注释\n杨幂|大幂幂\nTaylor Swift|霉霉\n王\n", encoding="utf-8")
+        self.learned_file = root / "learned.json"
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _gazetteer(self):
+        return CelebrityGazetteer(self.names_file, self.learned_file)
+
+    def test_load_and_match(self):
+        g = self._gazetteer()
+        self.assertEqual(g.match("杨幂新剧"), "杨幂")
+        self.assertEqual(g.match("霉霉演唱会"), "Taylor Swift")
+        self.assertEqual(g.match("taylor  swift 新专辑"), "Taylor Swift")
+        # 单字姓名低于最短长度，不参与匹配
+        self.assertIsNone(g.match("王者荣耀"))
+
+    def test_default_names_file_loads(self):
+        g = CelebrityGazetteer(learned_file=self.learned_file)
+        self.assertGreater(len(g), 0)
+        self.assertEqual(g.match("王一博春运返乡被偶遇"), "王一博")
+        self.assertEqual(g.match("外交部回应成龙"), "成龙")
+        self.assertEqual(g.match("周董新歌"), "周杰伦")
+
+    def test_learn_and_persist(self):
+        g = self._gazetteer()
+        learned = g.learn_from_records([
+            {"title": "詹姆斯·卡梅隆", "original_title": "阿凡达3", "filter_reason": "inferred_celebrity"},
+            {"keyword": "骄阳似我", "filter_reason": "direct_celebrity"},
+            {"keyword": "丽江", "filter_reason": "other"},
+        ])
+        self.assertEqual(learned, 2)
+        self.assertTrue(g.save_learned())
+
+        g2 = self._gazetteer()
+        self.assertEqual(g2.match("詹姆斯·卡梅隆新片"), "詹姆斯·卡梅隆")
+        self.assertEqual(g2.match("骄阳似我"), "骄阳似我")
+        # 整句学习只做精确匹配
+        self.assertIsNone(g2.match("骄阳似我大结局"))
+
+    def test_process_file_skips_api_for_hits(self):
+        g = self._gazetteer()
+        classifier = Mock(spec=["classify_title"])
+        classifier.classify_title.return_value = (False, "NO")
+        data = [{"title": "杨幂新剧"}, {"title": "丽江古城"}]
+
+        path = Path(self.tmpdir.name) / "in.json"
+        path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+
+        filtered, total, kept = DataProcessor().process_file(path, classifier, delay=0, gazetteer=g)
+
+        self.assertEqual((total, kept), (2, 1))
+        self.assertEqual(filtered[0]["filter_reason"], "gazetteer_celebrity")
+        self.assertEqual(filtered[0]["matched_celebrity"], "杨幂")
+        classifier.classify_title.assert_called_once_with("丽江古城")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,192 @@
+import json
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+from core.fetcher import WeiboHotSearchFetcher
+from core.history_store import (
+    CompactHistory,
+    KeywordHistoryStore,
+    KeywordSeries,
+    expand_history,
+    history_details,
+    json_default,
+)
+
+
+def _series_data():
+    times = [f"2025-12-{d:02d} {h:02d}:00:00" for d in (1, 2, 3) for h in (0, 12, 23)]
+    ranks = [str(i + 1) for i in range(len(times))]
+    hotness = [str(1000 - i * 10) for i in range(len(times))]
+    return times, ranks, hotness
+
+
+class TestKeywordSeries(unittest.TestCase):
+
+    def test_day_summary_matches_linear_scan(self):
+        times, ranks, hotness = _series_data()
+        series = KeywordSeries(times, ranks, hotness)
+
+        summary = series.day_summary("2025-12-02")
+        expected = [
+            {"time": t, "rank": int(r), "hotness": int(h)}
+            for t, r, h in zip(times, ranks, hotness) if t.startswith("2025-12-02")
+        ]
+        self.assertEqual(summary["details"], expected)
+        self.assertEqual(summary["total_points"], 3)
+        self.assertEqual((summary["min_rank"], summary["max_rank"]), (4, 6))
+        self.assertEqual((summary["first_time"], summary["last_time"]), (expected[0]["time"], expected[-1]["time"]))
+        self.assertIsNone(series.day_summary("2025-12-04"))
+
+    def test_downsample_keeps_summary_and_peaks(self):
+        times = [f"2025-12-01 10:{m:02d}:03.0" for m in range(0, 60, 2)]
+        ranks = [5] * 30
+        hotness = [100] * 30
+        ranks[8], hotness[17] = 1, 9999  # 10:16 的最好排名，10:34 的最高热度
+        series = KeywordSeries(times, ranks, hotness)
+
+        full = series.day_summary("2025-12-01")
+        sampled = series.day_summary("2025-12-01", bucket_minutes=15)
+        for key in ("total_points", "min_rank", "max_rank", "min_hotness", "max_hotness", "first_time", "last_time"):
+            self.assertEqual(sampled[key], full[key])
+        self.assertEqual(sampled["bucket_minutes"], 15)
+        self.assertEqual(
+            [(d["time"][11:16], d["rank"], d["hotness"]) for d in sampled["details"]],
+            [("10:00", 5, 100), ("10:16", 1, 100), ("10:30", 5, 9999), ("10:46", 5, 100)]
+        )
+        compact = series.day_summary("2025-12-01", compact=True, bucket_minutes=15)
+        self.assertEqual(history_details(compact), sampled["details"])
+
+    def test_unsorted_input(self):
+        times, ranks, hotness = _series_data()
+        series = KeywordSeries(times[::-1], ranks[::-1], hotness[::-1])
+        self.assertEqual(series.times, times)
+        self.assertEqual(series.day_range("2025-12-03"), (6, 9))
+
+
+class TestCompactHistory(unittest.TestCase):
+
+    def test_compact_roundtrip_matches_full(self):
+        times, ranks, hotness = _series_data()
+        series = KeywordSeries([t + ".0" for t in times], ranks, hotness)
+        full = series.day_summary("2025-12-02")
+        compact = series.day_summary("2025-12-02", compact=True)
+
+        self.assertNotIn("details", compact)
+        self.assertIsInstance(compact["series"], CompactHistory)
+        self.assertEqual(compact["series"].time_suffix, ".0")
+        self.assertEqual(history_details(compact), full["details"])
+        self.assertEqual(expand_history(compact), full)
+
+        # 写入文件再读出，得到的列同样可以还原
+        loaded = json.loads(json.dumps(compact, default=json_default))
+        self.assertEqual(loaded["series"]["time"][0], 1764604800)
+        self.assertEqual(expand_history(loaded), full)
+
+    def test_filtered_output_expands_compact_history(self):
+        from core import DataProcessor
+        from core.record_view import RecordView
+
+        series = KeywordSeries(*_series_data())
+        full = series.day_summary("2025-12-02")
+        source = {"keyword": "kw", "history": series.day_summary("2025-12-02", compact=True)}
+        records = [RecordView(source, date="2025-12-02"), {**source, "_source_date": "2025-12-03"}]
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "out.json"
+            DataProcessor().save_filtered_data(records, {}, 'by_date', path)
+            with open(path, encoding="utf-8") as f:
+                saved = json.load(f)
+        self.assertEqual(saved["2025-12-02"]["items"][0]["history"], full)
+        self.assertEqual(saved["2025-12-03"]["items"][0]["history"]["details"], full["details"])
+        # 源记录保持 compact 格式
+        self.assertIn("series", source["history"])
+
+    def test_irregular_times_fall_back_to_full(self):
+        times = ["2025-12-01 00:00:00", "2025-12-01 01:00:00.5"]
+        self.assertIsNone(CompactHistory.from_points(times, [1, 2], [3, 4]))
+        summary = KeywordSeries(times, [1, 2], [3, 4]).day_summary("2025-12-01", compact=True)
+        self.assertEqual(len(summary["details"]), 2)
+
+    def test_fetcher_saves_compact_history(self):
+        fetcher = WeiboHotSearchFetcher(history_format="compact")
+        fetcher._fetch_day = lambda date: ([["kw", 1]], "成功", 1, date)
+        fetcher._get_history_series = lambda session, keyword: _series_data()
+        data = fetcher.fetch_date_range("2025-12-01", "2025-12-01", max_workers=1, with_history=True)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "raw.json"
+            self.assertTrue(fetcher.save_data(data, str(path), with_history=True))
+            with open(path, encoding="utf-8") as f:
+                saved = json.load(f)
+        history = saved["2025-12-01"]["items"][0]["history"]
+        self.assertEqual(history["series"]["rank"], [1, 2, 3])
+        self.assertEqual([d["time"] for d in history_details(history)], _series_data()[0][:3])
+
+        with self.assertRaises(ValueError):
+            WeiboHotSearchFetcher(history_format="columns")
+
+
+class TestKeywordHistoryStore(unittest.TestCase):
+
+    def test_concurrent_requests_share_one_fetch(self):
+        store = KeywordHistoryStore()
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            time.sleep(0.05)
+            return _series_data()
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(store.get("kw", fetch))) for _ in range(5)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(all(r is results[0] for r in results))
+        self.assertEqual(store.stats, {"requests": 1, "reused": 4, "failed": 0})
+
+    def test_failure_is_not_cached(self):
+        store = KeywordHistoryStore()
+
+        def fail():
+            raise RuntimeError("boom")
+
+        with self.assertRaises(RuntimeError):
+            store.get("kw", fail)
+        self.assertEqual(len(store.get("kw", _series_data)), 9)
+        self.assertEqual(store.stats["failed"], 1)
+
+    def test_invalid_result_is_not_cached(self):
+        store = KeywordHistoryStore()
+        self.assertIsNone(store.get("kw", lambda: None))
+        self.assertEqual(len(store.get("kw", _series_data)), 9)
+        self.assertEqual(store.stats, {"requests": 2, "reused": 0, "failed": 1})
+
+    def test_fetcher_requests_each_keyword_once_per_run(self):
+        fetcher = WeiboHotSearchFetcher()
+        fetcher._fetch_day = lambda date: ([["kw", 1]], "成功", 1, date)
+        requests = []
+
+        def fake_series(session, keyword):
+            requests.append(keyword)
+            return _series_data()
+
+        fetcher._get_history_series = fake_series
+        data = fetcher.fetch_date_range("2025-12-01", "2025-12-03", max_workers=3, with_history=True)
+
+        self.assertEqual(requests, ["kw"])
+        self.assertEqual(
+            [data[d]["items"][0]["history"]["first_time"] for d in sorted(data)],
+            ["2025-12-01 00:00:00", "2025-12-02 00:00:00", "2025-12-03 00:00:00"]
+        )
+        self.assertEqual(fetcher.history_stats["series_reused"], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+from core.data_processor import DataProcessor
+from core.journal import DecisionJournal
+from core.record_view import RecordView
+
+
+class TestDecisionJournal(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.journal_path = Path(self.tmp.name) / "run.journal.jsonl"
+        self.records = [{"title": t} for t in ["A", "B", "C", "D", "E"]]
+
+    def _run(self, classify, resume):
+        classifier = Mock(spec=["classify_title"])
+        classifier.classify_title.side_effect = classify
+        processor = DataProcessor()
+        with DecisionJournal(self.journal_path, source="input.json", resume=resume) as journal:
+            result = processor.process_records(self.records, classifier, delay=0, chunk_size=2, journal=journal)
+        return result, classifier, processor
+
+    def test_resume_after_crash(self):
+        def crash_on_d(title):
+            if title == "D":
+                raise KeyboardInterrupt
+            return title in ("A", "C"), ""
+
+        with self.assertRaises(KeyboardInterrupt):
+            self._run(crash_on_d, resume=False)
+
+        (filtered, total, kept), classifier, processor = self._run(
+            lambda t: (t in ("A", "C", "E"), ""), resume=True
+        )
+        self.assertEqual([r["title"] for r in filtered], ["A", "C", "E"])
+        self.assertEqual((total, kept), (5, 3))
+        # 只重新处理崩溃时尚未落盘的记录
+        self.assertEqual([c.args[0] for c in classifier.classify_title.call_args_list], ["D", "E"])
+        self.assertEqual(processor.last_stats["resumed"], 3)
+
+    def test_errors_are_recorded_and_retried(self):
+        (filtered, _, kept), _, processor = self._run(
+            lambda t: (False, "ERROR: timeout") if t == "B" else (t == "A", "YES" if t == "A" else "NO"),
+            resume=False
+        )
+        self.assertEqual(kept, 1)
+        self.assertEqual(processor.last_stats["errors"], 1)
+
+        with open(self.journal_path, 'r', encoding='utf-8') as f:
+            statuses = {e["title"]: e["status"] for e in map(json.loads, f)}
+        self.assertEqual(statuses, {"A": "kept", "B": "error", "C": "dropped", "D": "dropped", "E": "dropped"})
+
+        (filtered, _, kept), classifier, _ = self._run(lambda t: (True, "YES"), resume=True)
+        self.assertEqual(classifier.classify_title.call_count, 1)
+        self.assertEqual([r["title"] for r in filtered], ["A", "B"])
+
+    def test_fresh_run_and_other_sources_ignored(self):
+        self._run(lambda t: (True, ""), resume=False)
+        # 来源不同的日志条目不会被复用
+        with DecisionJournal(self.journal_path, source="other.json", resume=True) as journal:
+            self.assertIsNone(journal.lookup(0, "A"))
+        # 标题不一致（输入已变化）时不复用
+        with DecisionJournal(self.journal_path, source="input.json", resume=True) as journal:
+            self.assertIsNone(journal.lookup(0, "Z"))
+            self.assertEqual(journal.lookup(0, "A")["status"], "kept")
+
+        (_, _, _), classifier, _ = self._run(lambda t: (True, ""), resume=False)
+        self.assertEqual(classifier.classify_title.call_count, 5)
+
+    def test_truncated_last_line(self):
+        self._run(lambda t: (True, ""), resume=False)
+        with open(self.journal_path, 'a', encoding='utf-8') as f:
+            f.write('{"source": "input.json", "index": 5, "ti')
+        with DecisionJournal(self.journal_path, source="input.json", resume=True) as journal:
+            self.assertIsNotNone(journal.lookup(4, "E"))
+            journal.record(5, "F", "dropped")
+        with DecisionJournal(self.journal_path, source="input.json", resume=True) as journal:
+            self.assertIsNotNone(journal.lookup(5, "F"))
+
+    def test_private_keys_not_written(self):
+        self.records = [RecordView({"title": "A", "_internal": 1}, date="2024-01-01")]
+        self._run(lambda t: (True, "YES"), resume=False)
+        with open(self.journal_path, 'r', encoding='utf-8') as f:
+            entry = json.loads(f.readline())
+        self.assertEqual(entry["record"], {"title": "A", "filter_reason": "direct_celebrity"})
+        self.assertEqual(entry["date"], "2024-01-01")
+
+        # 恢复时来源日期放回记录视图
+        (filtered, _, _), classifier, _ = self._run(lambda t: (True, "YES"), resume=True)
+        classifier.classify_title.assert_not_called()
+        self.assertEqual(filtered[0]["_source_date"], "2024-01-01")
+        self.assertEqual(filtered[0]["title"], "A")
+
+    def test_fsync_per_batch(self):
+        with patch("core.journal.os.fsync") as fsync:
+            self._run(lambda t: (True, ""), resume=False)
+        # 5 条记录分 3 批，关闭时再同步一次
+        self.assertEqual(fsync.call_count, 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import Mock
+
+from core.data_processor import DataProcessor
+from utils.json_stream import iter_json_records
+
+
+class TestJSONStream(unittest.TestCase):
+
+    def _write(self, data):
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False, encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+            path = Path(f.name)
+        self.addCleanup(path.unlink)
+        return path
+
+    def test_top_level_list(self):
+        data = [{"title": f"条目{i}", "n": i * 1.5} for i in range(50)]
+        # 很小的读取块会让数字和字符串跨越缓冲区边界
+        stream = iter_json_records(self._write(data), chunk_size=7)
+        self.assertEqual(list(stream), data)
+        self.assertIsNone(stream.container_key)
+        self.assertEqual(stream.skeleton, [])
+        self.assertEqual(stream.count, 50)
+
+    def test_container_key(self):
+        data = {"meta": {"v": 1}, "items": [{"title": "A"}, {"title": "B"}], "total": 2}
+        stream = iter_json_records(self._write(data), chunk_size=5)
+        self.assertEqual(list(stream), data["items"])
+        self.assertEqual(stream.container_key, "items")
+        self.assertEqual(stream.skeleton, {"meta": {"v": 1}, "items": [], "total": 2})
+
+    def test_by_date(self):
+        data = {
+            "2025-12-20": {"date": "2025-12-20", "items": [{"keyword": "A"}, {"keyword": "B"}]},
+            "2025-12-21": [["C", 3]],
+        }
+        stream = iter_json_records(self._write(data), chunk_size=3)
+        records = list(stream)
+        self.assertEqual(stream.container_key, "by_date")
+        self.assertEqual(
+            [(r.get("keyword") or r["raw_data"][0], r["_source_date"]) for r in records],
+            [("A", "2025-12-20"), ("B", "2025-12-20"), ("C", "2025-12-21")]
+        )
+        self.assertEqual(stream.skeleton, {"2025-12-20": {"date": "2025-12-20", "items": []}, "2025-12-21": []})
+
+    def test_matches_load_json_file(self):
+        data = {
+            "2025-12-20": {"items": [{"keyword": "A", "raw_data": ["A", 1]}]},
+            "2025-12-21": {"items": [{"keyword": "B", "raw_data": ["B", 2]}]},
+        }
+        path = self._write(data)
+        records, container_key, _ = DataProcessor.load_json_file(path)
+        stream = iter_json_records(path)
+        self.assertEqual(list(stream), records)
+        self.assertEqual(stream.container_key, container_key)
+
+    def test_stream_can_only_be_iterated_once(self):
+        stream = iter_json_records(self._write([{"title": "A"}]))
+        list(stream)
+        with self.assertRaises(RuntimeError):
+            list(stream)
+
+    def test_invalid_json(self):
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
+            f.write('[{"title": "A"}, {"title": ')
+            path = Path(f.name)
+        self.addCleanup(path.unlink)
+        with self.assertRaises(ValueError):
+            list(iter_json_records(path))
+
+    def test_process_file_in_small_chunks(self):
+        data = [{"title": t} for t in ["A", "B", "A", "C", "B", "A", "D"]]
+        classifier = Mock(spec=["classify_title"])
+        classifier.classify_title.side_effect = lambda t: (t in ("A", "D"), "")
+
+        processor = DataProcessor()
+        filtered, total, kept = processor.process_file(self._write(data), classifier, delay=0, chunk_size=2)
+
+        self.assertEqual((total, kept), (7, 4))
+        self.assertEqual([r["title"] for r in filtered], ["A", "A", "A", "D"])
+        # 跨批次的重复标题不会重复判断
+        self.assertEqual(classifier.classify_title.call_count, 4)
+        self.assertEqual(processor.last_stats["unique_titles"], 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
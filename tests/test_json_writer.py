@@ -0,0 +1,88 @@
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from utils import json_writer
+from utils.json_writer import JSONStreamWriter, write_json_atomic
+
+
+SAMPLE = {
+    "2025-12-01": {
+        "date": "2025-12-01",
+        "total_items": 2,
+        "items": [
+            {"rank": 1, "keyword": "话题\n换行", "history": {"details": [{"time": "t", "rank": 1}], "empty": []}},
+            {"rank": 2, "keyword": "B", "raw_data": ["B", 1.5, None, True]},
+        ],
+    },
+    "2025-12-02": {"date": "2025-12-02", "items": []},
+    "2025-12-03": [],
+    "meta": {},
+}
+
+
+class TestJSONStreamWriter(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = Path(self.tmp.name) / "out.json"
+
+    def _read(self):
+        with open(self.path, encoding="utf-8") as f:
+            return f.read()
+
+    def test_output_matches_json_dump(self):
+        backends = ["json"] + (["orjson"] if json_writer.orjson is not None else [])
+        for backend in backends:
+            non_finite = {"items": [{"v": float("nan"), "w": None}, [float("inf"), -float("inf")]]}
+            for data in (SAMPLE, [SAMPLE["2025-12-01"]["items"]], {"data": []}, [], non_finite):
+                with self.subTest(backend=backend, data=type(data).__name__):
+                    write_json_atomic(data, self.path, backend=backend)
+                    self.assertEqual(self._read(), json.dumps(data, ensure_ascii=False, indent=2))
+                    write_json_atomic(data, self.path, indent=None, backend=backend)
+                    self.assertEqual(self._read(), json.dumps(data, ensure_ascii=False, separators=(",", ":")))
+
+    def test_failure_keeps_previous_file(self):
+        write_json_atomic({"ok": 1}, self.path)
+        with self.assertRaises(TypeError):
+            write_json_atomic({"items": [1, object()]}, self.path, backend="json")
+        self.assertEqual(json.loads(self._read()), {"ok": 1})
+        self.assertEqual(os.listdir(self.tmp.name), ["out.json"])
+
+    def test_file_mode_follows_umask_and_existing_target(self):
+        mask = os.umask(0o022)
+        self.addCleanup(os.umask, mask)
+        write_json_atomic({"a": 1}, self.path)
+        self.assertEqual(os.stat(self.path).st_mode & 0o777, 0o644)
+        os.chmod(self.path, 0o600)
+        write_json_atomic({"a": 2}, self.path)
+        self.assertEqual(os.stat(self.path).st_mode & 0o777, 0o600)
+
+    def test_manual_containers(self):
+        with JSONStreamWriter(self.path) as writer:
+            writer.begin_object()
+            writer.value(1, "a")
+            writer.begin_array("items")
+            for i in range(3):
+                writer.value({"i": i})
+            writer.end()
+            writer.end()
+        self.assertEqual(json.loads(self._read()), {"a": 1, "items": [{"i": 0}, {"i": 1}, {"i": 2}]})
+
+    def test_save_data_single_pass_outputs(self):
+        from core.fetcher import WeiboHotSearchFetcher
+
+        fetcher = WeiboHotSearchFetcher()
+        self.assertTrue(fetcher.save_data(SAMPLE, str(self.path), with_history=False))
+        self.assertEqual(json.loads(self._read()), SAMPLE)
+        with open(self.path.with_name("out_simplified.json"), encoding="utf-8") as f:
+            simplified = json.load(f)
+        self.assertEqual(sorted(simplified), ["2025-12-01", "2025-12-02"])
+        self.assertEqual(simplified["2025-12-01"][1], {"rank": 2, "title": "B", "hot_value": 0, "url": ""})
+
+
+if __name__ == '__main__':
+    unittest.main()
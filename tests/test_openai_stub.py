@@ -0,0 +1,75 @@
+"""本地 OpenAI 桩服务与分类基准的冒烟测试"""
+import unittest
+
+from openai import OpenAI
+
+from benchmarks.classify_bench import percentile, run_benchmarks
+from benchmarks.openai_stub import OpenAIStub, parse_latency
+from core.classifier import TitleClassifier
+from core.related_classifier import RelatedCelebrityClassifier
+
+
+class TestOpenAIStub(unittest.TestCase):
+    def setUp(self):
+        self.stub = OpenAIStub()
+        self.client = OpenAI(api_key="stub", base_url=self.stub.start(), max_retries=0)
+
+    def tearDown(self):
+        self.client.close()
+        self.stub.stop()
+
+    def test_single_batch_and_related_through_real_client(self):
+        classifier = TitleClassifier(self.client)
+        self.assertTrue(classifier.classify_title("明星官宣恋情")[0])
+        self.assertFalse(classifier.classify_title("城市迎来降温")[0])
+
+        verdicts = classifier.classify_titles(["明星A", "天气", "明星B"])
+        self.assertEqual([v for v, _ in verdicts], [True, False, True])
+
+        related = RelatedCelebrityClassifier(self.client).infer_related_celebrity("电影票房破纪录")
+        self.assertTrue(related["name"])
+        self.assertEqual(self.stub.counts["single"], 2)
+        self.assertEqual(self.stub.counts["batch"], 1)
+        self.assertEqual(self.stub.counts["related"], 1)
+
+    def test_partial_batch_falls_back_to_single(self):
+        self.stub.batch_policy = "partial"
+        verdicts = TitleClassifier(self.client).classify_titles(["明星A", "天气", "明星B"])
+        self.assertEqual([v for v, _ in verdicts], [True, False, True])
+        self.assertGreater(self.stub.counts["single"], 0)
+
+    def test_throttled_requests_surface_as_errors(self):
+        self.stub.rate_limit_rate = 1.0
+        ok, text = TitleClassifier(self.client).classify_title("明星")
+        self.assertFalse(ok)
+        self.assertTrue(text.startswith("ERROR:"))
+        self.assertEqual(self.stub.counts["throttled"], 1)
+
+
+class TestClassifyBench(unittest.TestCase):
+    def test_parse_latency(self):
+        self.assertEqual(parse_latency("fixed:0.5")(None), 0.5)
+        with self.assertRaises(ValueError):
+            parse_latency("poisson:1")
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertIsNone(percentile([], 50))
+
+    def test_run_benchmarks_reports_every_combination(self):
+        report = run_benchmarks(
+            ["title_single", "process_file"], [12], [1, 4], trace_memory=False
+        )
+        results = report["results"]
+        self.assertEqual(len(results), 4)
+        for result in results:
+            self.assertEqual(result["errors"], 0)
+            self.assertGreater(result["requests"], 0)
+            self.assertIsNotNone(result["latency_ms"]["p95"])
+            self.assertGreater(result["titles_per_s"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
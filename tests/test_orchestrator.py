@@ -1,6 +1,11 @@
 import json
 from pathlib import Path
 
+from utils import setup_logger
+
+# 测试日志只输出到控制台，不写入受版本控制的 logs/star_filter.log
+LOGGER = setup_logger("test_orchestrator", log_to_file=False)
+
 
 def test_fetch_and_process_monkeypatch(monkeypatch, tmp_path):
     # 准备假数据和假 fetcher
@@ -17,6 +22,15 @@ def test_fetch_and_process_monkeypatch(monkeypatch, tmp_path):
             assert end == '2025-12-24'
             return fake_data
 
+        def date_list(self, start, end):
+            assert start == '2025-12-24'
+            assert end == '2025-12-24'
+            return list(fake_data)
+
+        def iter_dates(self, dates, max_workers, with_history):
+            for date in dates:
+                yield date, fake_data[date]
+
         def save_data(self, data, filename, with_history=False):
             with open(filename, 'w', encoding='utf-8') as f:
                 json.dump(data, f, ensure_ascii=False)
@@ -31,14 +45,23 @@ def test_fetch_and_process_monkeypatch(monkeypatch, tmp_path):
                 return True, 'YES'
             return False, 'NO'
 
-    monkeypatch.setattr('core.orchestrator.DeepSeekClient', lambda *a, **k: None)
+    class DummyClient:
+        def get_client(self):
+            return None
+
+        def get_async_client(self):
+            return None
+
+    monkeypatch.setattr('core.orchestrator.DeepSeekClient', lambda *a, **k: DummyClient())
     monkeypatch.setattr('core.orchestrator.TitleClassifier', lambda *a, **k: DummyClassifier())
 
     raw_path = tmp_path / 'raw.json'
     out_path = tmp_path / 'out.json'
 
     from core.orchestrator import fetch_and_process
-    res = fetch_and_process('2025-12-24', '2025-12-24', raw_path, out_path, with_history=True, workers=1)
+    res = fetch_and_process('2025-12-24', '2025-12-24', raw_path, out_path, with_history=True, workers=1,
+                            use_gazetteer=False, use_cache=False,
+                            use_http_cache=False, logger=LOGGER)
 
     assert res['total'] == 2
     assert res['kept'] == 1
@@ -49,3 +72,79 @@ def test_fetch_and_process_monkeypatch(monkeypatch, tmp_path):
 
     assert '2025-12-24' in out
     assert len(out['2025-12-24']['items']) == 1
+    # 原始数据照常保存，且未被过滤结果改写
+    with open(raw_path, 'r', encoding='utf-8') as f:
+        assert json.load(f) == fake_data
+    assert len(fake_data['2025-12-24']['items']) == 2
+
+
+def test_fetch_and_process_incremental(monkeypatch, tmp_path):
+    import datetime as dt
+    from core.fetcher import WeiboHotSearchFetcher
+    from core.orchestrator import fetch_and_process, plan_incremental_dates
+
+    days = {
+        "2025-12-23": [["A1", 1], ["B1", 2]],
+        "2025-12-24": [["A2", 1], ["B2", 2]],
+        "2025-12-25": [["A3", 1]],
+    }
+    fetched = []
+
+    class DummyFetcher(WeiboHotSearchFetcher):
+        def iter_dates(self, dates, max_workers=10, with_history=False):
+            for date in dates:
+                fetched.append(date)
+                yield date, days[date]
+
+    class DummyClassifier:
+        def classify_title(self, title):
+            return title.startswith('A'), ''
+
+    class DummyClient:
+        def get_client(self):
+            return None
+
+        def get_async_client(self):
+            return None
+
+    monkeypatch.setattr('core.orchestrator.WeiboHotSearchFetcher', DummyFetcher)
+    monkeypatch.setattr('core.orchestrator.DeepSeekClient', lambda *a, **k: DummyClient())
+    monkeypatch.setattr('core.orchestrator.TitleClassifier', lambda *a, **k: DummyClassifier())
+
+    raw_path = tmp_path / 'raw.json'
+    out_path = tmp_path / 'out.json'
+    kwargs = dict(workers=1, use_gazetteer=False, use_negative_rules=False, use_cache=False,
+                  use_http_cache=False, incremental=True, refresh_days=0, logger=LOGGER)
+
+    fetch_and_process('2025-12-23', '2025-12-24', raw_path, out_path, **kwargs)
+    assert fetched == ['2025-12-23', '2025-12-24']
+
+    # 滑动窗口：只抓取新增的一天，结果合并进已有文件
+    fetched.clear()
+    res = fetch_and_process('2025-12-24', '2025-12-25', raw_path, out_path, **kwargs)
+    full_keys = set(res)
+    assert fetched == ['2025-12-25']
+    assert res['fetched_dates'] == ['2025-12-25']
+    assert res['total'] == 1
+
+    with open(raw_path, 'r', encoding='utf-8') as f:
+        assert list(json.load(f)) == ['2025-12-23', '2025-12-24', '2025-12-25']
+    with open(out_path, 'r', encoding='utf-8') as f:
+        out = json.load(f)
+    assert {d: [r['raw_data'][0] for r in items] for d, items in out.items()} == {
+        '2025-12-23': ['A1'], '2025-12-24': ['A2'], '2025-12-25': ['A3']
+    }
+
+    # 全部最新时不发起任何请求
+    fetched.clear()
+    res = fetch_and_process('2025-12-23', '2025-12-25', raw_path, out_path, **kwargs)
+    assert fetched == [] and res['total'] == 0
+    # 提前返回时的结果与完整运行的键一致
+    assert set(res) == full_keys
+
+    # 过滤结果缺失的日期、最近 refresh_days 天的日期需要重新抓取
+    today = dt.date(2025, 12, 25)
+    assert plan_incremental_dates(['2025-12-24', '2025-12-25'], days, {'2025-12-24': []},
+                                  refresh_days=1, today=today) == ['2025-12-25']
+    assert plan_incremental_dates(['2025-12-24'], days, {'2025-12-24': []},
+                                  with_history=True, refresh_days=0, today=today) == ['2025-12-24']
@@ -0,0 +1,77 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import Mock
+
+from core import DataProcessor
+from core.prefilter import NegativeRuleFilter
+
+
+class TestNegativeRuleFilter(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.rules_file = Path(self.tmpdir.name) / "rules.json"
+        self.rules_file.write_text(json.dumps({
+            "rules": [
+                {"name": "holiday", "patterns": ["^(春节|冬至)(快乐)?$"]},
+                {"name": "weather", "keywords": ["暴雨预警"]},
+                {"name": "finance", "patterns": ["^a股"]},
+            ]
+        }, ensure_ascii=False), encoding="utf-8")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_match_and_stats(self):
+        f = NegativeRuleFilter(self.rules_file)
+        self.assertEqual(f.match("冬至快乐"), "holiday")
+        self.assertEqual(f.match("北京暴雨预警升级"), "weather")
+        self.assertEqual(f.match("A股收盘"), "finance")
+        # 正则锚定，明星相关的节日话题不误伤
+        self.assertIsNone(f.match("杨幂春节晒照"))
+        self.assertEqual(f.stats, {"holiday": 1, "weather": 1, "finance": 1})
+        self.assertIn("节省约 6 次API调用", f.report(calls_per_item=2))
+
+    def test_default_rules_file_loads(self):
+        f = NegativeRuleFilter()
+        self.assertTrue(f.rule_names)
+        self.assertEqual(f.match("丽江公开发函喊话小红书"), "place_headline")
+        self.assertEqual(f.match("春运返程高峰"), "traffic")
+        self.assertEqual(f.match("暴雨红色预警"), "weather")
+        self.assertEqual(f.match("外交部回应美方关税"), "policy")
+
+    def test_default_rules_keep_celebrity_headlines(self):
+        f = NegativeRuleFilter()
+        titles = [
+            "王一博春运返乡被偶遇",
+            "外交部回应成龙",
+            "杨幂医保卡",
+            "赵丽颖新规",
+            "周杰伦演唱会遇冷空气",
+            "刘亦菲机场遇航班取消",
+            "迪丽热巴晒天气预报",
+        ]
+        for title in titles:
+            with self.subTest(title=title):
+                self.assertIsNone(f.match(title))
+        self.assertEqual(f.total_hits, 0)
+
+    def test_process_file_drops_without_api_call(self):
+        classifier = Mock(spec=["classify_title"])
+        classifier.classify_title.return_value = (True, "YES")
+        path = Path(self.tmpdir.name) / "in.json"
+        path.write_text(json.dumps([{"title": "冬至"}, {"title": "杨幂新剧"}], ensure_ascii=False),
+                        encoding="utf-8")
+
+        filtered, total, kept = DataProcessor().process_file(
+            path, classifier, delay=0, negative_filter=NegativeRuleFilter(self.rules_file)
+        )
+
+        self.assertEqual((total, kept), (2, 1))
+        classifier.classify_title.assert_called_once_with("杨幂新剧")
+
+
+if __name__ == '__main__':
+    unittest.main()
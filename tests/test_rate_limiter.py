@@ -0,0 +1,93 @@
+import asyncio
+import unittest
+from unittest.mock import Mock
+
+from core import TitleClassifier
+from core.rate_limiter import AdaptiveRateLimiter, parse_retry_after
+
+
+class FakeStatusError(Exception):
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+        self.response = Mock(status_code=status_code, headers=headers or {})
+
+
+class TestAdaptiveRateLimiter(unittest.TestCase):
+
+    def test_additive_increase_and_multiplicative_decrease(self):
+        limiter = AdaptiveRateLimiter(initial_rate=4, min_rate=1, max_rate=10, increase=4)
+        limiter.record_success()
+        self.assertAlmostEqual(limiter.current_rate, 5.0)
+
+        limiter.record_throttle()
+        self.assertAlmostEqual(limiter.current_rate, 2.5)
+        # 同一冷却窗口内的连续 429 只降速一次
+        limiter.record_throttle()
+        self.assertAlmostEqual(limiter.current_rate, 2.5)
+
+    def test_rate_bounds(self):
+        limiter = AdaptiveRateLimiter(initial_rate=1, min_rate=1, max_rate=1.5, increase=10)
+        limiter.record_success()
+        self.assertEqual(limiter.current_rate, 1.5)
+        limiter.record_throttle()
+        self.assertEqual(limiter.current_rate, 1)
+
+    def test_call_retries_on_429_with_retry_after(self):
+        limiter = AdaptiveRateLimiter(initial_rate=50, max_rate=50, max_retries=2)
+        fn = Mock(side_effect=[FakeStatusError(429, {"retry-after": "0.05"}), "ok"])
+
+        self.assertEqual(limiter.call(fn, 1, x=2), "ok")
+        self.assertEqual(fn.call_count, 2)
+        snapshot = limiter.snapshot()
+        self.assertEqual(snapshot["throttled"], 1)
+        self.assertEqual(snapshot["retries"], 1)
+        self.assertLess(snapshot["rate"], 50)
+
+    def test_call_raises_non_retryable(self):
+        limiter = AdaptiveRateLimiter(initial_rate=50)
+        fn = Mock(side_effect=FakeStatusError(400))
+        with self.assertRaises(FakeStatusError):
+            limiter.call(fn)
+        self.assertEqual(fn.call_count, 1)
+
+    def test_call_gives_up_after_max_retries(self):
+        limiter = AdaptiveRateLimiter(initial_rate=50, max_retries=1)
+        fn = Mock(side_effect=FakeStatusError(503))
+        with self.assertRaises(FakeStatusError):
+            limiter.call(fn)
+        self.assertEqual(fn.call_count, 2)
+
+    def test_acall(self):
+        limiter = AdaptiveRateLimiter(initial_rate=50, max_retries=1)
+        attempts = []
+
+        async def fn():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise FakeStatusError(500)
+            return "ok"
+
+        self.assertEqual(asyncio.run(limiter.acall(fn)), "ok")
+        self.assertEqual(len(attempts), 2)
+
+    def test_parse_retry_after(self):
+        self.assertEqual(parse_retry_after({"retry-after": "3"}), 3.0)
+        self.assertEqual(parse_retry_after({"retry-after-ms": "1500"}), 1.5)
+        self.assertIsNone(parse_retry_after({}))
+        self.assertIsNone(parse_retry_after(None))
+
+    def test_classifier_uses_limiter(self):
+        client = Mock()
+        response = Mock()
+        response.choices = [Mock(message=Mock(content="YES"))]
+        client.chat.completions.create.side_effect = [FakeStatusError(429), response]
+        limiter = AdaptiveRateLimiter(initial_rate=50, max_retries=2)
+        classifier = TitleClassifier(client, rate_limiter=limiter)
+
+        self.assertEqual(classifier.classify_title("Taylor Swift"), (True, "YES"))
+        self.assertEqual(limiter.snapshot()["throttled"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
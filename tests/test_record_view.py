@@ -0,0 +1,60 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import Mock
+
+from core.data_processor import DataProcessor
+from core.journal import DecisionJournal
+from core.record_view import RecordView, json_default
+
+
+class TestRecordView(unittest.TestCase):
+
+    def test_view_reads_through_without_copying(self):
+        source = {"keyword": "A", "rank": 3}
+        view = RecordView(source, "2025-12-20", 0)
+        kept = view.derive(filter_reason="direct_celebrity", rank=1)
+
+        self.assertIs(kept.source, source)
+        self.assertEqual(kept["rank"], 1)
+        self.assertEqual(kept["_source_date"], "2025-12-20")
+        self.assertEqual(dict(kept), {"keyword": "A", "rank": 1, "filter_reason": "direct_celebrity", "_source_date": "2025-12-20"})
+        self.assertEqual(kept.materialize(), {"keyword": "A", "rank": 1, "filter_reason": "direct_celebrity"})
+        self.assertEqual(json.loads(json.dumps([kept], default=json_default)), [kept.materialize()])
+        self.assertEqual(source, {"keyword": "A", "rank": 3})
+        self.assertEqual(RecordView(["B", 1]).materialize(), {"raw_data": ["B", 1]})
+
+    def test_load_process_save_leaves_input_untouched(self):
+        data = {
+            "2025-12-20": {"date": "2025-12-20", "items": [{"keyword": "骄阳似我", "rank": 1}, {"keyword": "丽江"}]},
+            "2025-12-21": {"date": "2025-12-21", "items": [{"keyword": "骄阳似我", "rank": 4}]},
+        }
+        snapshot = json.loads(json.dumps(data))
+        processor = DataProcessor()
+        classifier = Mock(spec=["classify_title"])
+        classifier.classify_title.side_effect = lambda t: (t == "骄阳似我", "")
+
+        records, container_key, original = processor.extract_records(data)
+        self.assertIs(records[0].source, data["2025-12-20"]["items"][0])
+
+        with tempfile.TemporaryDirectory() as tmp:
+            journal = DecisionJournal(Path(tmp) / "j.jsonl", source="mem")
+            filtered, total, kept = processor.process_records(records, classifier, delay=0, journal=journal)
+            journal.close()
+            output_path = Path(tmp) / "out.json"
+            processor.save_filtered_data(filtered, original, container_key, output_path)
+            with open(output_path, encoding="utf-8") as f:
+                out = json.load(f)
+            resumed = DecisionJournal(Path(tmp) / "j.jsonl", source="mem", resume=True)
+            self.assertEqual(resumed.lookup(2, "骄阳似我")["record"]["_source_date"], "2025-12-21")
+            resumed.close()
+
+        self.assertEqual((total, kept), (3, 2))
+        self.assertEqual(data, snapshot)
+        self.assertEqual(out["2025-12-20"]["items"], [{"keyword": "骄阳似我", "rank": 1, "filter_reason": "direct_celebrity"}])
+        self.assertEqual(out["2025-12-21"]["items"][0]["rank"], 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
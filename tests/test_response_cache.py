@@ -0,0 +1,127 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from benchmarks.weibotop_stub import SECRET_KEY, WeiboTopStub
+from core.fetcher import WeiboHotSearchFetcher
+from core.response_cache import OfflineCacheMiss, ResponseCache
+
+
+class TestResponseCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.root = Path(self.tmp.name)
+
+    def _age(self, cache, endpoint, param, seconds, fetched_on):
+        path = cache._path(endpoint, param)
+        with open(path, 'r', encoding='utf-8') as f:
+            entry = json.load(f)
+        entry["fetched_at"] -= seconds
+        entry["fetched_on"] = fetched_on
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(entry, f)
+
+    def test_expiry_rules(self):
+        cache = ResponseCache(self.root, ttl=60)
+        cache.put("currentitems", "202512010000", [["A", 1]])
+        cache.put("getclosesttime", "2025-12-01", ["202512010000", "2025-12-01 00:00:00"])
+        cache.put("getrankhistory", "A", [["2025-12-01 10:00:00"], ["1"], ["10"]])
+
+        # 抓取于 2025-12-01 当天、且超过 TTL
+        for endpoint, param in [("currentitems", "202512010000"), ("getclosesttime", "2025-12-01"), ("getrankhistory", "A")]:
+            self._age(cache, endpoint, param, 3600, "2025-12-01")
+
+        # timeid 快照永不过期
+        self.assertEqual(cache.get("currentitems", "202512010000"), [["A", 1]])
+        # 抓取时当天尚未结束，过期
+        self.assertIsNone(cache.get("getclosesttime", "2025-12-01", closed_on="2025-12-01"))
+        # 所需日期在抓取之前已经结束，永不过期
+        self.assertIsNotNone(cache.get("getrankhistory", "A", closed_on="2025-11-30"))
+        self.assertEqual(cache.stats["stale"], 1)
+
+    def test_offline_accepts_stale_and_reports_miss(self):
+        ResponseCache(self.root, ttl=0).put("getclosesttime", "2025-12-01", ["1", "t"])
+        offline = ResponseCache(self.root, ttl=0, offline=True)
+        self.assertEqual(offline.get("getclosesttime", "2025-12-01", closed_on="2099-01-01"), ["1", "t"])
+
+        fetcher = WeiboHotSearchFetcher(base_url="http://127.0.0.1:9", response_cache=offline)
+        with self.assertRaises(OfflineCacheMiss):
+            fetcher._cache_get("currentitems", "1")
+        start = time.monotonic()
+        # 离线未命中立即失败，不做带延迟的重试，也不静默跳过该日期
+        with self.assertRaisesRegex(OfflineCacheMiss, "离线模式"):
+            fetcher._fetch_day("2025-12-01")
+        self.assertLess(time.monotonic() - start, 0.5)
+
+    def test_replay_without_network(self):
+        stub = WeiboTopStub(items_per_day=4, keyword_pool=5)
+        url = stub.start()
+        try:
+            online = WeiboHotSearchFetcher(secret_key=SECRET_KEY, base_url=url, response_cache=ResponseCache(self.root))
+            expected = online.fetch_date_range("2025-12-01", "2025-12-03", max_workers=2, with_history=True)
+            counts = dict(stub.counts)
+
+            # 再次抓取过去的日期全部命中缓存
+            again = WeiboHotSearchFetcher(secret_key=SECRET_KEY, base_url=url, response_cache=ResponseCache(self.root))
+            self.assertEqual(again.fetch_date_range("2025-12-01", "2025-12-03", max_workers=2, with_history=True), expected)
+            self.assertEqual(stub.counts, counts)
+        finally:
+            stub.stop()
+
+        replay = WeiboHotSearchFetcher(
+            secret_key=SECRET_KEY, base_url=url, response_cache=ResponseCache(self.root, offline=True)
+        )
+        self.assertEqual(replay.fetch_date_range("2025-12-01", "2025-12-03", max_workers=2, with_history=True), expected)
+        self.assertEqual(replay.http_stats["requests"], 0)
+
+    def test_evicts_least_recently_used(self):
+        cache = ResponseCache(self.root, max_entries=3)
+        for i in range(3):
+            cache.put("currentitems", str(i), [i])
+        # 读取会刷新访问顺序，"0" 不再是最久未访问的条目
+        self.assertEqual(cache.get("currentitems", "0"), [0])
+        cache.put("currentitems", "3", [3])
+
+        self.assertEqual(cache.stats["evicted"], 1)
+        self.assertIsNone(cache.get("currentitems", "1"))
+        self.assertEqual(cache.get("currentitems", "0"), [0])
+        self.assertEqual(len(list(self.root.glob("*/*.json"))), 3)
+
+        # 新实例按文件修改时间重建访问顺序
+        for i, param in enumerate(["3", "0", "2"]):
+            os.utime(cache._path("currentitems", param), (1000 + i, 1000 + i))
+        smaller = ResponseCache(self.root, max_entries=2)
+        self.assertEqual(smaller.evict(), 1)
+        self.assertIsNone(smaller.get("currentitems", "3"))
+        self.assertEqual(smaller.get("currentitems", "2"), [2])
+
+    def test_offline_history_miss_fails_fast(self):
+        stub = WeiboTopStub(items_per_day=4, keyword_pool=5)
+        url = stub.start()
+        try:
+            # 只缓存热搜列表，不缓存历史
+            online = WeiboHotSearchFetcher(secret_key=SECRET_KEY, base_url=url, response_cache=ResponseCache(self.root))
+            online.fetch_date_range("2025-12-01", "2025-12-01", max_workers=2)
+        finally:
+            stub.stop()
+
+        for engine in ("thread", "async"):
+            with self.subTest(engine=engine):
+                replay = WeiboHotSearchFetcher(
+                    secret_key=SECRET_KEY, base_url=url, engine=engine,
+                    response_cache=ResponseCache(self.root, offline=True)
+                )
+                with self.assertRaises(OfflineCacheMiss):
+                    replay.fetch_date_range("2025-12-01", "2025-12-01", max_workers=2, with_history=True)
+                # 热搜列表未缓存的日期同样报错，而不是从结果中消失
+                with self.assertRaises(OfflineCacheMiss):
+                    replay.fetch_date_range("2025-12-01", "2025-12-02", max_workers=2)
+
+
+if __name__ == '__main__':
+    unittest.main()
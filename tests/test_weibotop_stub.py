@@ -0,0 +1,56 @@
+"""本地 weibotop 桩服务与抓取基准的冒烟测试"""
+import unittest
+
+import requests
+
+from benchmarks.fetch_bench import run_benchmarks
+from benchmarks.weibotop_stub import SECRET_KEY, WeiboTopStub
+from core.fetcher import WeiboHotSearchFetcher
+
+
+class TestWeiboTopStub(unittest.TestCase):
+    def test_history_size_is_configurable(self):
+        stub = WeiboTopStub(history_days=2, history_step_minutes=30)
+        times, ranks, hotness = stub.history_for("话题3")
+        self.assertEqual(len(times), 2 * 24 * 2)
+        self.assertEqual(times[1], "2025-11-25 00:30:00")
+        self.assertEqual(len(ranks), len(hotness))
+
+    def test_injected_responses(self):
+        stub = WeiboTopStub(invalid_rate=1.0)
+        url = stub.start()
+        try:
+            fetcher = WeiboHotSearchFetcher(secret_key=SECRET_KEY, base_url=url)
+            name = fetcher.encrypt("话题1")
+            self.assertEqual(requests.get(f"{url}/getrankhistory", params={"name": name}).text, "Invalid")
+            # getclosesttime 不返回 Invalid
+            timeid, _ = fetcher.get_timeid_for_date(requests.Session(), "2025-12-01")
+            self.assertEqual(timeid, "2025120100")
+
+            stub.invalid_rate, stub.throttle_rate = 0.0, 1.0
+            self.assertEqual(requests.get(f"{url}/getrankhistory", params={"name": name}).text, "Code:DCE")
+            stub.throttle_rate, stub.error_rate = 0.0, 1.0
+            self.assertEqual(requests.get(f"{url}/getrankhistory", params={"name": name}).status_code, 500)
+            self.assertEqual(stub.injected, {"invalid": 1, "throttled": 1, "errors": 1})
+        finally:
+            stub.stop()
+
+
+class TestFetchBench(unittest.TestCase):
+    def test_injected_throttling_is_retried(self):
+        report = run_benchmarks(
+            2, [1], [True], ["thread"],
+            stub_options={"items_per_day": 4, "keyword_pool": 6, "throttle_every": 2},
+            history_rate=200, decrypt_processes=1
+        )
+        (result,) = report["results"]
+        throttled = result["injected"]["throttled"]
+        self.assertGreater(throttled, 0)
+        # 每个 Code:DCE 都由限速器重试，没有关键词因此缺失历史
+        self.assertEqual(result["missing_history"], 0)
+        self.assertEqual(result["history_limiter"]["retries"], throttled)
+        self.assertEqual(result["history_calls"], result["history_limiter"]["keywords"] + throttled)
+
+
+if __name__ == "__main__":
+    unittest.main()
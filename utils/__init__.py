@@ -6,11 +6,16 @@ from .file_utils import (
     read_json_safely, 
     save_json_safely
 )
+from .json_stream import iter_json_records
+from .json_writer import JSONStreamWriter, write_json_atomic
 
 __all__ = [
     'setup_logger', 
     'validate_file_path', 
     'backup_file', 
     'read_json_safely', 
-    'save_json_safely'
+    'save_json_safely',
+    'iter_json_records',
+    'JSONStreamWriter',
+    'write_json_atomic'
 ]
\ No newline at end of file
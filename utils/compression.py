@@ -0,0 +1,101 @@
+"""
+透明压缩
+按文件扩展名选择压缩格式：.gz（gzip）、.xz（lzma）、.zst（zstandard，可选依赖），其他扩展名按未压缩处理。
+读写都是流式的，不会把解压后的完整内容放入内存；压缩级别由 COMPRESSION_LEVEL 配置。
+"""
+import gzip
+import io
+import logging
+import lzma
+from pathlib import Path
+from typing import BinaryIO, Optional, TextIO, Tuple
+
+from config.settings import COMPRESSION_LEVEL
+
+try:
+    import zstandard
+except ImportError:  # 可选依赖，仅 .zst 文件需要
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+# 扩展名 -> 压缩格式
+COMPRESSED_SUFFIXES = {".gz": "gz", ".xz": "xz", ".zst": "zst"}
+
+# COMPRESSION_LEVEL 为 0 时各格式使用的级别（兼顾速度与压缩率）
+_DEFAULT_LEVELS = {"gz": 6, "xz": 6, "zst": 3}
+
+
+def compression_of(path: Path) -> Optional[str]:
+    """返回文件的压缩格式（"gz" / "xz" / "zst"），未压缩时返回 None"""
+    return COMPRESSED_SUFFIXES.get(Path(path).suffix.lower())
+
+
+def split_suffix(path: Path) -> Tuple[str, str]:
+    """
+    拆分文件名与扩展名，压缩扩展名与其前面的扩展名视为一个整体
+
+    例如 raw.json.gz -> ("raw", ".json.gz")，raw.json -> ("raw", ".json")
+    """
+    path = Path(path)
+    name = path.name
+    if compression_of(path):
+        inner = Path(path.stem)
+        return inner.stem, inner.suffix + path.suffix
+    return path.stem, name[len(path.stem):]
+
+
+def sibling_path(path: Path, tag: str) -> Path:
+    """在扩展名之前加上 tag，保留压缩格式，例如 (raw.json.gz, "_simplified") -> raw_simplified.json.gz"""
+    base, suffix = split_suffix(path)
+    return Path(path).with_name(base + tag + suffix)
+
+
+def _level(kind: str, level: Optional[int]) -> int:
+    if level is None:
+        level = COMPRESSION_LEVEL
+    return level or _DEFAULT_LEVELS[kind]
+
+
+def _require_zstandard():
+    if zstandard is None:
+        raise ImportError(".zst 文件需要 zstandard，请先安装: pip install zstandard")
+
+
+def open_text(path: Path) -> TextIO:
+    """以 UTF-8 文本方式流式读取文件，按扩展名自动解压"""
+    kind = compression_of(path)
+    if kind == "gz":
+        return gzip.open(path, "rt", encoding="utf-8")
+    if kind == "xz":
+        return lzma.open(path, "rt", encoding="utf-8")
+    if kind == "zst":
+        _require_zstandard()
+        raw = open(path, "rb")
+        reader = zstandard.ZstdDecompressor().stream_reader(raw, closefd=True)
+        return io.TextIOWrapper(reader, encoding="utf-8")
+    return open(path, "r", encoding="utf-8")
+
+
+def compress_stream(raw: BinaryIO, path: Path, level: Optional[int] = None) -> BinaryIO:
+    """
+    按 path 的扩展名包装一个可写的二进制流
+
+    Args:
+        raw: 底层文件对象（关闭返回的流不会关闭它）
+        path: 决定压缩格式的目标路径
+        level: 压缩级别，默认 COMPRESSION_LEVEL
+
+    Returns:
+        BinaryIO: 压缩流；未压缩的格式直接返回 raw
+    """
+    kind = compression_of(path)
+    if kind == "gz":
+        # 不写入文件名与时间戳，相同内容得到相同的压缩文件
+        return gzip.GzipFile(filename="", mode="wb", fileobj=raw, compresslevel=_level(kind, level), mtime=0)
+    if kind == "xz":
+        return lzma.LZMAFile(raw, "wb", preset=_level(kind, level))
+    if kind == "zst":
+        _require_zstandard()
+        return zstandard.ZstdCompressor(level=_level(kind, level)).stream_writer(raw, closefd=False)
+    return raw
@@ -1,8 +1,11 @@
 import json
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Callable, Dict, Optional
 import logging
 
+from .compression import open_text, split_suffix
+from .json_writer import write_json_atomic
+
 
 logger = logging.getLogger(__name__)
 
@@ -30,8 +33,8 @@ def validate_file_path(file_path: Path, must_exist: bool = True) -> bool:
         logger.error(f"路径不是文件: {file_path}")
         return False
     
-    # 检查文件扩展名
-    if file_path.suffix.lower() != '.json':
+    # 检查文件扩展名（.json.gz / .json.xz / .json.zst 视为 JSON）
+    if split_suffix(file_path)[1].lower() not in ('.json', '.json.gz', '.json.xz', '.json.zst'):
         logger.warning(f"文件扩展名不是.json: {file_path}")
     
     return True
@@ -63,7 +66,7 @@ def backup_file(file_path: Path, backup_suffix: str = '.bak') -> Path:
 
 def read_json_safely(file_path: Path) -> Any:
     """
-    安全读取JSON文件
+    安全读取JSON文件（按扩展名自动解压）
     
     Args:
         file_path: JSON文件路径
@@ -72,7 +75,7 @@ def read_json_safely(file_path: Path) -> Any:
         Any: 解析后的JSON数据
     """
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
+        with open_text(file_path) as f:
             return json.load(f)
     except json.JSONDecodeError as e:
         logger.error(f"JSON解析错误: {e}")
@@ -82,24 +85,21 @@ def read_json_safely(file_path: Path) -> Any:
         raise
 
 
-def save_json_safely(data: Any, file_path: Path, indent: int = 2) -> bool:
+def save_json_safely(data: Any, file_path: Path, indent: Optional[int] = 2, default: Optional[Callable[[Any], Any]] = None) -> bool:
     """
-    安全保存JSON数据到文件
+    安全保存JSON数据到文件（流式写入临时文件后原子替换，按扩展名自动压缩）
     
     Args:
         data: 要保存的数据
         file_path: 输出文件路径
-        indent: 缩进空格数
+        indent: 缩进空格数，None 表示不换行
+        default: 传给 json.dump 的 default 钩子，用于序列化自定义对象
         
     Returns:
         bool: 是否保存成功
     """
     try:
-        # 确保目录存在
-        file_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=indent)
+        write_json_atomic(data, Path(file_path), indent=indent, default=default)
         
         logger.info(f"数据已保存到: {file_path}")
         return True
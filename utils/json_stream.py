@@ -0,0 +1,221 @@
+"""
+增量 JSON 读取
+逐条产出记录而不把整个文件读入内存，内存占用以单条记录为上限。
+支持三种布局：顶层列表、带容器键的字典、按日期索引的字典。
+"""
+import json
+import logging
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, TextIO
+
+from .compression import open_text
+
+logger = logging.getLogger(__name__)
+
+# 与 DataProcessor.load_json_file 一致的常见容器键
+CONTAINER_KEYS = ["items", "data", "rows", "trends", "results", "records"]
+
+_WHITESPACE = " \t\r\n"
+
+
+class JSONStreamReader:
+    """基于 json.JSONDecoder.raw_decode 的简易拉取式解析器"""
+
+    def __init__(self, fp: TextIO, chunk_size: int = 1 << 16):
+        self._fp = fp
+        self._chunk_size = chunk_size
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+        self._decoder = json.JSONDecoder()
+
+    def _fill(self, min_size: int = 0) -> bool:
+        """读入更多数据，返回是否读到了新内容"""
+        if self._eof:
+            return False
+        if self._pos > len(self._buf) // 2:
+            self._buf = self._buf[self._pos:]
+            self._pos = 0
+        chunk = self._fp.read(max(self._chunk_size, min_size))
+        if not chunk:
+            self._eof = True
+            return False
+        self._buf += chunk
+        return True
+
+    def peek(self) -> str:
+        """返回下一个非空白字符（不消费），文件结束时返回空字符串"""
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, ch: str):
+        actual = self.peek()
+        if actual != ch:
+            raise ValueError(f"JSON 结构错误：期望 {ch!r}，实际为 {actual!r}")
+        self._pos += 1
+
+    def read_value(self) -> Any:
+        """完整读取下一个 JSON 值"""
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                # 缓冲区中的值不完整，按已有长度成倍读入以保证总体线性
+                if not self._fill(len(self._buf) - self._pos):
+                    raise
+                continue
+            # 数字等标量可能恰好在缓冲区末尾被截断
+            if end == len(self._buf) and not self._eof and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def iter_array(self) -> Iterator[None]:
+        """
+        遍历数组：每次产出时读取位置位于一个元素之前，调用方必须读取该元素
+        """
+        self.expect("[")
+        if self.peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            yield None
+            ch = self.peek()
+            self._pos += 1
+            if ch == "]":
+                return
+            if ch != ",":
+                raise ValueError(f"JSON 数组格式错误：意外的字符 {ch!r}")
+
+    def iter_object(self) -> Iterator[str]:
+        """
+        遍历对象：每次产出一个键，此时读取位置位于对应的值之前，调用方必须读取该值
+        """
+        self.expect("{")
+        if self.peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            key = self.read_value()
+            if not isinstance(key, str):
+                raise ValueError("JSON 对象格式错误：键必须为字符串")
+            self.expect(":")
+            yield key
+            ch = self.peek()
+            self._pos += 1
+            if ch == "}":
+                return
+            if ch != ",":
+                raise ValueError(f"JSON 对象格式错误：意外的字符 {ch!r}")
+
+
+class RecordStream:
+    """
+    记录流：迭代时逐条产出记录
+
+    迭代结束后：
+    - container_key 为 None（顶层列表）、容器键名或 'by_date'
+    - skeleton 为去掉了记录本身的原始结构（记录列表位置为空列表），可直接传给
+      DataProcessor.save_filtered_data 作为 original_data
+    """
+
+    def __init__(self, file_path: Path, chunk_size: int = 1 << 16):
+        self.file_path = Path(file_path)
+        self.chunk_size = chunk_size
+        self.container_key: Optional[str] = None
+        self.skeleton: Any = None
+        self.count = 0
+        self._consumed = False
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        if self._consumed:
+            raise RuntimeError("RecordStream 只能迭代一次")
+        self._consumed = True
+
+        with open_text(self.file_path) as f:
+            reader = JSONStreamReader(f, self.chunk_size)
+            first = reader.peek()
+            if first == "[":
+                self.skeleton = []
+                for _ in reader.iter_array():
+                    self.count += 1
+                    yield reader.read_value()
+            elif first == "{":
+                yield from self._iter_dict(reader)
+            else:
+                raise ValueError("不支持的JSON顶层结构")
+
+            if reader.peek() != "":
+                raise ValueError("JSON 文件在顶层值之后还有多余内容")
+
+    def _iter_dict(self, reader: JSONStreamReader) -> Iterator[Dict[str, Any]]:
+        skeleton: Dict[str, Any] = {}
+        self.skeleton = skeleton
+        mode: Optional[str] = None
+
+        for key in reader.iter_object():
+            ch = reader.peek()
+
+            if ch == "[" and mode is None and key in CONTAINER_KEYS:
+                # 顶层容器键：记录原样产出
+                mode = key
+                skeleton[key] = []
+                for _ in reader.iter_array():
+                    self.count += 1
+                    yield reader.read_value()
+
+            elif ch == "[" and mode in (None, 'by_date'):
+                # 按日期索引的列表
+                mode = 'by_date'
+                skeleton[key] = []
+                for _ in reader.iter_array():
+                    self.count += 1
+                    yield self._with_date(reader.read_value(), key)
+
+            elif ch == "{" and mode in (None, 'by_date'):
+                # 可能是 {"date": ..., "items": [...]}，逐键读取，只流式展开 items
+                day: Dict[str, Any] = {}
+                skeleton[key] = day
+                for sub_key in reader.iter_object():
+                    if sub_key == 'items' and reader.peek() == "[":
+                        mode = 'by_date'
+                        day['items'] = []
+                        for _ in reader.iter_array():
+                            self.count += 1
+                            yield self._with_date(reader.read_value(), key)
+                    else:
+                        day[sub_key] = reader.read_value()
+
+            else:
+                skeleton[key] = reader.read_value()
+
+        if mode is None:
+            raise ValueError("无法在JSON中找到列表记录结构")
+        self.container_key = mode
+
+    @staticmethod
+    def _with_date(item: Any, date_key: str) -> Dict[str, Any]:
+        # 流式读取的记录本身就是新对象，无需复制
+        record = item if isinstance(item, dict) else {'raw_data': item}
+        record['_source_date'] = date_key
+        return record
+
+
+def iter_json_records(file_path: Path, chunk_size: int = 1 << 16) -> RecordStream:
+    """
+    以流的方式读取 JSON 文件中的记录
+
+    Args:
+        file_path: JSON文件路径
+        chunk_size: 每次从文件读取的字符数
+
+    Returns:
+        RecordStream: 可迭代一次的记录流
+    """
+    return RecordStream(file_path, chunk_size)
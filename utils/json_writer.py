@@ -0,0 +1,236 @@
+"""
+增量 JSON 写入
+与 json_stream 的读取相对应：按容器逐层写出，记录逐条编码后立即写入文件，不生成整个文件的字符串。
+每条记录使用一次性编码（C 加速的 json.dumps，或可选的 orjson），比 json.dump(indent=2) 走的
+纯 Python 编码路径快得多。写入临时文件，完成后原子替换目标文件，中途失败不会留下半个文件。
+目标文件扩展名为 .gz / .xz / .zst 时边写边压缩。
+"""
+import json
+import logging
+import math
+import os
+import secrets
+import stat
+from pathlib import Path
+from typing import Any, Callable, List, Optional, Tuple
+
+from config.settings import JSON_BACKEND
+
+from .compression import compress_stream
+
+try:
+    import orjson
+except ImportError:  # 可选依赖，未安装时使用标准库
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+
+def _has_non_finite(obj: Any) -> bool:
+    """是否包含 NaN / Infinity；orjson 会把它们写成 null，而标准库写成 NaN / Infinity"""
+    if isinstance(obj, float):
+        return not math.isfinite(obj)
+    if isinstance(obj, dict):
+        return any(_has_non_finite(v) for v in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return any(_has_non_finite(v) for v in obj)
+    return False
+
+
+def _create_temp(path: Path) -> Tuple[int, str]:
+    """
+    在目标文件所在目录独占创建临时文件
+
+    以 0o666 创建，权限由进程的 umask 决定，与普通 open() 创建的文件一致（mkstemp 固定为 0600）；
+    目标文件已存在时沿用其权限，与覆盖写入时一致。不读取也不修改进程的 umask。
+    """
+    flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0)
+    while True:
+        tmp = str(path.parent / f".{path.name}.{secrets.token_hex(6)}.tmp")
+        try:
+            fd = os.open(tmp, flags, 0o666)
+        except FileExistsError:
+            continue
+        break
+    try:
+        os.chmod(tmp, stat.S_IMODE(os.stat(path).st_mode))
+    except FileNotFoundError:
+        pass
+    return fd, tmp
+
+
+class JSONStreamWriter:
+    """
+    流式 JSON 写入器
+
+    用法：
+        with JSONStreamWriter(path) as w:
+            w.begin_object()
+            w.begin_array("items")
+            for record in records:
+                w.value(record)
+            w.end()
+            w.end()
+
+    indent=2 时输出与 json.dump(indent=2, ensure_ascii=False) 相同；indent=None 时使用紧凑分隔符。
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        indent: Optional[int] = 2,
+        default: Optional[Callable[[Any], Any]] = None,
+        backend: Optional[str] = None
+    ):
+        """
+        Args:
+            path: 输出文件路径
+            indent: 缩进空格数，None 表示紧凑输出（不换行，分隔符不带空格）
+            default: 自定义对象的序列化钩子，与 json.dump 的 default 相同
+            backend: "json"、"orjson" 或 "auto"（已安装 orjson 时使用），默认 JSON_BACKEND
+        """
+        self.path = Path(path)
+        self.indent = indent
+        self.default = default
+        backend = backend or JSON_BACKEND
+        if backend == "orjson" and orjson is None:
+            raise ImportError("orjson 后端需要安装 orjson: pip install orjson")
+        # orjson 只支持两个空格缩进
+        self.use_orjson = orjson is not None and backend in ("orjson", "auto") and indent in (None, 2)
+        self._key_separator = b": " if indent is not None else b":"
+        # 容器栈: [是否为对象, 已写入的元素数]
+        self._stack: List[list] = []
+        self._raw = None
+        self._fp = None
+        self._tmp: Optional[str] = None
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.abort()
+
+    def open(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, self._tmp = _create_temp(self.path)
+        self._raw = os.fdopen(fd, "wb", buffering=1 << 20)
+        self._fp = compress_stream(self._raw, self.path)
+
+    def commit(self):
+        """写完后把临时文件替换为目标文件"""
+        if self._stack:
+            raise ValueError("JSON 容器尚未全部结束")
+        self._close()
+        os.replace(self._tmp, self.path)
+        self._tmp = None
+
+    def abort(self):
+        """放弃写入，删除临时文件，目标文件保持不变"""
+        self._close()
+        if self._tmp is not None:
+            try:
+                os.unlink(self._tmp)
+            except OSError:
+                pass
+            self._tmp = None
+
+    def _close(self):
+        # 先关闭压缩流写出尾部，再关闭底层文件
+        for fp in (self._fp, self._raw):
+            if fp is not None and not fp.closed:
+                fp.close()
+
+    def _encode(self, obj: Any) -> bytes:
+        if self.use_orjson:
+            option = orjson.OPT_INDENT_2 if self.indent is not None else 0
+            try:
+                encoded = orjson.dumps(obj, default=self.default, option=option)
+            except TypeError:
+                # 超出 64 位的整数、非字符串键等 orjson 不支持的值交给标准库
+                pass
+            else:
+                # 输出中出现 null 时才检查非有限浮点数，含 NaN / Infinity 的值交给标准库以保持输出一致
+                if b"null" not in encoded or not _has_non_finite(obj):
+                    return encoded
+        separators = (",", ": ") if self.indent is not None else (",", ":")
+        text = json.dumps(obj, ensure_ascii=False, indent=self.indent, separators=separators, default=self.default)
+        return text.encode("utf-8")
+
+    def _newline(self, depth: int) -> bytes:
+        return b"\n" + b" " * (self.indent * depth)
+
+    def _start_element(self, key: Optional[str]):
+        if not self._stack:
+            return
+        frame = self._stack[-1]
+        if frame[0] and key is None:
+            raise ValueError("对象中的元素必须带键")
+        if frame[1]:
+            self._fp.write(b",")
+        if self.indent is not None:
+            self._fp.write(self._newline(len(self._stack)))
+        if frame[0]:
+            self._fp.write(self._encode(str(key)) + self._key_separator)
+        frame[1] += 1
+
+    def value(self, obj: Any, key: Optional[str] = None):
+        """写入一个完整的值（在对象中需要提供键）"""
+        self._start_element(key)
+        encoded = self._encode(obj)
+        if self.indent is not None and self._stack:
+            # 嵌套值整体缩进到当前层级；JSON 字符串中的换行都已转义，替换是安全的
+            encoded = encoded.replace(b"\n", self._newline(len(self._stack)))
+        self._fp.write(encoded)
+
+    def begin_object(self, key: Optional[str] = None):
+        self._start_element(key)
+        self._fp.write(b"{")
+        self._stack.append([True, 0])
+
+    def begin_array(self, key: Optional[str] = None):
+        self._start_element(key)
+        self._fp.write(b"[")
+        self._stack.append([False, 0])
+
+    def end(self):
+        is_object, count = self._stack.pop()
+        if count and self.indent is not None:
+            self._fp.write(self._newline(len(self._stack)))
+        self._fp.write(b"}" if is_object else b"]")
+
+
+def write_streamed(writer: JSONStreamWriter, obj: Any, key: Optional[str] = None, depth: int = 3):
+    """
+    把 obj 写入 writer，最外面 depth 层的字典/列表逐个元素展开写出，更深的值整体编码
+
+    默认 depth=3 覆盖本项目的三种布局：按日期索引（日期 -> 当天 -> items -> 记录）、
+    带容器键的字典（容器键 -> 记录）、顶层列表（记录）。
+    """
+    if depth > 0 and isinstance(obj, dict):
+        writer.begin_object(key)
+        for k, v in obj.items():
+            write_streamed(writer, v, k, depth - 1)
+        writer.end()
+    elif depth > 0 and isinstance(obj, list):
+        writer.begin_array(key)
+        for item in obj:
+            write_streamed(writer, item, None, depth - 1)
+        writer.end()
+    else:
+        writer.value(obj, key)
+
+
+def write_json_atomic(
+    data: Any,
+    file_path: Path,
+    indent: Optional[int] = 2,
+    default: Optional[Callable[[Any], Any]] = None,
+    backend: Optional[str] = None
+):
+    """流式、原子地保存 JSON 数据，失败时抛出异常且目标文件保持不变"""
+    with JSONStreamWriter(file_path, indent=indent, default=default, backend=backend) as writer:
+        write_streamed(writer, data)